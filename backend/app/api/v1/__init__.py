@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from app.core.config import get_settings
-from app.api.v1.endpoints import auth, products, orders, notifications, contact, payments
+from app.api.v1.endpoints import auth, products, orders, notifications, contact, payments, analytics, system
 
 settings = get_settings()
 
@@ -13,3 +13,5 @@ api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
 api_router.include_router(contact.router, prefix="/contact", tags=["contact"])
 api_router.include_router(payments.router, prefix="/payments", tags=["payments"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
@@ -0,0 +1,185 @@
+"""
+Endpoints de Analytics de vendas (apenas admin).
+
+Servidos das tabelas de rollup mantidas por `app.services.analytics`: o custo
+de cada consulta depende do número de dias (e produtos) no período, não do
+número de pedidos.
+"""
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.read_routing import get_read_db
+from app.dependencies.auth import require_admin
+from app.models.analytics import OrderStatusCount, SalesDaily, SalesProductDaily
+from app.models.product import Product
+from app.models.user import User
+from app.services import analytics
+
+router = APIRouter()
+
+
+def _in_period(column, date_from: Optional[date], date_to: Optional[date]) -> list:
+    conditions = []
+    if date_from is not None:
+        conditions.append(column >= date_from)
+    if date_to is not None:
+        conditions.append(column <= date_to)
+    return conditions
+
+
+def _money(value) -> float:
+    return round(float(value or 0), 2)
+
+
+def _average_ticket(revenue, orders) -> float:
+    return _money(revenue / orders) if orders else 0.0
+
+
+@router.get("/summary")
+async def sales_summary(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(require_admin),
+):
+    """Pedidos, itens, receita e ticket médio do período (pedidos cancelados não entram)."""
+    row = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(SalesDaily.orders), 0),
+                func.coalesce(func.sum(SalesDaily.items), 0),
+                func.coalesce(func.sum(SalesDaily.revenue), 0),
+            ).where(*_in_period(SalesDaily.day, date_from, date_to))
+        )
+    ).one()
+    orders, items, revenue = row
+    return {
+        "orders": int(orders),
+        "items": int(items),
+        "revenue": _money(revenue),
+        "averageTicket": _average_ticket(revenue, orders),
+    }
+
+
+@router.get("/revenue")
+async def revenue_by_day(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(require_admin),
+):
+    """Receita, pedidos e ticket médio por dia (apenas dias com vendas)."""
+    rows = (
+        await db.scalars(
+            select(SalesDaily)
+            .where(*_in_period(SalesDaily.day, date_from, date_to), SalesDaily.orders > 0)
+            .order_by(SalesDaily.day)
+        )
+    ).all()
+    return [
+        {
+            "date": row.day.isoformat(),
+            "orders": row.orders,
+            "items": row.items,
+            "revenue": _money(row.revenue),
+            "averageTicket": _average_ticket(row.revenue, row.orders),
+        }
+        for row in rows
+    ]
+
+
+@router.get("/top-products")
+async def top_products(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(require_admin),
+):
+    """Produtos mais vendidos por quantidade no período."""
+    quantity = func.sum(SalesProductDaily.quantity).label("quantity")
+    rows = (
+        await db.execute(
+            select(
+                SalesProductDaily.product_id,
+                func.max(SalesProductDaily.title).label("title"),
+                quantity,
+                func.sum(SalesProductDaily.revenue).label("revenue"),
+            )
+            .where(*_in_period(SalesProductDaily.day, date_from, date_to))
+            .group_by(SalesProductDaily.product_id)
+            .having(quantity > 0)
+            .order_by(quantity.desc(), SalesProductDaily.product_id)
+            .limit(limit)
+        )
+    ).all()
+    return [
+        {
+            "productId": row.product_id,
+            "title": row.title,
+            "quantity": int(row.quantity),
+            "revenue": _money(row.revenue),
+        }
+        for row in rows
+    ]
+
+
+@router.get("/categories")
+async def revenue_by_category(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(require_admin),
+):
+    """
+    Quantidade e receita por categoria no período.
+
+    A categoria é a atual do produto; vendas de produtos excluídos aparecem
+    como "Sem categoria".
+    """
+    category = func.coalesce(Product.category, "Sem categoria").label("category")
+    revenue = func.sum(SalesProductDaily.revenue).label("revenue")
+    rows = (
+        await db.execute(
+            select(category, func.sum(SalesProductDaily.quantity).label("quantity"), revenue)
+            .select_from(SalesProductDaily)
+            .outerjoin(Product, Product.id == SalesProductDaily.product_id)
+            .where(*_in_period(SalesProductDaily.day, date_from, date_to))
+            .group_by(category)
+            .order_by(revenue.desc())
+        )
+    ).all()
+    return [
+        {"category": row.category, "quantity": int(row.quantity), "revenue": _money(row.revenue)}
+        for row in rows
+        if row.quantity
+    ]
+
+
+@router.get("/status")
+async def orders_by_status(
+    db: AsyncSession = Depends(get_read_db),
+    admin: User = Depends(require_admin),
+):
+    """Quantidade atual de pedidos em cada status."""
+    # Uma linha por status: a varredura da tabela é mais barata que um índice.
+    rows = (
+        await db.scalars(select(OrderStatusCount).where(OrderStatusCount.count > 0))  # index-check: ignore
+    ).all()
+    return {row.status: row.count for row in rows}
+
+
+@router.post("/rebuild")
+async def rebuild_rollups(
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """Recalcula os agregados a partir de todos os pedidos (backfill/correção)."""
+    await analytics.rebuild(db)
+    return {"success": True, "message": "Agregados de vendas recalculados."}
@@ -3,20 +3,23 @@ Endpoints de autenticação.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.read_routing import read_router
 from app.dependencies.auth import get_current_user
 from app.models.user import User
 from app.schemas.user import UserLogin, UserRegister, UserResponse
+from app.services.user_cache import invalidate_user
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(payload: UserRegister, db: Session = Depends(get_db)):
+async def register(payload: UserRegister, db: AsyncSession = Depends(get_db)):
     """Registrar novo usuário (role 'user')."""
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = await db.scalar(select(User).where(User.email == payload.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -30,15 +33,19 @@ def register(payload: UserRegister, db: Session = Depends(get_db)):
         role="user",
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    # Remove um eventual "não encontrado" cacheado para este email e mantém
+    # as próximas leituras do usuário no primário (a réplica pode não ter a conta ainda).
+    invalidate_user(user.email)
+    read_router.mark_write(user.email)
     return user
 
 
 @router.post("/login", response_model=UserResponse)
-def login(payload: UserLogin, db: Session = Depends(get_db)):
+async def login(payload: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login por email + senha (simplificado)."""
-    user = db.query(User).filter(User.email == payload.email).first()
+    user = await db.scalar(select(User).where(User.email == payload.email))
     if not user or user.password != payload.password:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,6 +55,6 @@ def login(payload: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(user: User = Depends(get_current_user)):
+async def get_me(user: User = Depends(get_current_user)):
     """Retorna o usuário logado baseado no header X-User-Email."""
     return user
@@ -2,26 +2,31 @@
 Endpoint de Contato.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import get_db
 from app.schemas.contact import ContactForm, ContactResponse
-from app.services.email_service import send_contact_email
+from app.services.email_service import build_contact_email, email_dispatcher, queue_email
 
 router = APIRouter()
 
 
 @router.post("", response_model=ContactResponse)
-def submit_contact(payload: ContactForm):
-    """Recebe formulário de contato e envia email via Resend."""
-    success = send_contact_email(payload)
-
-    if success:
+async def submit_contact(payload: ContactForm, db: AsyncSession = Depends(get_db)):
+    """Recebe formulário de contato e agenda o envio do email via Resend."""
+    try:
+        outbox = queue_email(db, build_contact_email(payload))
+        await db.commit()
+    except Exception as e:
+        print(f"[contact] ✗ Erro ao registrar mensagem de contato: {e}")
         return ContactResponse(
-            success=True,
-            message="Mensagem enviada com sucesso! Responderemos em breve.",
+            success=False,
+            message="Não foi possível enviar a mensagem no momento. Tente novamente mais tarde.",
         )
 
+    email_dispatcher.notify(outbox.id)
     return ContactResponse(
-        success=False,
-        message="Não foi possível enviar a mensagem no momento. Tente novamente mais tarde.",
+        success=True,
+        message="Mensagem enviada com sucesso! Responderemos em breve.",
     )
@@ -2,44 +2,201 @@
 Endpoints de Notificações.
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
 
-from app.core.database import get_db
-from app.dependencies.auth import get_current_user
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal, get_db, utcnow
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+)
+from app.core.read_routing import get_read_db
+from app.dependencies.auth import get_current_user, resolve_user
 from app.models.notification import Notification
 from app.models.user import User
 from app.schemas.notification import NotificationResponse
+from app.services.notification_broker import notification_broker
+from app.services.unread_counter import unread_counter
+
+settings = get_settings()
 
 router = APIRouter()
 
 
+def _role_for(user: User) -> str:
+    return "admin" if user.role == "admin" else "customer"
+
+
+async def _parse_after(after: str, role: str, db: AsyncSession) -> tuple[datetime, str]:
+    """
+    Converte `after` (id de notificação ou timestamp ISO) no par (created_at, id).
+
+    Um timestamp puro usa `""` como id, que é menor que qualquer id real.
+    """
+    try:
+        return datetime.fromisoformat(after), ""
+    except ValueError:
+        pass
+    created_at = await db.scalar(
+        select(Notification.created_at).where(Notification.id == after, Notification.role == role)
+    )
+    if created_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parâmetro 'after' inválido: notificação não encontrada.",
+        )
+    return created_at, after
+
+
 @router.get("")
-def list_notifications(
-    db: Session = Depends(get_db),
+async def list_notifications(
+    response: Response,
+    after: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
-    """Listar notificações baseado na role do usuário."""
-    role = "admin" if user.role == "admin" else "customer"
-    notifications = (
-        db.query(Notification)
-        .filter(Notification.role == role)
-        .order_by(Notification.created_at.desc())
-        .all()
-    )
+    """
+    Listar notificações baseado na role do usuário.
+
+    - Sem parâmetros: as mais recentes primeiro; páginas mais antigas via
+      `cursor` (header `X-Next-Cursor`).
+    - `after=<id|timestamp>`: apenas as criadas depois do item/instante
+      informado, em ordem cronológica — para o cliente buscar só o que é
+      novo desde o último poll. Se vierem `limit` itens, repita com o id do
+      último recebido.
+
+    O `created_at` é gravado antes do commit; uma notificação cuja transação
+    termina depois ficaria atrás de um cursor que o cliente já passou e
+    nunca seria entregue. Por isso o feed `after=` só entrega notificações
+    com mais de `NOTIFICATION_FEED_SETTLE_SECONDS` — o tempo real vem pelo
+    stream SSE.
+    """
+    role = _role_for(user)
+    query = select(Notification).where(Notification.role == role)
+
+    if after is not None:
+        last_created_at, last_id = await _parse_after(after, role, db)
+        settled = utcnow() - timedelta(seconds=settings.NOTIFICATION_FEED_SETTLE_SECONDS)
+        query = query.where(
+            keyset_after(Notification.created_at, last_created_at, Notification.id, last_id),
+            Notification.created_at <= settled,
+        ).order_by(Notification.created_at.asc(), Notification.id.asc())
+        notifications = (await db.scalars(query.limit(limit))).all()
+        return [NotificationResponse.model_validate(n).model_dump() for n in notifications]
+
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            last_created_at = datetime.fromisoformat(last_created_at)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido.",
+            )
+        query = query.where(
+            keyset_after(Notification.created_at, last_created_at, Notification.id, last_id, descending=True)
+        )
+
+    query = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1)
+    notifications = (await db.scalars(query)).all()
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        last = notifications[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at.isoformat(), last.id)
+
     return [NotificationResponse.model_validate(n).model_dump() for n in notifications]
 
 
+@router.get("/unread-count")
+async def unread_notifications_count(
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    """Quantidade de notificações não lidas da role (servida do contador em memória)."""
+    return {"unread": await unread_counter.get(_role_for(user), db)}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    x_user_email: Optional[str] = Header(default=None),
+    email: Optional[str] = Query(default=None),
+):
+    """
+    Stream SSE com as novas notificações da role do usuário.
+
+    O `EventSource` do navegador não envia headers customizados, então o
+    email também é aceito via query string (`?email=`). A sessão do banco é
+    usada só para resolver o usuário e é fechada antes do stream começar:
+    uma conexão SSE ociosa não segura conexão do pool.
+    """
+    user_email = x_user_email or email
+    if not user_email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Header X-User-Email obrigatório.",
+        )
+    async with SessionLocal() as db:
+        user = await resolve_user(user_email, db)
+    role = _role_for(user)
+
+    queue = notification_broker.subscribe(role)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.NOTIFICATION_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comentário SSE: mantém proxies e o navegador com a conexão aberta.
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {event.id}\nevent: notification\ndata: {event.data}\n\n"
+        finally:
+            notification_broker.unsubscribe(role, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.patch("/read")
-def mark_notifications_read(
-    db: Session = Depends(get_db),
+async def mark_notifications_read(
+    up_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Marcar todas as notificações como lidas."""
-    role = "admin" if user.role == "admin" else "customer"
-    db.query(Notification).filter(
-        Notification.role == role,
-        Notification.read == False,
-    ).update({"read": True})
-    db.commit()
+    """
+    Marcar notificações como lidas.
+
+    O UPDATE só alcança as não lidas da role (range no índice
+    `(role, read, created_at)`); `up_to` restringe às criadas até o instante
+    informado — tipicamente o `createdAt` da mais recente que o cliente exibiu.
+    """
+    role = _role_for(user)
+    conditions = [Notification.role == role, Notification.read == False]
+    if up_to is not None:
+        conditions.append(Notification.created_at <= up_to)
+
+    result = await db.execute(update(Notification).where(*conditions).values(read=True))
+    await db.commit()
+    unread_counter.on_marked_read(role, result.rowcount)
     return {"success": True, "message": "Notificações marcadas como lidas."}
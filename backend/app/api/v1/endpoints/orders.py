@@ -2,50 +2,186 @@
 Endpoints de Pedidos.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.database import get_db, utcnow
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+)
+from app.core.read_routing import get_read_db
 from app.dependencies.auth import get_current_user, require_admin
 from app.models.notification import Notification
-from app.models.order import Order, OrderItem
+from app.models.order import Order, OrderItem, new_order_id
 from app.models.user import User
-from app.schemas.order import OrderCreate, OrderResponse, OrderStatusUpdate
-from app.services.email_service import send_order_confirmation_email
+from app.schemas.order import OrderCreate, OrderItemResponse, OrderResponse, OrderStatusUpdate
+from app.services.analytics import record_order_created, record_status_change
+from app.services.email_service import build_order_confirmation_email, email_dispatcher, queue_email
+from app.services.idempotency import IdempotentRequest, run_idempotent
+from app.services.notification_broker import notification_broker
+from app.services.order_export import ExportFormat, export_orders
+from app.services.pricing import price_order
+from app.services.stock import release_stock, reserve_stock
 
 router = APIRouter()
 
 
+def _stock_items(order: Order) -> list[tuple[str, int]]:
+    return [(item.product_id, item.quantity) for item in order.items]
+
+
+async def _insert_order_items(db: AsyncSession, order_id: str, rows: list[dict]) -> list[int]:
+    """
+    Insere todos os itens do pedido de uma vez e devolve seus ids, na ordem de `rows`.
+
+    Pelo ORM, cada item com id autoincremento vira um INSERT separado para
+    recuperar o id gerado. Aqui vai um único executemany (que o driver do
+    MySQL reescreve como INSERT multi-linha) seguido de um SELECT dos ids
+    pelo `order_id` — os ids de um INSERT multi-linha crescem na ordem das
+    linhas.
+    """
+    await db.execute(insert(OrderItem), rows)
+    return list(
+        await db.scalars(select(OrderItem.id).where(OrderItem.order_id == order_id).order_by(OrderItem.id))
+    )
+
+
+def _order_response(order: Order, items: list[OrderItemResponse]) -> dict:
+    return OrderResponse(
+        id=order.id,
+        date=order.date,
+        items=items,
+        subtotal=order.subtotal,
+        shipping_cost=order.shipping_cost,
+        total=order.total,
+        delivery_method=order.delivery_method,
+        shipping_info=order.shipping_info,
+        pickup_address=order.pickup_address,
+        customer_name=order.customer_name,
+        customer_email=order.customer_email,
+        payment_info=order.payment_info,
+        status=order.status,
+    ).model_dump()
+
+
 @router.get("")
-def list_orders(
-    db: Session = Depends(get_db),
+async def list_orders(
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
-    """Listar pedidos — admin vê todos, user vê apenas os seus."""
-    if user.role == "admin":
-        orders = db.query(Order).order_by(Order.date.desc()).all()
-    else:
-        orders = (
-            db.query(Order)
-            .filter(Order.user_email == user.email)
-            .order_by(Order.date.desc())
-            .all()
-        )
+    """
+    Listar pedidos — admin vê todos, user vê apenas os seus.
+
+    Mais recentes primeiro, paginados por cursor sobre (date, id); o cursor
+    da próxima página vem no header `X-Next-Cursor`. Os itens de todos os
+    pedidos da página são carregados em uma única consulta extra.
+    """
+    query = select(Order).options(selectinload(Order.items))
+    if user.role != "admin":
+        query = query.where(Order.user_email == user.email)
+    if status_filter is not None:
+        query = query.where(Order.status == status_filter)
+    if date_from is not None:
+        query = query.where(Order.date >= date_from)
+    if date_to is not None:
+        query = query.where(Order.date <= date_to)
+
+    if cursor:
+        last_date, last_id = decode_cursor(cursor, 2)
+        try:
+            last_date = datetime.fromisoformat(last_date)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginação inválido.",
+            )
+        query = query.where(keyset_after(Order.date, last_date, Order.id, last_id, descending=True))
+
+    query = query.order_by(Order.date.desc(), Order.id.desc()).limit(limit + 1)
+    orders = (await db.scalars(query)).all()
+    if len(orders) > limit:
+        orders = orders[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(orders[-1].date.isoformat(), orders[-1].id)
+
     return [OrderResponse.model_validate(o).model_dump() for o in orders]
 
 
+@router.get("/export")
+async def export_orders_report(
+    format: ExportFormat = "csv",
+    status_filter: Optional[str] = Query(None, alias="status"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    admin: User = Depends(require_admin),
+):
+    """
+    Exporta pedidos e itens (apenas admin) em CSV ou NDJSON, em stream.
+
+    Lido do banco em blocos com cursor do servidor, sem montar a lista
+    inteira em memória — adequado para períodos longos.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_orders(format, status_filter, date_from, date_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="pedidos.{format}"'},
+    )
+
+
 @router.post("", status_code=status.HTTP_201_CREATED)
-def create_order(
+async def create_order(
     payload: OrderCreate,
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Criar novo pedido, enviar email de confirmação e notificações."""
+    """
+    Criar novo pedido, enviar email de confirmação e notificações.
+
+    Com o header `Idempotency-Key`, repetições da mesma requisição devolvem
+    o pedido já criado em vez de criar outro.
+    """
+    return await run_idempotent(
+        f"orders:{user.email}",
+        idempotency_key,
+        payload,
+        lambda idempotent: _create_order(payload, db, user, idempotent),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+async def _create_order(payload: OrderCreate, db: AsyncSession, user: User, idempotent: IdempotentRequest) -> dict:
+    # Preços e totais recalculados no servidor (no máximo uma consulta).
+    priced = await price_order(db, payload)
+    # Reserva o estoque antes de qualquer insert: sem estoque, 409 e nada gravado.
+    await reserve_stock(db, ((item.id, item.quantity) for item in payload.items))
+
+    order_id = new_order_id()
     order = Order(
+        id=order_id,
+        date=utcnow(),
         user_email=user.email,
-        subtotal=payload.subtotal,
-        shipping_cost=payload.shipping_cost,
-        total=payload.total,
+        subtotal=float(priced.subtotal),
+        shipping_cost=float(priced.shipping_cost),
+        total=float(priced.total),
         delivery_method=payload.delivery_method,
         shipping_info=payload.shipping_info,
         pickup_address=payload.pickup_address,
@@ -55,71 +191,121 @@ def create_order(
         status="processando",
     )
     db.add(order)
-    db.flush()  # preenche order.id
-
-    for item in payload.items:
-        order_item = OrderItem(
-            order_id=order.id,
-            product_id=item.id,
-            title=item.title,
-            author=item.author or "",
-            type=item.type,
-            price=item.price,
-            quantity=item.quantity,
-            image=item.image or "",
-        )
-        db.add(order_item)
 
     # Notificações
     notif_customer = Notification(
         role="customer",
-        order_id=order.id,
+        order_id=order_id,
         type="order_created",
-        message=f"Seu pedido {order.id} foi recebido e está em processamento.",
+        message=f"Seu pedido {order_id} foi recebido e está em processamento.",
     )
     notif_admin = Notification(
         role="admin",
-        order_id=order.id,
+        order_id=order_id,
         type="order_created",
-        message=f"Novo pedido {order.id} realizado com total de R$ {order.total:,.2f}.".replace(",", "X").replace(".", ",").replace("X", "."),
+        message=f"Novo pedido {order_id} realizado com total de R$ {order.total:,.2f}.".replace(",", "X").replace(".", ",").replace("X", "."),
     )
     db.add_all([notif_customer, notif_admin])
-    db.commit()
-    db.refresh(order)
-
-    # Enviar email de confirmação (assíncrono simplificado)
-    try:
-        items_for_email = [
-            {"title": i.title, "type": i.type, "price": i.price, "quantity": i.quantity}
-            for i in payload.items
-        ]
-        send_order_confirmation_email(
-            order_id=order.id,
+
+    # Email de confirmação vai para a outbox na mesma transação do pedido;
+    # a entrega acontece em segundo plano, fora da latência do checkout.
+    items_for_email = [
+        {"title": i.title, "type": i.type, "price": float(price), "quantity": i.quantity}
+        for i, price in zip(payload.items, priced.item_prices)
+    ]
+    outbox = queue_email(
+        db,
+        build_order_confirmation_email(
+            order_id=order_id,
             customer_name=payload.customer.name,
             customer_email=payload.customer.email,
             total=order.total,
             items=items_for_email,
-        )
-    except Exception as e:
-        print(f"[orders] Aviso: falha ao enviar email de confirmação: {e}")
+        ),
+    )
+    # Pedido, notificações (um executemany) e outbox; os ids já vêm da aplicação.
+    await db.flush()
 
-    return OrderResponse.model_validate(order).model_dump()
+    item_rows = [
+        {
+            "order_id": order_id,
+            "product_id": item.id,
+            "title": item.title,
+            "author": item.author or "",
+            "type": item.type,
+            "price": float(price),
+            "quantity": item.quantity,
+            "image": item.image or "",
+        }
+        for item, price in zip(payload.items, priced.item_prices)
+    ]
+    item_ids = await _insert_order_items(db, order_id, item_rows)
+    # Agregados de vendas por último: as linhas mais disputadas (o dia
+    # corrente) ficam travadas pelo menor tempo possível antes do commit.
+    await record_order_created(
+        db, order, [(row["product_id"], row["title"], row["quantity"], row["price"]) for row in item_rows]
+    )
+
+    # Resposta montada do que já está em memória, sem reler o pedido, e
+    # gravada para a Idempotency-Key no mesmo commit do pedido.
+    items = [OrderItemResponse(id=item_id, **row) for item_id, row in zip(item_ids, item_rows)]
+    response = _order_response(order, items)
+    await idempotent.record(db, response)
+    await db.commit()
+    email_dispatcher.notify(outbox.id)
+    notification_broker.publish(notif_customer, notif_admin)
+    return response
+
+
+async def _claim_status(db: AsyncSession, order: Order, new_status: str) -> Optional[str]:
+    """
+    Troca o status do pedido só se ele ainda for o que foi lido; devolve o anterior.
+
+    UPDATE condicional (`WHERE status = <lido>`) antes de mexer no estoque:
+    de duas requisições concorrentes para o mesmo pedido só uma aplica a
+    transição (e devolve/reserva estoque); a outra recebe 409.
+    """
+    previous_status = order.status
+    current = Order.status.is_(None) if previous_status is None else Order.status == previous_status
+    result = await db.execute(
+        update(Order)
+        .where(Order.id == order.id, current)
+        .values(status=new_status)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="O pedido foi alterado por outra requisição. Atualize e tente novamente.",
+        )
+    set_committed_value(order, "status", new_status)
+    return previous_status
 
 
 @router.patch("/{order_id}/status")
-def update_order_status(
+async def update_order_status(
     order_id: str,
     payload: OrderStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(require_admin),
 ):
     """Alterar status de um pedido (apenas admin)."""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
+    )
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pedido não encontrado.")
 
-    order.status = payload.status
-    
+    # Entrar em "cancelado" devolve o estoque; sair dele reserva de novo.
+    previous_status = await _claim_status(db, order, payload.status)
+    was_cancelled = (previous_status or "").lower() == "cancelado"
+    is_cancelled = payload.status.lower() == "cancelado"
+    if is_cancelled and not was_cancelled:
+        await release_stock(db, _stock_items(order))
+    elif was_cancelled and not is_cancelled:
+        await reserve_stock(db, _stock_items(order))
+
     # Mensagem de notificação baseada no status
     status_lower = payload.status.lower()
     messages = {
@@ -138,19 +324,22 @@ def update_order_status(
         message=message,
     )
     db.add(notif)
-    db.commit()
-    db.refresh(order)
+    await record_status_change(db, order, previous_status, payload.status)
+    await db.commit()
+    notification_broker.publish(notif)
     return OrderResponse.model_validate(order).model_dump()
 
 
 @router.patch("/{order_id}/cancel")
-def cancel_order(
+async def cancel_order(
     order_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """Cancelar pedido (cliente ou admin)."""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
+    )
     if not order:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pedido não encontrado.")
 
@@ -165,7 +354,8 @@ def cancel_order(
             detail="Este pedido não pode mais ser cancelado.",
         )
 
-    order.status = "cancelado"
+    previous_status = await _claim_status(db, order, "cancelado")
+    await release_stock(db, _stock_items(order))
 
     # Notificação para admin
     notif = Notification(
@@ -175,6 +365,7 @@ def cancel_order(
         message=f"O cliente solicitou o cancelamento do pedido {order_id}.",
     )
     db.add(notif)
-    db.commit()
-    db.refresh(order)
+    await record_status_change(db, order, previous_status, "cancelado")
+    await db.commit()
+    notification_broker.publish(notif)
     return OrderResponse.model_validate(order).model_dump()
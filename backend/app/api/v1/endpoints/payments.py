@@ -1,9 +1,15 @@
+import binascii
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from functools import lru_cache
 from urllib.parse import quote_plus
+from typing import Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
 
 from app.schemas.payment import (
     PaymentConfirmResponse,
@@ -13,10 +19,11 @@ from app.schemas.payment import (
     PaymentStatus,
     PixPaymentData,
 )
+from app.services.idempotency import IdempotentRequest, run_idempotent
+from app.services.payment_store import payment_store
 
 router = APIRouter()
 
-_PAYMENT_STORE: dict[str, PaymentResponse] = {}
 _PIX_FIXED_KEY = "6841c4e9-5744-434c-81d0-821b48846b22"
 
 
@@ -24,35 +31,39 @@ def _format_emv_field(field_id: str, value: str) -> str:
     return f"{field_id}{len(value):02d}{value}"
 
 
-def _calculate_crc16_ccitt(payload: str) -> str:
-    crc = 0xFFFF
-    polynomial = 0x1021
+def _calculate_crc16_ccitt(payload: str, crc: int = 0xFFFF) -> str:
+    """
+    CRC16-CCITT (polinômio 0x1021, valor inicial 0xFFFF) exigido pelo BR Code.
 
-    for char in payload:
-        crc ^= ord(char) << 8
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = ((crc << 1) ^ polynomial) & 0xFFFF
-            else:
-                crc = (crc << 1) & 0xFFFF
+    `binascii.crc_hqx` implementa exatamente esse CRC com tabela em C; `crc`
+    permite continuar o cálculo a partir de um prefixo já processado.
+    """
+    return f"{binascii.crc_hqx(payload.encode('utf-8'), crc):04X}"
 
-    return f"{crc:04X}"
 
+@lru_cache(maxsize=32)
+def _pix_static_segments(pix_key: str, merchant_name: str, merchant_city: str) -> tuple[str, int, str]:
+    """
+    Partes do BR Code que não dependem do valor, calculadas uma vez por recebedor.
 
-def _build_pix_br_code(pix_key: str, merchant_name: str, merchant_city: str, amount: Decimal) -> str:
+    Retorna o prefixo (campos 00 a 53), o CRC parcial desse prefixo e o
+    sufixo (campos 58 a 62 mais o cabeçalho "6304" do CRC).
+    """
     merchant_account_info = (
         _format_emv_field("00", "BR.GOV.BCB.PIX")
         + _format_emv_field("01", pix_key)
     )
-
-    payload = "".join(
+    prefix = "".join(
         [
             _format_emv_field("00", "01"),
             _format_emv_field("01", "12"),
             _format_emv_field("26", merchant_account_info),
             _format_emv_field("52", "0000"),
             _format_emv_field("53", "986"),
-            _format_emv_field("54", f"{amount:.2f}"),
+        ]
+    )
+    suffix = "".join(
+        [
             _format_emv_field("58", "BR"),
             _format_emv_field("59", merchant_name[:25]),
             _format_emv_field("60", merchant_city[:15]),
@@ -60,9 +71,14 @@ def _build_pix_br_code(pix_key: str, merchant_name: str, merchant_city: str, amo
             "6304",
         ]
     )
+    return prefix, binascii.crc_hqx(prefix.encode("utf-8"), 0xFFFF), suffix
+
 
-    crc = _calculate_crc16_ccitt(payload)
-    return f"{payload}{crc}"
+def _build_pix_br_code(pix_key: str, merchant_name: str, merchant_city: str, amount: Decimal) -> str:
+    prefix, prefix_crc, suffix = _pix_static_segments(pix_key, merchant_name, merchant_city)
+    variable = _format_emv_field("54", f"{amount:.2f}") + suffix
+    crc = _calculate_crc16_ccitt(variable, prefix_crc)
+    return f"{prefix}{variable}{crc}"
 
 
 @router.get("/options")
@@ -75,7 +91,25 @@ def list_payment_options() -> dict[str, list[str]]:
 
 
 @router.post("", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
-def create_payment(payload: PaymentCreateRequest) -> PaymentResponse:
+async def create_payment(
+    payload: PaymentCreateRequest,
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+) -> PaymentResponse:
+    # Com `Idempotency-Key`, um retry após timeout devolve a mesma transação.
+    # A rota não é autenticada: o escopo da chave é o cliente e o pedido.
+    return await run_idempotent(
+        f"payments:{payload.customer.email.lower()}:{payload.order_id or ''}",
+        idempotency_key,
+        payload,
+        lambda idempotent: _create_payment(payload, db, idempotent),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+async def _create_payment(
+    payload: PaymentCreateRequest, db: AsyncSession, idempotent: IdempotentRequest
+) -> PaymentResponse:
     if payload.method == PaymentMethod.CARD and payload.card is None:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -112,7 +146,7 @@ def create_payment(payload: PaymentCreateRequest) -> PaymentResponse:
                 expires_at=expires_at,
             ),
         )
-        _PAYMENT_STORE[transaction_id] = response
+        await _save_new_payment(db, idempotent, response, payload.order_id)
         return response
 
     response = PaymentResponse(
@@ -124,13 +158,22 @@ def create_payment(payload: PaymentCreateRequest) -> PaymentResponse:
         currency=payload.currency,
         message="Pagamento com cartão aprovado.",
     )
-    _PAYMENT_STORE[transaction_id] = response
+    await _save_new_payment(db, idempotent, response, payload.order_id)
     return response
 
 
+async def _save_new_payment(
+    db: AsyncSession, idempotent: IdempotentRequest, payment: PaymentResponse, order_id: Optional[str]
+) -> None:
+    """Grava a transação e a resposta da Idempotency-Key num único commit."""
+    await payment_store.create(db, payment, order_id=order_id)
+    await idempotent.record(db, payment)
+    await db.commit()
+
+
 @router.post("/{transaction_id}/confirm", response_model=PaymentConfirmResponse)
-def confirm_pix_payment(transaction_id: str) -> PaymentConfirmResponse:
-    payment = _PAYMENT_STORE.get(transaction_id)
+async def confirm_pix_payment(transaction_id: str) -> PaymentConfirmResponse:
+    payment = await payment_store.get(transaction_id)
     if payment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transação não encontrada.")
 
@@ -147,9 +190,15 @@ def confirm_pix_payment(transaction_id: str) -> PaymentConfirmResponse:
             message="Pagamento PIX já estava confirmado.",
         )
 
+    if payment.pix is not None and payment.pix.expires_at <= datetime.now(timezone.utc):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Este PIX expirou. Gere um novo pagamento.",
+        )
+
     payment.status = PaymentStatus.APPROVED
     payment.message = "Pagamento PIX confirmado com sucesso."
-    _PAYMENT_STORE[transaction_id] = payment
+    await payment_store.update(payment)
 
     return PaymentConfirmResponse(
         transaction_id=transaction_id,
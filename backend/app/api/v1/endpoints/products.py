@@ -2,41 +2,202 @@
 Endpoints de Produtos (CRUD).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
 
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING
 from app.core.database import get_db
+from app.core.http_cache import conditional_response, serialize, with_etag
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+)
+from app.core.read_routing import CATALOG, get_catalog_read_db, read_router, replica_may_be_stale
 from app.dependencies.auth import require_admin
 from app.models.product import Product
 from app.models.user import User
-from app.schemas.product import ProductCreate, ProductResponse, ProductUpdate
+from app.schemas.product import ProductCreate, ProductResponse, ProductUpdate, serialize_product
+from app.services.catalog_cache import catalog_cache
+from app.services.product_bulk import BulkFormat, export_products, import_products
+from app.services.search_index import search_index
 
 router = APIRouter()
 
+# Ordenações disponíveis: coluna de ordenação e se é decrescente.
+# Todas desempatam por `id` e são cobertas pelos índices de `Product`.
+ProductSort = Literal["title", "price_asc", "price_desc", "rating"]
+_SORTS = {
+    "title": (Product.title, False),
+    "price_asc": (Product.price, False),
+    "price_desc": (Product.price, True),
+    "rating": (Product.rating, True),
+}
+
 
 @router.get("")
-def list_products(db: Session = Depends(get_db)):
-    """Lista todos os produtos."""
-    products = db.query(Product).all()
-    return [ProductResponse.model_validate(p).model_dump() for p in products]
+async def list_products(
+    request: Request,
+    category: Optional[str] = None,
+    type: Optional[str] = None,
+    is_new: Optional[bool] = None,
+    is_best_seller: Optional[bool] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    sort: ProductSort = "title",
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_catalog_read_db),
+):
+    """
+    Lista produtos com filtros e paginação por cursor.
+
+    O cursor da próxima página é devolvido no header `X-Next-Cursor`
+    (ausente quando não há mais resultados). A página é servida já
+    serializada, com ETag; `If-None-Match` válido recebe 304.
+    """
+    cache_key = ("list", category, type, is_new, is_best_seller, min_price, max_price, sort, cursor, limit)
+    cached = catalog_cache.get(cache_key)
+    if cached is MISSING:
+        cached = await _load_product_page(
+            request, db, cache_key, category, type, is_new, is_best_seller, min_price, max_price, sort, cursor, limit
+        )
+
+    serialized, next_cursor = cached
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return conditional_response(serialized, if_none_match, headers)
+
+
+async def _load_product_page(request, db, cache_key, category, type, is_new, is_best_seller, min_price, max_price, sort, cursor, limit):
+    """Consulta uma página do catálogo, serializa e grava no cache."""
+    version = catalog_cache.version
+    sort_column, descending = _SORTS[sort]
+
+    query = select(Product)
+    if category is not None:
+        query = query.where(Product.category == category)
+    if type is not None:
+        query = query.where(Product.type == type)
+    if is_new is not None:
+        query = query.where(Product.is_new == is_new)
+    if is_best_seller is not None:
+        query = query.where(Product.is_best_seller == is_best_seller)
+    if min_price is not None:
+        query = query.where(Product.price >= min_price)
+    if max_price is not None:
+        query = query.where(Product.price <= max_price)
+
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, 2)
+        query = query.where(keyset_after(sort_column, last_value, Product.id, last_id, descending))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), Product.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Product.id.asc())
+
+    # Busca um item a mais para saber se existe próxima página.
+    products = (await db.scalars(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        last = products[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), last.id)
+
+    # Cada produto é serializado uma vez e reaproveitado tanto pela página
+    # quanto pelo cache de `get_product`.
+    cacheable = not replica_may_be_stale(request, CATALOG)
+    bodies = []
+    for product in products:
+        serialized = serialize(serialize_product(product))
+        if cacheable:
+            catalog_cache.put(("product", product.id), serialized, version)
+        bodies.append(serialized.body)
+
+    page = (with_etag(b"[" + b",".join(bodies) + b"]"), next_cursor)
+    if cacheable:
+        catalog_cache.put(cache_key, page, version)
+    return page
+
+
+@router.get("/cache/stats")
+async def catalog_cache_stats(admin: User = Depends(require_admin)):
+    """Estatísticas do cache do catálogo (apenas admin)."""
+    return catalog_cache.stats()
+
+
+@router.get("/search")
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Busca textual em título, autor, categoria e descrição.
+
+    Ignora acentos e caixa e casa prefixos ("progr" encontra "Programação"),
+    então serve também para typeahead. Respondida do índice em memória, sem
+    consulta ao banco; resultados do mais ao menos relevante.
+    """
+    product_ids = search_index.search(q, limit)
+    return Response(content=search_index.render(product_ids), media_type="application/json")
+
+
+@router.get("/export")
+async def export_catalog(
+    format: BulkFormat = "ndjson",
+    admin: User = Depends(require_admin),
+):
+    """
+    Exporta o catálogo inteiro (apenas admin) como NDJSON ou CSV.
+
+    Enviado em stream, lido do banco em blocos; o formato é o mesmo aceito
+    por `POST /products/bulk`.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_products(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="produtos.{format}"'},
+    )
 
 
 @router.get("/{product_id}")
-def get_product(product_id: str, db: Session = Depends(get_db)):
-    """Busca um produto por ID."""
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Produto não encontrado.",
-        )
-    return ProductResponse.model_validate(product).model_dump()
+async def get_product(
+    product_id: str,
+    request: Request,
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_catalog_read_db),
+):
+    """Busca um produto por ID (resposta pré-serializada, com ETag)."""
+    cache_key = ("product", product_id)
+    serialized = catalog_cache.get(cache_key)
+    if serialized is MISSING:
+        version = catalog_cache.version
+        product = await db.scalar(select(Product).where(Product.id == product_id))
+        if not product:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Produto não encontrado.",
+            )
+        serialized = serialize(serialize_product(product))
+        if not replica_may_be_stale(request, CATALOG):
+            catalog_cache.put(cache_key, serialized, version)
+
+    return conditional_response(serialized, if_none_match)
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-def create_product(
+async def create_product(
     payload: ProductCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(require_admin),
 ):
     """Cadastrar novo produto (apenas admin)."""
@@ -54,20 +215,48 @@ def create_product(
         is_best_seller=payload.is_best_seller,
     )
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    catalog_cache.invalidate()
+    read_router.mark_write(CATALOG)
+    await db.refresh(product)
+    search_index.upsert(product)
     return ProductResponse.model_validate(product).model_dump()
 
 
+@router.post("/bulk")
+async def bulk_import_products(
+    request: Request,
+    format: Optional[BulkFormat] = None,
+    admin: User = Depends(require_admin),
+):
+    """
+    Importa produtos em massa (apenas admin) a partir de NDJSON ou CSV.
+
+    O formato vem de `format` ou do `Content-Type` (`text/csv` → CSV, senão
+    NDJSON). Cada linha/registro traz os campos de `ProductCreate` e,
+    opcionalmente, `id`: se existir, o produto é atualizado. Linhas inválidas
+    não interrompem a importação e voltam no relatório com o número da linha.
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    report = await import_products(request.stream(), format)
+    if report["upserted"]:
+        catalog_cache.invalidate()
+        read_router.mark_write(CATALOG)
+        search_index.request_rebuild()
+    return report
+
+
 @router.put("/{product_id}")
-def update_product(
+async def update_product(
     product_id: str,
     payload: ProductUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(require_admin),
 ):
     """Atualizar produto existente (apenas admin)."""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,23 +267,29 @@ def update_product(
     for field, value in update_data.items():
         setattr(product, field, value)
 
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    catalog_cache.invalidate()
+    read_router.mark_write(CATALOG)
+    await db.refresh(product)
+    search_index.upsert(product)
     return ProductResponse.model_validate(product).model_dump()
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(
+async def delete_product(
     product_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: User = Depends(require_admin),
 ):
     """Excluir produto (apenas admin)."""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.scalar(select(Product).where(Product.id == product_id))
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Produto não encontrado.",
         )
-    db.delete(product)
-    db.commit()
+    await db.delete(product)
+    await db.commit()
+    catalog_cache.invalidate()
+    read_router.mark_write(CATALOG)
+    search_index.remove(product_id)
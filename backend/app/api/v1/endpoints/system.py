@@ -0,0 +1,35 @@
+"""
+Endpoints operacionais (apenas admin).
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.core.config import get_settings
+from app.core.pool import all_pool_status, pool_sizing
+from app.dependencies.auth import require_admin
+from app.models.user import User
+
+router = APIRouter()
+
+settings = get_settings()
+
+
+@router.get("/pool")
+async def connection_pool_stats(admin: User = Depends(require_admin)):
+    """
+    Dimensionamento e estado do pool de conexões deste worker.
+
+    `maxConnectionsPerInstance` (todos os workers) vezes o número de réplicas
+    deve caber no `max_connections` do MySQL.
+    """
+    pool_size, max_overflow = pool_sizing()
+    return {
+        "workers": settings.WEB_CONCURRENCY,
+        "connectionBudget": settings.DB_CONNECTION_BUDGET,
+        "maxConnectionsPerInstance": settings.WEB_CONCURRENCY * (pool_size + max_overflow),
+        "poolSizePerWorker": pool_size,
+        "maxOverflowPerWorker": max_overflow,
+        "recycleSeconds": settings.DB_POOL_RECYCLE_SECONDS,
+        "prePing": settings.DB_POOL_PRE_PING,
+        "pools": all_pool_status(),
+    }
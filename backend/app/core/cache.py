@@ -0,0 +1,94 @@
+"""
+Cache em memória com expiração por TTL e despejo LRU.
+
+Usado pelos caches in-process da aplicação (catálogo, etc.). É local a cada
+processo/worker do uvicorn: invalidações não se propagam entre workers, que
+dependem do TTL para convergir.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+# Sentinela para diferenciar "não está no cache" de um valor `None` cacheado.
+MISSING = object()
+
+
+class TTLCache:
+    """Mapa limitado a `max_entries`, com entradas que expiram após `ttl` segundos."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Retorna o valor cacheado ou `MISSING`."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def purge(self, predicate: Callable[[Any], bool] | None = None) -> int:
+        """Remove entradas expiradas e, se informado, as que satisfazem `predicate`."""
+        now = time.monotonic()
+        with self._lock:
+            doomed = [
+                key
+                for key, (expires_at, value) in self._data.items()
+                if expires_at <= now or (predicate is not None and predicate(value))
+            ]
+            for key in doomed:
+                del self._data[key]
+            self.expirations += len(doomed)
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -1,60 +1,160 @@
 """
-Configuração do banco de dados SQLAlchemy com MySQL.
+Configuração do banco de dados SQLAlchemy (assíncrono) com MySQL.
+
+Os endpoints usam `AsyncSession` sobre um engine assíncrono (aiomysql em
+produção, aiosqlite para desenvolvimento local e testes), de modo que um
+único worker do uvicorn mantenha muitas requisições em andamento enquanto
+elas aguardam o banco, sem depender do threadpool.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+import asyncio
+import hashlib
+import random
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 from app.core.config import get_settings
+from app.core.metrics import instrument_engine
+from app.core.pool import InstrumentedQueuePool, pool_sizing, register_engine
 
 settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+# Driver assíncrono usado para cada backend quando a URL aponta para um síncrono.
+_ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Converte `mysql+pymysql://...`/`sqlite://...` na URL do driver assíncrono equivalente."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver and url.get_driver_name() != driver:
+        url = url.set(drivername=f"{backend}+{driver}")
+    return url.render_as_string(hide_password=False)
+
+
+def _engine_options(database_url: str, pool_name: str) -> dict:
+    """Parâmetros de pool (o SQLite local não usa pool com limite de conexões)."""
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    pool_size, max_overflow = pool_sizing()
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_logging_name": pool_name,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL),
+    **_engine_options(settings.DATABASE_URL, "primary"),
 )
+# Conta consultas e tempo de banco (global e por requisição) para o /metrics.
+instrument_engine(engine)
+register_engine("primary", engine)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Réplica de leitura opcional (ver app/core/read_routing.py): usada pelos GETs.
+read_engine = None
+if settings.READ_REPLICA_URL:
+    read_engine = create_async_engine(
+        to_async_url(settings.READ_REPLICA_URL),
+        **_engine_options(settings.READ_REPLICA_URL, "replica"),
+    )
+    instrument_engine(read_engine)
+    register_engine("replica", read_engine)
+
+# `expire_on_commit=False`: objetos continuam legíveis após o commit sem
+# disparar um lazy load (que não é permitido em sessões assíncronas).
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+ReadSessionLocal = (
+    async_sessionmaker(read_engine, expire_on_commit=False, autoflush=False) if read_engine is not None else None
+)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    """Dependency que fornece uma sessão do banco de dados."""
-    db = SessionLocal()
-    try:
+def utcnow() -> datetime:
+    """Horário UTC sem fuso (naive), no formato das colunas `DateTime` do banco."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def upsert(dialect_name: str, table, conflict_columns: list[str], update: Callable[[Any], dict]) -> Insert:
+    """
+    INSERT que atualiza a linha existente em caso de conflito de chave.
+
+    Gera `ON DUPLICATE KEY UPDATE` no MySQL e `ON CONFLICT (...) DO UPDATE`
+    no SQLite/PostgreSQL. `update` recebe as colunas da linha proposta
+    (`inserted`/`excluded`) e devolve o mapeamento coluna → novo valor.
+    Funciona com executemany (lista de linhas em `execute`).
+    """
+    if dialect_name == "mysql":
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update(update(statement.inserted))
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect = sqlite if dialect_name == "sqlite" else postgresql
+        statement = dialect.insert(table)
+        return statement.on_conflict_do_update(index_elements=conflict_columns, set_=update(statement.excluded))
+    raise NotImplementedError(f"Upsert não suportado para o dialeto {dialect_name!r}")
+
+
+async def get_db():
+    """Dependency que fornece uma sessão assíncrona do banco de dados."""
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def create_tables():
-    """Cria todas as tabelas no banco de dados (com retry para aguardar MySQL)."""
-    import time
+def retry_delay(attempt: int) -> float:
+    """Espera antes da próxima tentativa: backoff exponencial com jitter completo."""
+    ceiling = min(settings.DB_STARTUP_RETRY_MAX_SECONDS, settings.DB_STARTUP_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
 
-    max_retries = 10
+
+async def with_startup_retries(operation: Callable[[], Awaitable[Any]], description: str) -> Any:
+    """
+    Executa `operation` tentando de novo enquanto o banco não responde (ex.: MySQL subindo).
+
+    O jitter evita que vários workers iniciados juntos tentem em sincronia.
+    """
+    max_retries = settings.DB_STARTUP_MAX_RETRIES
     for attempt in range(1, max_retries + 1):
         try:
-            Base.metadata.create_all(bind=engine)
-            return
+            return await operation()
         except Exception as e:
             if attempt == max_retries:
                 raise
-            print(f"[database] Tentativa {attempt}/{max_retries} falhou ({e.__class__.__name__}). Aguardando 3s...")
-            time.sleep(3)
+            delay = retry_delay(attempt)
+            print(
+                f"[database] {description}: tentativa {attempt}/{max_retries} falhou "
+                f"({e.__class__.__name__}). Nova tentativa em {delay:.1f}s..."
+            )
+            await asyncio.sleep(delay)
 
 
-def seed_data(db: Session):
+async def seed_data(db: AsyncSession):
     """Popula o banco com dados iniciais (apenas se vazio)."""
     from app.models.user import User
     from app.models.product import Product
 
     # Seed de usuários
-    if db.query(User).count() == 0:
+    if await db.scalar(select(func.count()).select_from(User)) == 0:
         admin = User(
             email="admin@compia.com",
             password="admin123",
@@ -68,11 +168,11 @@ def seed_data(db: Session):
             role="user",
         )
         db.add_all([admin, user])
-        db.commit()
+        await db.commit()
         print("[seed] ✓ Usuários criados (admin@compia.com / usuario@compia.com)")
 
     # Seed de produtos
-    if db.query(Product).count() == 0:
+    if await db.scalar(select(func.count()).select_from(Product)) == 0:
         products = [
             Product(
                 title="Inteligência Artificial: Uma Abordagem Moderna",
@@ -190,5 +290,90 @@ def seed_data(db: Session):
             ),
         ]
         db.add_all(products)
-        db.commit()
+        await db.commit()
         print(f"[seed] ✓ {len(products)} produtos criados")
+
+
+# Versão dos dados seed: incrementar quando `seed_data` passar a criar dados novos.
+SEED_VERSION = 1
+
+_SCHEMA_META_ID = 1
+
+
+def schema_fingerprint() -> str:
+    """
+    Impressão digital do schema: DDL dos modelos (compilado para o dialeto) e última migração.
+
+    Muda sempre que uma tabela, coluna, índice ou migração é adicionado ou
+    alterado — sem depender de alguém lembrar de incrementar uma versão.
+    """
+    from app.migrations import head_version
+
+    digest = hashlib.sha256(f"migration:{head_version()}".encode())
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    return digest.hexdigest()
+
+
+async def prepare_database() -> bool:
+    """
+    Deixa schema e seed prontos; devolve True se já estavam (boot "quente").
+
+    Uma consulta ao marcador `schema_meta` decide: se a impressão digital do
+    schema e a versão do seed batem, não há DDL nem contagens do seed. Caso
+    contrário (banco novo, modelos ou migrações novos), aplica as migrações
+    pendentes (`app.migrations`) e o seed, e grava o marcador.
+    """
+    from app.migrations import run_migrations
+    from app.models.schema_meta import SchemaMeta
+
+    fingerprint = schema_fingerprint()
+
+    async def read_marker():
+        async with engine.connect() as conn:
+            try:
+                return (
+                    await conn.execute(
+                        select(SchemaMeta.schema_hash, SchemaMeta.seed_version).where(SchemaMeta.id == _SCHEMA_META_ID)
+                    )
+                ).first()
+            except (OperationalError, ProgrammingError):
+                # Tabela ainda não existe: banco novo ou anterior ao marcador.
+                return None
+
+    marker = await with_startup_retries(read_marker, "Leitura do marcador de schema")
+    if marker is not None and tuple(marker) == (fingerprint, SEED_VERSION):
+        return True
+
+    print("[startup] Schema desatualizado ou banco novo: aplicando migrações...")
+    await with_startup_retries(run_migrations, "Migrações")
+    async with SessionLocal() as db:
+        await seed_data(db)
+        meta = SchemaMeta.__table__
+        await db.execute(
+            upsert(
+                engine.dialect.name,
+                meta,
+                ["id"],
+                lambda new: {column: new[column] for column in ("schema_hash", "seed_version", "updated_at")},
+            ),
+            {"id": _SCHEMA_META_ID, "schema_hash": fingerprint, "seed_version": SEED_VERSION, "updated_at": utcnow()},
+        )
+        await db.commit()
+    return False
+
+
+async def warm_pool(connections: int) -> int:
+    """Abre até `connections` conexões em paralelo e as devolve ao pool; retorna quantas abriu."""
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        connections = min(connections, size())
+
+    async def open_connection():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(open_connection() for _ in range(max(connections, 0))), return_exceptions=True)
+    return sum(1 for result in results if not isinstance(result, BaseException))
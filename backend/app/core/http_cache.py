@@ -0,0 +1,57 @@
+"""
+Respostas JSON pré-serializadas com validação condicional (ETag / 304).
+
+O corpo é serializado uma única vez e guardado junto com um ETag derivado
+do hash do conteúdo. Requisições com `If-None-Match` correspondente recebem
+`304 Not Modified` sem reserializar nada.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+# Força o cliente a revalidar (If-None-Match) em vez de usar a cópia local às cegas.
+CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class SerializedBody:
+    body: bytes
+    etag: str
+
+
+def with_etag(body: bytes) -> SerializedBody:
+    """Associa a um corpo já serializado o ETag derivado do seu conteúdo."""
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return SerializedBody(body=body, etag=f'"{digest}"')
+
+
+def serialize(data: Any) -> SerializedBody:
+    """Serializa `data` no mesmo formato do JSONResponse do FastAPI e calcula o ETag."""
+    return with_etag(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca de ETags conforme RFC 9110 (aceita lista, `W/` e `*`)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_response(
+    serialized: SerializedBody,
+    if_none_match: Optional[str],
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Devolve 304 se o cliente já tem a versão atual, senão o corpo pré-serializado."""
+    headers = {**(headers or {}), "ETag": serialized.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, serialized.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=serialized.body, media_type="application/json", headers=headers)
@@ -0,0 +1,322 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (`GET /metrics`).
+
+- `MetricsMiddleware` (ASGI puro): latência por rota, requisições em
+  andamento e contagem por status.
+- `instrument_engine`: eventos do SQLAlchemy que contam consultas e tempo de
+  banco. Durante uma requisição, os números vão para o contexto dela
+  (`contextvars`) e são publicados por rota ao final; uma mesma instrução
+  SQL repetida `METRICS_N_PLUS_ONE_THRESHOLD` vezes ou mais na mesma requisição é
+  sinalizada como provável N+1.
+
+As rotas são identificadas pelo template (`/api/v1/orders/{order_id}/cancel`),
+nunca pelo caminho concreto, para manter a cardinalidade das séries fixa.
+O registro é local ao processo: com vários workers, cada um expõe os seus
+números e o Prometheus agrega.
+"""
+
+import bisect
+import threading
+import time
+from collections import Counter as TallyCounter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Limites (em segundos) dos buckets de latência.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites dos buckets de "consultas por requisição".
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        # Sem labels, a série existe desde o início (valor 0).
+        self._values: dict[LabelValues, float] = {} if labels else {(): 0}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}" for values, value in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        # Sem labels, a série existe desde o início (valor 0).
+        self._values: dict[LabelValues, float] = {} if labels else {(): 0}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}" for values, value in items
+        ]
+
+
+class CallbackGauge(_Metric):
+    """Gauge lido na hora da coleta: `collect()` devolve {valores dos labels: valor}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], collect: Callable[[], dict[LabelValues, float]]):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in sorted(self.collect().items())
+        ]
+
+
+class CallbackCounter(CallbackGauge):
+    """Contador mantido em outro lugar e lido na hora da coleta."""
+
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # valores dos labels -> (contagem por bucket, soma, total)
+        self._series: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self, *label_values: str) -> tuple[int, float]:
+        """(nº de observações, soma) de uma série — (0, 0.0) se ainda não existe."""
+        with self._lock:
+            series = self._series.get(label_values)
+            return (series[2], series[1]) if series is not None else (0, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((values, (list(s[0]), s[1], s[2])) for values, s in self._series.items())
+        lines = self.header()
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, inf)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def callback_gauge(self, name: str, help: str, labels: tuple[str, ...], collect) -> CallbackGauge:
+        return self.register(CallbackGauge(name, help, labels, collect))
+
+    def callback_counter(self, name: str, help: str, labels: tuple[str, ...], collect) -> CallbackCounter:
+        return self.register(CallbackCounter(name, help, labels, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "Requisições HTTP concluídas.", ("method", "route", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP (até o fim da resposta).", ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "Requisições HTTP em andamento.")
+DB_QUERIES = registry.counter("db_queries_total", "Instruções SQL executadas (inclui tarefas de fundo).")
+DB_QUERY_LATENCY = registry.histogram("db_query_duration_seconds", "Duração de cada instrução SQL.")
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "Instruções SQL por requisição.", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "db_time_per_request_seconds", "Tempo total de banco por requisição.", ("method", "route")
+)
+DB_N_PLUS_ONE = registry.counter(
+    "db_n_plus_one_total", "Requisições em que uma mesma instrução SQL se repetiu (provável N+1).", ("method", "route")
+)
+
+
+@dataclass
+class RequestDbStats:
+    queries: int = 0
+    seconds: float = 0.0
+    statements: TallyCounter = field(default_factory=TallyCounter)
+
+
+_request_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Registra os eventos de contagem/tempo de consultas no engine (síncrono por baixo do async)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        DB_QUERIES.inc()
+        DB_QUERY_LATENCY.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+            stats.statements[statement] += 1
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
+
+
+def _route_template(scope) -> str:
+    """Template da rota que atendeu a requisição (o Starlette só guarda o endpoint no scope)."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+    routes = getattr(app.state, "metrics_route_templates", None)
+    if routes is None:
+        routes = {getattr(route, "endpoint", None): route.path for route in app.routes}
+        app.state.metrics_route_templates = routes
+    return routes.get(endpoint, UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestDbStats()
+        token = _request_stats.set(stats)
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+
+            method, route = scope["method"], _route_template(scope)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_LATENCY.observe(elapsed, method, route)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, method, route)
+            DB_TIME_PER_REQUEST.observe(stats.seconds, method, route)
+
+            if stats.statements:
+                statement, repeats = stats.statements.most_common(1)[0]
+                if repeats >= settings.METRICS_N_PLUS_ONE_THRESHOLD:
+                    DB_N_PLUS_ONE.inc(method, route)
+                    print(
+                        f"[metrics] ⚠ Possível N+1 em {method} {route}: {repeats}× "
+                        f"{' '.join(statement.split())[:120]}"
+                    )
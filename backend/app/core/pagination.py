@@ -0,0 +1,64 @@
+"""
+Utilitários de paginação por cursor (keyset pagination).
+
+O cursor é opaco para o cliente: codifica, em base64 url-safe, os valores
+da chave de ordenação do último item da página. A próxima página é obtida
+com um filtro `WHERE (coluna, id) > (valor, último_id)`, que o banco resolve
+direto pelo índice — o custo não cresce com a profundidade da página,
+ao contrário de `OFFSET`.
+"""
+
+import base64
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+# Header com o cursor da próxima página (ausente na última página).
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*values: Any) -> str:
+    """Codifica os valores da chave de ordenação em um cursor opaco."""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# Tipos que `encode_cursor` produz (datas viram string); qualquer outro iria
+# parar na consulta como parâmetro e estouraria no banco.
+_CURSOR_VALUE_TYPES = (str, int, float, type(None))
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """Decodifica um cursor gerado por `encode_cursor` (HTTP 400 se inválido)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, _CURSOR_VALUE_TYPES) for value in values)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido.",
+        )
+    return values
+
+
+def keyset_after(column, value: Any, id_column, last_id: Any, descending: bool = False):
+    """
+    Condição "depois do cursor" para ordenação por (column, id).
+
+    Escrita como `col > v OR (col = v AND id > last_id)` em vez de comparação
+    de tuplas para que o MySQL consiga usar o índice composto em range scan.
+    """
+    if descending:
+        return or_(column < value, and_(column == value, id_column < last_id))
+    return or_(column > value, and_(column == value, id_column > last_id))
@@ -0,0 +1,139 @@
+"""
+Dimensionamento e estatísticas do pool de conexões.
+
+Dimensionamento (`pool_sizing`): `DB_CONNECTION_BUDGET` é o total de
+conexões que uma instância do backend (todos os seus workers) pode abrir no
+MySQL. Ele é dividido entre os `WEB_CONCURRENCY` workers; em cada um, um
+terço fica no pool permanente e o resto como overflow (aberto sob pico e
+fechado ao ser devolvido). Assim o total no servidor é previsível:
+réplicas × `DB_CONNECTION_BUDGET` deve ficar abaixo do `max_connections` do
+MySQL. `DB_POOL_SIZE`/`DB_MAX_OVERFLOW` sobrescrevem o cálculo.
+
+Estatísticas (`InstrumentedQueuePool`): além do estado do pool (conexões em
+uso, ociosas e em overflow), mede quanto cada checkout esperou para obter
+uma conexão e quantos desistiram por `DB_POOL_TIMEOUT_SECONDS`. Os números
+saem em `GET /api/v1/system/pool` (admin) e no `/metrics`.
+"""
+
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+settings = get_settings()
+
+POOL_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tempo para obter uma conexão do pool (inclui abrir uma nova, se houver vaga).",
+    ("pool",),
+)
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+
+# Por nome do pool: o SQLAlchemy recria o objeto do pool em `engine.dispose()`.
+_stats: dict[str, PoolStats] = {}
+_engines: dict[str, object] = {}
+
+
+def pool_sizing() -> tuple[int, int]:
+    """(pool_size, max_overflow) de cada worker, a partir do orçamento de conexões."""
+    per_worker = max(1, settings.DB_CONNECTION_BUDGET // max(1, settings.WEB_CONCURRENCY))
+    pool_size = settings.DB_POOL_SIZE if settings.DB_POOL_SIZE is not None else max(1, per_worker // 3)
+    max_overflow = (
+        settings.DB_MAX_OVERFLOW if settings.DB_MAX_OVERFLOW is not None else max(0, per_worker - pool_size)
+    )
+    return pool_size, max_overflow
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Pool assíncrono padrão que registra a espera e os timeouts de cada checkout."""
+
+    def connect(self):
+        name = self.logging_name or "default"
+        stats = _stats.setdefault(name, PoolStats())
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            stats.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        stats.checkouts += 1
+        stats.wait_seconds += waited
+        stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+        POOL_WAIT.observe(waited, name)
+        return connection
+
+
+def register_engine(name: str, engine) -> None:
+    """Inclui o pool do engine no endpoint de estatísticas e no /metrics."""
+    _engines[name] = engine
+
+
+def pool_status(name: str) -> dict:
+    """Estado atual e acumulados do pool `name`."""
+    pool = _engines[name].pool
+    if not isinstance(pool, QueuePool):
+        # SQLite local: NullPool, uma conexão por uso, nada a dimensionar.
+        return {"pool": name, "class": type(pool).__name__}
+
+    stats = _stats.get(name, PoolStats())
+    return {
+        "pool": name,
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "maxOverflow": pool._max_overflow,
+        "timeoutSeconds": pool.timeout(),
+        "checkedOut": pool.checkedout(),
+        "checkedIn": pool.checkedin(),
+        # Negativo enquanto o pool permanente ainda não abriu todas as conexões.
+        "overflow": pool.overflow(),
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "averageWaitMs": round(stats.wait_seconds / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+        "maxWaitMs": round(stats.max_wait_seconds * 1000, 3),
+    }
+
+
+def all_pool_status() -> list[dict]:
+    return [pool_status(name) for name in _engines]
+
+
+def _queue_pools():
+    for name, engine in _engines.items():
+        if isinstance(engine.pool, QueuePool):
+            yield name, engine.pool
+
+
+registry.callback_gauge(
+    "db_pool_connections",
+    "Conexões do pool por estado (checked_out = em uso; overflow = além do pool permanente).",
+    ("pool", "state"),
+    lambda: {
+        (name, state): value
+        for name, pool in _queue_pools()
+        for state, value in (
+            ("size", pool.size()),
+            ("checked_out", pool.checkedout()),
+            ("checked_in", pool.checkedin()),
+            ("overflow", max(0, pool.overflow())),
+        )
+    },
+)
+registry.callback_counter(
+    "db_pool_timeouts_total",
+    "Checkouts que desistiram após DB_POOL_TIMEOUT_SECONDS sem conexão livre.",
+    ("pool",),
+    lambda: {(name,): _stats.get(name, PoolStats()).timeouts for name, _ in _queue_pools()},
+)
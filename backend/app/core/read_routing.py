@@ -0,0 +1,191 @@
+"""
+Roteamento de leituras para a réplica (`READ_REPLICA_URL`).
+
+`get_read_db` é a dependency das rotas de leitura. Ela entrega uma sessão
+da réplica quando:
+
+- a requisição é de leitura (GET/HEAD);
+- o usuário (`X-User-Email`) não escreveu nada nos últimos
+  `READ_REPLICA_STICKY_SECONDS` — read-your-writes: quem acabou de criar um
+  pedido vê o pedido, mesmo com a réplica atrasada;
+- a réplica não falhou nos últimos `READ_REPLICA_RETRY_SECONDS`.
+
+Nos demais casos devolve a mesma sessão do primário que `get_db` entrega
+na requisição. Sessões abrem conexão só no primeiro uso, então pedir as
+duas dependências não custa uma conexão a mais — e uma leitura servida do
+cache (ou um 304) não pega conexão nenhuma, nem da réplica.
+
+A saúde da réplica não é testada a cada requisição: uma sonda abre uma
+conexão no máximo a cada `READ_REPLICA_PROBE_SECONDS`. Se a réplica não
+aceita conexão, a requisição segue no primário e a réplica fica de fora até
+o próximo intervalo de tentativa. Um erro de banco numa leitura da réplica
+antecipa a próxima sonda.
+
+As escritas são marcadas aqui mesmo: toda rota autenticada passa por
+`get_current_user`, que depende de `get_read_db`. A marcação é local ao
+worker (como os demais caches em memória); num deploy com vários workers,
+a janela também cobre o atraso típico da réplica.
+
+O catálogo é compartilhado entre todos os usuários: `get_catalog_read_db`
+fica também no primário por `READ_REPLICA_STICKY_SECONDS` depois de qualquer
+escrita no catálogo (`read_router.mark_write(CATALOG)`, junto da invalidação
+do cache). Assim uma leitura anônima logo após a escrita não lê a réplica
+atrasada e grava no cache, sob a versão nova, o produto antigo. Uma leitura
+que foi para a réplica antes da escrita e termina depois dela é detectada
+por `replica_may_be_stale` e não vai para o cache.
+
+Para testar localmente com dois SQLite, use uma cópia do banco como réplica:
+`cp compia.db compia-replica.db` e `READ_REPLICA_URL=sqlite:///./compia-replica.db`.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from fastapi import Depends, Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import get_settings
+from app.core.database import ReadSessionLocal, get_db
+from app.core.metrics import registry
+
+settings = get_settings()
+
+READ_METHODS = {"GET", "HEAD"}
+
+# Escopo das escritas no catálogo (não colide com emails, que sempre têm "@").
+CATALOG = "catalog"
+
+READ_ROUTING = registry.counter(
+    "db_read_routing_total",
+    "Sessões de leitura por destino e motivo (replica, sticky, replica_down, write, no_replica).",
+    ("target", "reason"),
+)
+
+
+class ReadRouter:
+    """Decide entre réplica e primário; guarda as escritas recentes e a saúde da réplica."""
+
+    def __init__(self, sticky_seconds: float, sticky_max_entries: int, retry_seconds: float, probe_seconds: float):
+        self.retry_seconds = retry_seconds
+        self.probe_seconds = probe_seconds
+        self._recent_writers = TTLCache(max_entries=sticky_max_entries, ttl=sticky_seconds)
+        self._replica_down_until = 0.0
+        self._probed_at: Optional[float] = None
+        self._probe_lock = asyncio.Lock()
+
+    def mark_write(self, key: Optional[str]) -> None:
+        """Registra uma escrita de `key` (email do usuário ou escopo, como `CATALOG`)."""
+        if key:
+            self._recent_writers.set(key.strip().lower(), True)
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        return bool(key) and self._recent_writers.get(key.strip().lower()) is not MISSING
+
+    def replica_available(self) -> bool:
+        return ReadSessionLocal is not None and time.monotonic() >= self._replica_down_until
+
+    async def replica_ready(self) -> bool:
+        """Réplica disponível, com sonda (uma conexão) só se a última for mais velha que `probe_seconds`."""
+        if not self.replica_available():
+            return False
+        if self._probed_at is not None and time.monotonic() - self._probed_at < self.probe_seconds:
+            return True
+        async with self._probe_lock:
+            # Outra requisição pode ter sondado enquanto esta esperava.
+            if self._probed_at is not None and time.monotonic() - self._probed_at < self.probe_seconds:
+                return True
+            if not self.replica_available():
+                return False
+            try:
+                async with ReadSessionLocal() as replica:
+                    await replica.connection()
+            except Exception as e:
+                self.mark_replica_down(e)
+                return False
+            self._probed_at = time.monotonic()
+            return True
+
+    def expire_probe(self) -> None:
+        """Força uma sonda antes da próxima leitura na réplica."""
+        self._probed_at = None
+
+    def mark_replica_down(self, error: Exception) -> None:
+        self._probed_at = None
+        self._replica_down_until = time.monotonic() + self.retry_seconds
+        print(
+            f"[database] ✗ Réplica indisponível ({error.__class__.__name__}); "
+            f"leituras no primário por {self.retry_seconds:.0f}s"
+        )
+
+    def route(self, method: str, email: Optional[str], scope: Optional[str] = None) -> str:
+        """Motivo da escolha; só "replica" usa a réplica."""
+        if ReadSessionLocal is None:
+            return "no_replica"
+        if method not in READ_METHODS:
+            return "write"
+        if self.is_sticky(email) or self.is_sticky(scope):
+            return "sticky"
+        if not self.replica_available():
+            return "replica_down"
+        return "replica"
+
+
+read_router = ReadRouter(
+    sticky_seconds=settings.READ_REPLICA_STICKY_SECONDS,
+    sticky_max_entries=settings.READ_REPLICA_STICKY_MAX_ENTRIES,
+    retry_seconds=settings.READ_REPLICA_RETRY_SECONDS,
+    probe_seconds=settings.READ_REPLICA_PROBE_SECONDS,
+)
+
+
+def read_db_for(scope: Optional[str] = None):
+    """
+    Dependency de leitura: sessão da réplica quando possível, senão a do
+    primário (`get_db`). Com `scope`, escritas recentes nele também mantêm a
+    leitura no primário.
+    """
+
+    async def read_db(request: Request, db: AsyncSession = Depends(get_db)):
+        email = request.headers.get("x-user-email")
+        reason = read_router.route(request.method, email, scope)
+        if reason == "replica" and not await read_router.replica_ready():
+            reason = "replica_down"
+        # Uma escrita pode ter terminado durante a sonda.
+        if reason == "replica" and (read_router.is_sticky(email) or read_router.is_sticky(scope)):
+            reason = "sticky"
+        request.state.read_from_replica = reason == "replica"
+
+        if reason != "replica":
+            if reason == "write":
+                read_router.mark_write(email)
+            READ_ROUTING.inc("primary", reason)
+            try:
+                yield db
+            finally:
+                if reason == "write":
+                    # A janela conta a partir do fim da escrita (commit incluído).
+                    read_router.mark_write(email)
+            return
+
+        READ_ROUTING.inc("replica", "replica")
+        # A sessão só pega conexão se a rota de fato consultar o banco.
+        async with ReadSessionLocal() as replica:
+            try:
+                yield replica
+            except DBAPIError:
+                read_router.expire_probe()
+                raise
+
+    return read_db
+
+
+get_read_db = read_db_for()
+get_catalog_read_db = read_db_for(CATALOG)
+
+
+def replica_may_be_stale(request: Request, scope: str) -> bool:
+    """A leitura desta requisição foi à réplica e `scope` teve escrita recente (talvez depois do roteamento)."""
+    return getattr(request.state, "read_from_replica", False) and read_router.is_sticky(scope)
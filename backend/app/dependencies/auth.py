@@ -3,26 +3,44 @@ Dependencies de autenticação simplificada.
 """
 
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.cache import MISSING
+from app.core.read_routing import get_read_db
 from app.models.user import User
+from app.services.user_cache import cache_user, get_cached_user
 
 
-def get_current_user(
+async def get_current_user(
     x_user_email: str = Header(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> User:
     """
     Busca o usuário pelo email passado no header X-User-Email.
     Autenticação simplificada — sem JWT.
+
+    O resultado (inclusive "não encontrado") fica em cache por alguns
+    segundos, então requisições repetidas não consultam o banco.
     """
     if not x_user_email:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Header X-User-Email obrigatório.",
         )
-    user = db.query(User).filter(User.email == x_user_email).first()
+    return await resolve_user(x_user_email, db)
+
+
+async def resolve_user(email: str, db: AsyncSession) -> User:
+    """Resolve o usuário pelo email (com cache), ou HTTP 401 se não existir."""
+    user = get_cached_user(email)
+    if user is MISSING:
+        user = await db.scalar(select(User).where(User.email == email))
+        if user is not None:
+            # O objeto é compartilhado pelo cache entre requisições: destacado,
+            # um rollback desta sessão não o expira.
+            db.expunge(user)
+        cache_user(email, user)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,7 +49,7 @@ def get_current_user(
     return user
 
 
-def require_admin(
+async def require_admin(
     user: User = Depends(get_current_user),
 ) -> User:
     """Verifica se o usuário tem role 'admin'."""
@@ -1,33 +1,70 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 
 from app.api.v1 import api_router
 from app.core.config import get_settings
-from app.core.database import SessionLocal, create_tables, seed_data
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.database import engine, prepare_database, read_engine, warm_pool
+from app.services.email_service import email_dispatcher
+from app.services.idempotency import REPLAYED_HEADER, run_sweeper as run_idempotency_sweeper
+from app.services.payment_store import run_sweeper as run_payment_sweeper
+from app.services.search_index import run_refresher, search_index
 
 settings = get_settings()
 
 
+async def _warm_up_pool(app: FastAPI) -> None:
+    connections = await warm_pool(settings.DB_POOL_WARMUP_CONNECTIONS)
+    app.state.pool_warm_connections = connections
+    print(f"[startup] ✓ Pool aquecido com {connections} conexão(ões)")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Evento de inicialização: cria tabelas e popula dados seed."""
+    """
+    Evento de inicialização: prepara schema/seed, inicia a fila de emails e aquece o pool.
+
+    Em boots "quentes" (marcador de schema em dia) não há DDL nem seed. O
+    aquecimento do pool roda em segundo plano; `/ready` responde 503 até ele
+    terminar.
+    """
     # Importar modelos para que Base.metadata conheça todas as tabelas
-    import app.models  # noqa: F401
+    # (com alias: `import app.models` sobrescreveria o parâmetro `app`)
+    import app.models as _models  # noqa: F401
 
-    print("[startup] Criando tabelas no banco de dados...")
-    create_tables()
+    app.state.pool_warm_connections = None
+    if await prepare_database():
+        print("[startup] ✓ Schema e seed em dia (DDL e seed pulados)")
+    else:
+        print("[startup] ✓ Schema e seed aplicados")
 
-    db = SessionLocal()
-    try:
-        seed_data(db)
-    finally:
-        db.close()
+    await search_index.rebuild()
+    print(f"[startup] ✓ Índice de busca com {len(search_index)} produto(s)")
+
+    await email_dispatcher.start()
+    payment_sweeper = asyncio.create_task(run_payment_sweeper())
+    idempotency_sweeper = asyncio.create_task(run_idempotency_sweeper())
+    pool_warmup = asyncio.create_task(_warm_up_pool(app))
+    search_refresher = asyncio.create_task(run_refresher())
 
     print("[startup] ✓ Backend pronto!")
     yield
 
+    pool_warmup.cancel()
+    search_refresher.cancel()
+    payment_sweeper.cancel()
+    idempotency_sweeper.cancel()
+    await email_dispatcher.stop()
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+
 
 app = FastAPI(
     title="COMPIA Store API",
@@ -42,6 +79,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", REPLAYED_HEADER],
 )
 
+# Adicionado por último: é o mais externo e mede também o CORS e as respostas de erro.
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas no formato texto do Prometheus (latência por rota, status, consultas ao banco)."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """Readiness: 200 quando o pool já foi aquecido e o banco responde; 503 caso contrário."""
+    connections = getattr(app.state, "pool_warm_connections", None)
+    if connections is None:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    try:
+        async with engine.connect() as conn:
+            await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=settings.READINESS_TIMEOUT_SECONDS)
+    except Exception as e:
+        return JSONResponse({"status": "unavailable", "error": e.__class__.__name__}, status_code=503)
+    return {"status": "ready", "poolWarmConnections": connections}
@@ -0,0 +1,27 @@
+"""
+Migrações versionadas do schema.
+
+Cada migração é um módulo em `app/migrations/versions/` com `VERSION`
+(inteiro, sequencial), `DESCRIPTION` e `async def upgrade(conn)`. As
+aplicadas ficam registradas em `schema_migrations`; `run_migrations` aplica
+as pendentes em ordem, cada uma na sua transação.
+
+A migração 1 cria, a partir dos modelos, as tabelas que faltam. As
+seguintes alteram tabelas existentes com as operações de
+`app.migrations.operations`, que conferem o estado atual antes de agir: num
+banco novo a migração 1 já cria tudo na forma final, e as demais não fazem
+nada.
+
+Uso (a partir de `backend/`):
+
+    python -m app.migrations upgrade        # aplica as pendentes
+    python -m app.migrations status         # lista aplicadas e pendentes
+    python -m app.migrations check-indexes  # filtros/ordenações sem índice
+
+Na inicialização do app, `prepare_database` roda as migrações quando o
+marcador de schema está desatualizado.
+"""
+
+from app.migrations.runner import Migration, applied_versions, head_version, load_migrations, run_migrations
+
+__all__ = ["Migration", "applied_versions", "head_version", "load_migrations", "run_migrations"]
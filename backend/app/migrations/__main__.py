@@ -0,0 +1,63 @@
+"""
+CLI das migrações: `python -m app.migrations {upgrade,status,check-indexes}`.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from app.core.database import engine
+from app.migrations.index_check import find_uncovered
+from app.migrations.runner import applied_versions, load_migrations, run_migrations
+
+
+async def _upgrade() -> None:
+    try:
+        applied = await run_migrations()
+    finally:
+        await engine.dispose()
+    print(f"[migrations] ✓ {len(applied)} migração(ões) aplicada(s)" if applied else "[migrations] ✓ Schema em dia")
+
+
+async def _status() -> None:
+    try:
+        async with engine.connect() as conn:
+            done = await applied_versions(conn)
+    finally:
+        await engine.dispose()
+    for migration in load_migrations():
+        mark = "✓" if migration.version in done else " "
+        print(f"[{mark}] {migration.version:04d} {migration.description}")
+
+
+def _check_indexes(paths: list[str]) -> int:
+    uncovered = find_uncovered([Path(path) for path in paths] or None)
+    for use in uncovered:
+        print(f"{use.path}:{use.line}: {use.model}.{use.column} em {use.function}() não é coberta por índice")
+    if uncovered:
+        print(f"[migrations] ✗ {len(uncovered)} coluna(s) de filtro/ordenação sem índice")
+        return 1
+    print("[migrations] ✓ Todas as colunas de filtro/ordenação têm índice")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Migrações do schema.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("upgrade", help="aplica as migrações pendentes")
+    commands.add_parser("status", help="lista as migrações aplicadas e pendentes")
+    check = commands.add_parser("check-indexes", help="procura filtros/ordenações sem índice nos endpoints")
+    check.add_argument("paths", nargs="*", help="arquivos ou diretórios (padrão: app/api/v1/endpoints)")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        asyncio.run(_upgrade())
+    elif args.command == "status":
+        asyncio.run(_status())
+    else:
+        sys.exit(_check_indexes(args.paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Verificação estática de cobertura por índices.
+
+Lê o código dos endpoints (AST, sem executar nada) e coleta as colunas dos
+modelos usadas em `.where()`, `.filter()`, `.order_by()` e `keyset_after()`.
+As colunas são agrupadas por função — em geral, uma função monta uma
+consulta — e uma coluna conta como coberta se for a chave primária ou se
+aparecer em algum índice cujas colunas anteriores também são usadas na
+mesma função (ex.: `created_at` é coberta por `(role, created_at, id)`
+quando a função também filtra por `role`). Quando a função filtra pela chave
+primária inteira do modelo, as demais colunas são filtros residuais sobre
+as linhas já localizadas pela chave e também contam como cobertas.
+
+Um uso intencionalmente sem índice (ex.: tabela com poucas linhas) é
+aceito com o comentário `# index-check: ignore` na linha, com o motivo.
+
+É uma heurística conservadora para pegar o caso comum — filtro ou ordenação
+nova sem índice — antes de chegar à produção; não substitui o EXPLAIN.
+"""
+
+import ast
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import Table
+
+FILTER_METHODS = {"where", "filter"}
+QUERY_METHODS = FILTER_METHODS | {"order_by"}
+QUERY_FUNCTIONS = {"keyset_after"}
+IGNORE_MARKER = "index-check: ignore"
+
+DEFAULT_PATHS = [Path(__file__).resolve().parent.parent / "api" / "v1" / "endpoints"]
+
+
+@dataclass(frozen=True)
+class ColumnUse:
+    path: str
+    line: int
+    function: str
+    model: str
+    column: str
+    in_filter: bool  # em .where()/.filter() (e não só em ordenação/keyset)
+
+
+def model_tables() -> dict[str, Table]:
+    """Nome da classe do modelo → tabela."""
+    import app.models  # noqa: F401
+    from app.core.database import Base
+
+    return {mapper.class_.__name__: mapper.local_table for mapper in Base.registry.mappers}
+
+
+def _index_column_lists(table: Table) -> list[list[str]]:
+    lists = [[column.name for column in index.columns] for index in table.indexes]
+    lists.append([column.name for column in table.primary_key.columns])
+    return lists
+
+
+def _is_query_call(node: ast.Call) -> bool:
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return func.attr in QUERY_METHODS or func.attr in QUERY_FUNCTIONS
+    return isinstance(func, ast.Name) and func.id in QUERY_FUNCTIONS
+
+
+def _column_uses(tree: ast.AST, path: str, tables: dict[str, Table]) -> list[ColumnUse]:
+    uses = []
+    for function in ast.walk(tree):
+        if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for call in ast.walk(function):
+            if not isinstance(call, ast.Call) or not _is_query_call(call):
+                continue
+            for argument in [*call.args, *(keyword.value for keyword in call.keywords)]:
+                for node in ast.walk(argument):
+                    if (
+                        isinstance(node, ast.Attribute)
+                        and isinstance(node.value, ast.Name)
+                        and node.value.id in tables
+                        and node.attr in tables[node.value.id].c
+                    ):
+                        uses.append(
+                            ColumnUse(
+                                path,
+                                node.lineno,
+                                function.name,
+                                node.value.id,
+                                node.attr,
+                                in_filter=isinstance(call.func, ast.Attribute) and call.func.attr in FILTER_METHODS,
+                            )
+                        )
+    return uses
+
+
+def find_uncovered(paths: list[Path] | None = None) -> list[ColumnUse]:
+    """Usos de colunas (em filtros/ordenações) sem índice que os cubra."""
+    tables = model_tables()
+    files = []
+    for path in paths or DEFAULT_PATHS:
+        files.extend(sorted(path.rglob("*.py")) if path.is_dir() else [path])
+
+    uncovered = []
+    for file in files:
+        source = file.read_text(encoding="utf-8")
+        lines = source.splitlines()
+        uses = [
+            use
+            for use in _column_uses(ast.parse(source, str(file)), str(file), tables)
+            if IGNORE_MARKER not in lines[use.line - 1]
+        ]
+
+        # Colunas usadas em cada função, por modelo.
+        used_by_function: dict[tuple[str, str], set[str]] = defaultdict(set)
+        filtered_by_function: dict[tuple[str, str], set[str]] = defaultdict(set)
+        for use in uses:
+            used_by_function[(use.function, use.model)].add(use.column)
+            if use.in_filter:
+                filtered_by_function[(use.function, use.model)].add(use.column)
+
+        reported = set()
+        for use in uses:
+            used = used_by_function[(use.function, use.model)]
+            primary_key = {column.name for column in tables[use.model].primary_key.columns}
+            covered = primary_key <= filtered_by_function[(use.function, use.model)] or any(
+                use.column in columns and set(columns[: columns.index(use.column)]) <= used
+                for columns in _index_column_lists(tables[use.model])
+            )
+            key = (use.function, use.model, use.column)
+            if not covered and key not in reported:
+                reported.add(key)
+                uncovered.append(use)
+    return sorted(uncovered, key=lambda use: (use.path, use.line))
@@ -0,0 +1,67 @@
+"""
+Operações de schema usadas pelas migrações.
+
+Todas conferem o estado atual antes de agir (podem rodar num banco que já
+está na forma final) e evitam travar a tabela em produção:
+
+- MySQL: `ALTER TABLE ... ALGORITHM=INPLACE, LOCK=NONE` — o índice é
+  construído com leituras e escritas liberadas; se o servidor não conseguir
+  fazer a operação sem lock, ela falha em vez de bloquear a tabela. A
+  exceção é a troca de tipo de coluna (`widen_datetime`), que o InnoDB só
+  faz copiando a tabela: `LOCK=SHARED`, leituras liberadas e escritas em
+  espera durante a cópia;
+- SQLite (desenvolvimento/testes): `CREATE INDEX` simples.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def _existing_indexes(conn: AsyncConnection, table_name: str) -> set[str]:
+    indexes = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_indexes(table_name))
+    return {index["name"] for index in indexes}
+
+
+async def create_index(
+    conn: AsyncConnection, table_name: str, index_name: str, columns: list[str], unique: bool = False
+) -> bool:
+    """Cria o índice se ainda não existir (online no MySQL); devolve True se criou."""
+    if index_name in await _existing_indexes(conn, table_name):
+        return False
+
+    preparer = conn.dialect.identifier_preparer
+    table = preparer.quote(table_name)
+    name = preparer.quote(index_name)
+    column_list = ", ".join(preparer.quote(column) for column in columns)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+
+    if conn.dialect.name == "mysql":
+        statement = f"ALTER TABLE {table} ADD {kind} {name} ({column_list}), ALGORITHM=INPLACE, LOCK=NONE"
+    else:
+        statement = f"CREATE {kind} {name} ON {table} ({column_list})"
+    await conn.exec_driver_sql(statement)
+    print(f"[migrations] ✓ Índice {index_name} criado em {table_name}({', '.join(columns)})")
+    return True
+
+
+async def widen_datetime(conn: AsyncConnection, table_name: str, column_name: str, server_default: str) -> bool:
+    """
+    Passa uma coluna DATETIME para microssegundos (`DATETIME(6)`); devolve True se alterou.
+
+    Só no MySQL: o SQLite já guarda as frações de segundo.
+    """
+    if conn.dialect.name != "mysql":
+        return False
+    columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns(table_name))
+    column = next(column for column in columns if column["name"] == column_name)
+    if (getattr(column["type"], "fsp", None) or 0) >= 6:
+        return False
+
+    preparer = conn.dialect.identifier_preparer
+    nullable = "NULL" if column["nullable"] else "NOT NULL"
+    await conn.exec_driver_sql(
+        f"ALTER TABLE {preparer.quote(table_name)} MODIFY COLUMN {preparer.quote(column_name)} "
+        f"DATETIME(6) {nullable} DEFAULT {server_default}, ALGORITHM=COPY, LOCK=SHARED"
+    )
+    print(f"[migrations] ✓ Coluna {table_name}.{column_name} agora em DATETIME(6)")
+    return True
@@ -0,0 +1,98 @@
+"""
+Execução das migrações versionadas (ver `app.migrations`).
+"""
+
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.database import engine, utcnow
+from app.models.schema_meta import SchemaMigration
+
+# Lock de sessão do MySQL: só um processo migra por vez (os demais esperam e
+# depois encontram as migrações já aplicadas).
+_MYSQL_LOCK_NAME = "compia_schema_migrations"
+_MYSQL_LOCK_TIMEOUT_SECONDS = 600
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+@lru_cache()
+def load_migrations() -> tuple[Migration, ...]:
+    """Migrações de `app/migrations/versions/`, em ordem; as versões devem ser 1, 2, 3..."""
+    from app.migrations import versions
+
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(Migration(module.VERSION, module.DESCRIPTION, module.upgrade))
+    migrations.sort(key=lambda m: m.version)
+
+    expected = list(range(1, len(migrations) + 1))
+    if [m.version for m in migrations] != expected:
+        raise RuntimeError(f"Versões de migração devem ser sequenciais a partir de 1: {[m.version for m in migrations]}")
+    return tuple(migrations)
+
+
+def head_version() -> int:
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+async def applied_versions(conn: AsyncConnection) -> set[int]:
+    """Versões já aplicadas (cria `schema_migrations` se preciso); deixa a conexão sem transação aberta."""
+    await conn.run_sync(SchemaMigration.__table__.create, checkfirst=True)
+    versions = set((await conn.scalars(select(SchemaMigration.version))).all())
+    await conn.commit()
+    return versions
+
+
+async def _lock(conn: AsyncConnection) -> None:
+    if conn.dialect.name == "mysql":
+        acquired = await conn.scalar(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": _MYSQL_LOCK_NAME, "timeout": _MYSQL_LOCK_TIMEOUT_SECONDS},
+        )
+        if acquired != 1:
+            raise RuntimeError("Não foi possível obter o lock de migrações (outro processo migrando?).")
+
+
+async def _unlock(conn: AsyncConnection) -> None:
+    if conn.dialect.name == "mysql":
+        await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": _MYSQL_LOCK_NAME})
+
+
+async def run_migrations() -> list[int]:
+    """Aplica as migrações pendentes, em ordem; devolve as versões aplicadas agora."""
+    applied_now = []
+    async with engine.connect() as conn:
+        await _lock(conn)
+        try:
+            done = await applied_versions(conn)
+            for migration in load_migrations():
+                if migration.version in done:
+                    continue
+                print(f"[migrations] Aplicando {migration.version}: {migration.description}...")
+                async with conn.begin():
+                    await migration.upgrade(conn)
+                    await conn.execute(
+                        insert(SchemaMigration).values(
+                            version=migration.version, description=migration.description, applied_at=utcnow()
+                        )
+                    )
+                applied_now.append(migration.version)
+                print(f"[migrations] ✓ {migration.version} aplicada")
+        finally:
+            await _unlock(conn)
+            await conn.commit()
+    return applied_now
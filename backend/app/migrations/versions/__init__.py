@@ -0,0 +1,7 @@
+"""
+Migrações do schema, uma por módulo (`vNNNN_descricao.py`).
+
+Cada módulo define `VERSION`, `DESCRIPTION` e `async def upgrade(conn)`.
+Migrações já aplicadas em produção não devem ser editadas: mudanças novas
+entram numa versão nova.
+"""
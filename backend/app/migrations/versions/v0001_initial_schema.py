@@ -0,0 +1,19 @@
+"""
+Cria, a partir dos modelos, todas as tabelas que ainda não existem.
+
+Num banco novo, cria o schema inteiro já na forma final (com os índices).
+Num banco existente, só acrescenta as tabelas novas; as existentes são
+ajustadas pelas migrações seguintes.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = 1
+DESCRIPTION = "Tabelas a partir dos modelos"
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    import app.models  # noqa: F401
+    from app.core.database import Base
+
+    await conn.run_sync(Base.metadata.create_all)
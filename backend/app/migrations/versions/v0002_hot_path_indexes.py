@@ -0,0 +1,42 @@
+"""
+Índices dos caminhos de consulta mais usados em tabelas criadas antes deles.
+
+`create_all` não cria índices em tabelas que já existem, então bancos de
+produção anteriores a estes índices ficavam sem eles:
+
+- `orders`: histórico do cliente (`user_email`), listagem geral e por
+  status, paginadas por (date, id);
+- `order_items.order_id`: carga dos itens de uma página de pedidos;
+- `notifications`: feed e contagem de não lidas por (role, created_at);
+- `products`: listagem por cursor em cada ordenação e filtro (inclui
+  `category`).
+
+Construídos online no MySQL (ver `app.migrations.operations`).
+"""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.operations import create_index
+
+VERSION = 2
+DESCRIPTION = "Índices de pedidos, itens, notificações e produtos"
+
+INDEXES = [
+    ("orders", "ix_orders_user_email_date_id", ["user_email", "date", "id"]),
+    ("orders", "ix_orders_date_id", ["date", "id"]),
+    ("orders", "ix_orders_status_date_id", ["status", "date", "id"]),
+    ("order_items", "ix_order_items_order_id", ["order_id"]),
+    ("notifications", "ix_notifications_role_read_created_at", ["role", "read", "created_at"]),
+    ("notifications", "ix_notifications_role_created_at_id", ["role", "created_at", "id"]),
+    ("products", "ix_products_title_id", ["title", "id"]),
+    ("products", "ix_products_price_id", ["price", "id"]),
+    ("products", "ix_products_rating_id", ["rating", "id"]),
+    ("products", "ix_products_category_price_id", ["category", "price", "id"]),
+    ("products", "ix_products_type_price_id", ["type", "price", "id"]),
+    ("products", "ix_products_flags_rating_id", ["is_best_seller", "is_new", "rating", "id"]),
+]
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    for table_name, index_name, columns in INDEXES:
+        await create_index(conn, table_name, index_name, columns)
@@ -0,0 +1,18 @@
+"""
+`notifications.created_at` com microssegundos no MySQL.
+
+O feed incremental (`GET /notifications?after=`) ordena por
+(created_at, id). Com `DATETIME` de segundos, notificações do mesmo segundo
+ficavam ordenadas pelo id aleatório, e não pela criação.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.operations import widen_datetime
+
+VERSION = 3
+DESCRIPTION = "notifications.created_at em DATETIME(6)"
+
+
+async def upgrade(conn: AsyncConnection) -> None:
+    await widen_datetime(conn, "notifications", "created_at", "CURRENT_TIMESTAMP(6)")
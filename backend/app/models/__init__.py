@@ -8,5 +8,24 @@ from app.models.user import User
 from app.models.product import Product
 from app.models.order import Order, OrderItem
 from app.models.notification import Notification
+from app.models.email_outbox import EmailOutbox
+from app.models.payment import PaymentTransaction
+from app.models.idempotency import IdempotencyKey
+from app.models.analytics import OrderStatusCount, SalesDaily, SalesProductDaily
+from app.models.schema_meta import SchemaMeta, SchemaMigration
 
-__all__ = ["User", "Product", "Order", "OrderItem", "Notification"]
+__all__ = [
+    "User",
+    "Product",
+    "Order",
+    "OrderItem",
+    "Notification",
+    "EmailOutbox",
+    "PaymentTransaction",
+    "IdempotencyKey",
+    "SalesDaily",
+    "SalesProductDaily",
+    "OrderStatusCount",
+    "SchemaMeta",
+    "SchemaMigration",
+]
@@ -0,0 +1,43 @@
+"""
+Modelos ORM das tabelas de agregados de vendas (rollups).
+
+Mantidas incrementalmente pelos endpoints de pedido; as consultas de
+analytics leem só estas tabelas, nunca `orders`/`order_items`.
+"""
+
+from sqlalchemy import Column, Date, Float, Integer, String
+
+from app.core.database import Base
+
+
+class SalesDaily(Base):
+    """Totais por dia (UTC) de pedidos não cancelados."""
+
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    items = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class SalesProductDaily(Base):
+    """Quantidade e receita de itens por produto e dia (UTC), sem frete."""
+
+    __tablename__ = "sales_product_daily"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(String(36), primary_key=True)
+    # Título da última venda: o relatório continua legível se o produto for excluído.
+    title = Column(String(255), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class OrderStatusCount(Base):
+    """Quantidade atual de pedidos em cada status."""
+
+    __tablename__ = "order_status_counts"
+
+    status = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,31 @@
+"""
+Modelo ORM da caixa de saída de emails (outbox).
+"""
+
+import uuid
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, func
+
+from app.core.database import Base
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Consulta do poller: mensagens pendentes já vencidas.
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(String(36), primary_key=True, default=lambda: f"mail-{uuid.uuid4().hex[:12]}")
+    kind = Column(String(50), nullable=False)  # "contact", "order_confirmation"
+    recipients = Column(JSON, nullable=False)
+    subject = Column(String(255), nullable=False)
+    html = Column(Text, nullable=False)
+    # "pending" → "sending" → "sent" | "failed"
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    # Próxima tentativa; enquanto "sending", funciona como prazo do lease do worker.
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    sent_at = Column(DateTime, nullable=True)
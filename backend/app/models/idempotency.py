@@ -0,0 +1,29 @@
+"""
+Modelo ORM das chaves de idempotência (header `Idempotency-Key`).
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
+
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Limpeza periódica das chaves vencidas.
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    # Hash de (escopo, chave enviada pelo cliente): tamanho fixo para a PK.
+    id = Column(String(64), primary_key=True)
+    # Hash do corpo da requisição original; a mesma chave com outro corpo é recusada.
+    fingerprint = Column(String(64), nullable=False)
+    # "in_progress" enquanto a primeira requisição executa, depois "completed".
+    status = Column(String(20), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    # Corpo JSON da resposta, já serializado, devolvido como está nos replays.
+    response_body = Column(Text, nullable=True)
+    # Enquanto "in_progress", prazo após o qual outra requisição pode assumir a chave.
+    locked_until = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
@@ -4,13 +4,20 @@ Modelo ORM de Notificação.
 
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, String, Text, func
+from sqlalchemy import Boolean, Column, DateTime, Index, String, Text, func
+from sqlalchemy.dialects import mysql
 
-from app.core.database import Base
+from app.core.database import Base, utcnow
 
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Contagem e marcação de não lidas por role.
+        Index("ix_notifications_role_read_created_at", "role", "read", "created_at"),
+        # Feed paginado por (created_at, id) dentro da role.
+        Index("ix_notifications_role_created_at_id", "role", "created_at", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: f"notif-{uuid.uuid4().hex[:12]}")
     role = Column(String(20), nullable=False)  # "admin" ou "customer"
@@ -18,4 +25,8 @@ class Notification(Base):
     type = Column(String(50), nullable=False)
     message = Column(Text, nullable=False)
     read = Column(Boolean, default=False)
-    created_at = Column(DateTime, server_default=func.now())
+    # Default no Python: o valor já existe após o flush, para publicar no stream.
+    # Microssegundos também no MySQL: o feed `after=` ordena por (created_at, id).
+    created_at = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"), default=utcnow, server_default=func.now(6)
+    )
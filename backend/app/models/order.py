@@ -4,18 +4,23 @@ Modelos ORM de Pedido e Item do Pedido.
 
 import uuid
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, utcnow
+
+
+def new_order_id() -> str:
+    """Id do pedido gerado na aplicação: conhecido antes de qualquer INSERT."""
+    return f"order-{uuid.uuid4().hex[:12]}"
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    order_id = Column(String(36), ForeignKey("orders.id"), nullable=False)
+    order_id = Column(String(36), ForeignKey("orders.id"), nullable=False, index=True)
     product_id = Column(String(36), nullable=False)
     title = Column(String(255), nullable=False)
     author = Column(String(255), nullable=True, default="")
@@ -29,10 +34,18 @@ class OrderItem(Base):
 
 class Order(Base):
     __tablename__ = "orders"
-
-    id = Column(String(36), primary_key=True, default=lambda: f"order-{uuid.uuid4().hex[:12]}")
+    __table_args__ = (
+        # Listagens paginadas por (date, id): do cliente, geral do admin e por status.
+        Index("ix_orders_user_email_date_id", "user_email", "date", "id"),
+        Index("ix_orders_date_id", "date", "id"),
+        Index("ix_orders_status_date_id", "status", "date", "id"),
+    )
+
+    id = Column(String(36), primary_key=True, default=new_order_id)
     user_email = Column(String(255), nullable=True)
-    date = Column(DateTime, server_default=func.now())
+    # Default no Python (além do do servidor) para que a data fique disponível
+    # logo após o flush e tenha a mesma precisão dos parâmetros do cursor.
+    date = Column(DateTime, default=utcnow, server_default=func.now())
     subtotal = Column(Float, nullable=False)
     shipping_cost = Column(Float, default=0)
     total = Column(Float, nullable=False)
@@ -44,4 +57,6 @@ class Order(Base):
     payment_info = Column(JSON, nullable=True)
     status = Column(String(20), default="processando")
 
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    # "raise": os itens precisam ser carregados explicitamente
+    # (`selectinload(Order.items)`), o que impede N+1 acidentais.
+    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan", lazy="raise")
@@ -0,0 +1,24 @@
+"""
+Modelo ORM de Transação de Pagamento.
+"""
+
+from sqlalchemy import JSON, Column, DateTime, Index, String, func
+
+from app.core.database import Base
+
+
+class PaymentTransaction(Base):
+    __tablename__ = "payment_transactions"
+    __table_args__ = (
+        # Varredura de cobranças PIX pendentes já expiradas.
+        Index("ix_payment_transactions_status_expires_at", "status", "expires_at"),
+    )
+
+    transaction_id = Column(String(40), primary_key=True)
+    order_id = Column(String(36), nullable=True)
+    method = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False)
+    # `PaymentResponse` serializado (modo JSON).
+    data = Column(JSON, nullable=False)
+    expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
@@ -4,13 +4,23 @@ Modelo ORM do Produto.
 
 import uuid
 
-from sqlalchemy import Boolean, Column, Float, Integer, String, Text
+from sqlalchemy import Boolean, Column, Float, Index, Integer, String, Text
 
 from app.core.database import Base
 
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Índices compostos para a listagem paginada por cursor: cada
+        # ordenação termina em `id` para desempatar o keyset.
+        Index("ix_products_title_id", "title", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_rating_id", "rating", "id"),
+        Index("ix_products_category_price_id", "category", "price", "id"),
+        Index("ix_products_type_price_id", "type", "price", "id"),
+        Index("ix_products_flags_rating_id", "is_best_seller", "is_new", "rating", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String(255), nullable=False)
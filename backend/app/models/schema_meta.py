@@ -0,0 +1,30 @@
+"""
+Modelos ORM do controle de versão do schema.
+
+- `SchemaMeta`: uma única linha (`id = 1`) com a impressão digital do schema
+  (modelos + última migração) e a versão dos dados seed aplicados. Na
+  inicialização, se os dois estão em dia, migrações e seed são pulados (ver
+  `app.core.database.prepare_database`).
+- `SchemaMigration`: histórico das migrações aplicadas (`app.migrations`).
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.core.database import Base, utcnow
+
+
+class SchemaMeta(Base):
+    __tablename__ = "schema_meta"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    schema_hash = Column(String(64), nullable=False)
+    seed_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, nullable=False, default=utcnow)
@@ -78,3 +78,29 @@ class ProductResponse(BaseModel):
         data["isBestSeller"] = data.pop("is_best_seller", False)
         data["isNew"] = data.pop("is_new", False)
         return data
+
+
+def serialize_product(product) -> dict:
+    """
+    Converte um `Product` do ORM direto no dicionário camelCase do frontend.
+
+    Produz as mesmas chaves de `ProductResponse.model_dump()`, mas sem passar
+    pela validação do Pydantic — usado no caminho quente do catálogo, onde os
+    dados já vêm tipados do banco.
+    """
+    return {
+        "id": product.id,
+        "title": product.title,
+        "author": product.author,
+        "price": product.price,
+        "rating": product.rating,
+        "image": product.image,
+        "category": product.category,
+        "type": product.type,
+        "stock": product.stock,
+        "description": product.description,
+        "originalPrice": product.original_price,
+        "reviewsCount": product.reviews_count,
+        "isBestSeller": product.is_best_seller,
+        "isNew": product.is_new,
+    }
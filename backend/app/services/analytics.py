@@ -0,0 +1,180 @@
+"""
+Manutenção incremental dos agregados de vendas.
+
+Cada escrita de pedido aplica um delta nas tabelas de rollup dentro da
+mesma transação do pedido, com upserts do tipo `valor = valor + delta`:
+
+- `create_order`: +1 pedido, +itens, +receita no dia do pedido; +1 no status;
+- mudança de status: -1 no status antigo, +1 no novo; entrar em "cancelado"
+  desconta o pedido do dia em que foi feito, sair de "cancelado" o devolve.
+
+Os dias são os do campo `Order.date` (UTC). Receita por dia inclui frete;
+receita por produto é só preço × quantidade.
+
+`rebuild` recalcula tudo a partir de `orders`/`order_items` — usado para
+preencher os agregados de pedidos anteriores a este recurso ou corrigir
+divergências.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert
+from app.models.analytics import OrderStatusCount, SalesDaily, SalesProductDaily
+from app.models.order import Order, OrderItem
+
+CANCELLED = "cancelado"
+
+
+def _status_key(status: str | None) -> str:
+    return (status or "processando").lower()
+
+
+async def _dialect(db: AsyncSession) -> str:
+    return (await db.connection()).dialect.name
+
+
+async def _apply_sales(db: AsyncSession, order: Order, items: list[tuple[str, str, int, float]], sign: int) -> None:
+    """Soma (`sign=1`) ou subtrai (`sign=-1`) o pedido dos agregados do seu dia."""
+    dialect = await _dialect(db)
+    day = order.date.date()
+
+    daily = SalesDaily.__table__
+    await db.execute(
+        upsert(
+            dialect,
+            daily,
+            ["day"],
+            lambda new: {
+                "orders": daily.c["orders"] + new["orders"],
+                "items": daily.c["items"] + new["items"],
+                "revenue": daily.c["revenue"] + new["revenue"],
+            },
+        ),
+        {
+            "day": day,
+            "orders": sign,
+            "items": sign * sum(quantity for _, _, quantity, _ in items),
+            "revenue": sign * order.total,
+        },
+    )
+
+    # Um registro por produto (o mesmo produto pode estar em mais de um item),
+    # em ordem de id para que transações concorrentes travem na mesma ordem.
+    per_product: dict[str, list] = defaultdict(lambda: ["", 0, 0.0])
+    for product_id, title, quantity, price in items:
+        entry = per_product[product_id]
+        entry[0] = title
+        entry[1] += quantity
+        entry[2] += price * quantity
+    if not per_product:
+        return
+
+    product_daily = SalesProductDaily.__table__
+    await db.execute(
+        upsert(
+            dialect,
+            product_daily,
+            ["day", "product_id"],
+            lambda new: {
+                "title": new["title"],
+                "quantity": product_daily.c["quantity"] + new["quantity"],
+                "revenue": product_daily.c["revenue"] + new["revenue"],
+            },
+        ),
+        [
+            {
+                "day": day,
+                "product_id": product_id,
+                "title": title,
+                "quantity": sign * quantity,
+                "revenue": sign * revenue,
+            }
+            for product_id, (title, quantity, revenue) in sorted(per_product.items())
+        ],
+    )
+
+
+async def _apply_status(db: AsyncSession, deltas: dict[str, int]) -> None:
+    counts = OrderStatusCount.__table__
+    await db.execute(
+        upsert(
+            await _dialect(db),
+            counts,
+            ["status"],
+            lambda new: {"count": counts.c["count"] + new["count"]},
+        ),
+        [{"status": status, "count": delta} for status, delta in sorted(deltas.items()) if delta],
+    )
+
+
+def _order_items(order: Order) -> list[tuple[str, str, int, float]]:
+    return [(item.product_id, item.title, item.quantity, item.price) for item in order.items]
+
+
+async def record_order_created(db: AsyncSession, order: Order, items: list[tuple[str, str, int, float]]) -> None:
+    """Aplica um pedido novo; `items` são tuplas (product_id, title, quantity, price)."""
+    await _apply_sales(db, order, items, sign=1)
+    await _apply_status(db, {_status_key(order.status): 1})
+
+
+async def record_status_change(db: AsyncSession, order: Order, old_status: str | None, new_status: str) -> None:
+    """Aplica a troca de status de um pedido (com `order.items` carregado)."""
+    old_key, new_key = _status_key(old_status), _status_key(new_status)
+    if old_key == new_key:
+        return
+    if new_key == CANCELLED:
+        await _apply_sales(db, order, _order_items(order), sign=-1)
+    elif old_key == CANCELLED:
+        await _apply_sales(db, order, _order_items(order), sign=1)
+    await _apply_status(db, {old_key: -1, new_key: 1})
+
+
+async def rebuild(db: AsyncSession) -> None:
+    """Recalcula todos os agregados a partir dos pedidos (INSERT ... SELECT, sem trazer linhas ao Python)."""
+    status_key = func.lower(func.coalesce(Order.status, "processando"))
+    active = status_key != CANCELLED
+    day = func.date(Order.date)
+
+    await db.execute(delete(SalesDaily))
+    await db.execute(delete(SalesProductDaily))
+    await db.execute(delete(OrderStatusCount))
+
+    quantities = (
+        select(OrderItem.order_id, func.sum(OrderItem.quantity).label("quantity"))
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+    await db.execute(
+        insert(SalesDaily).from_select(
+            ["day", "orders", "items", "revenue"],
+            select(day, func.count(Order.id), func.coalesce(func.sum(quantities.c.quantity), 0), func.sum(Order.total))
+            .outerjoin(quantities, quantities.c.order_id == Order.id)
+            .where(active)
+            .group_by(day),
+        )
+    )
+    await db.execute(
+        insert(SalesProductDaily).from_select(
+            ["day", "product_id", "title", "quantity", "revenue"],
+            select(
+                day,
+                OrderItem.product_id,
+                func.max(OrderItem.title),
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.price * OrderItem.quantity),
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(active)
+            .group_by(day, OrderItem.product_id),
+        )
+    )
+    await db.execute(
+        insert(OrderStatusCount).from_select(
+            ["status", "count"],
+            select(status_key, func.count()).select_from(Order).group_by(status_key),
+        )
+    )
+    await db.commit()
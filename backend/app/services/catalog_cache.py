@@ -0,0 +1,58 @@
+"""
+Cache in-process do catálogo de produtos.
+
+O catálogo só muda pelos endpoints administrativos de produto, então as
+leituras (`list_products`/`get_product`) são servidas da memória e só vão ao
+MySQL em caso de miss — um hit não chega a abrir conexão do pool.
+
+O cache é versionado: toda escrita no catálogo incrementa a versão e limpa as
+entradas. Uma leitura que começou antes da invalidação não grava seu
+resultado (a versão mudou no meio), evitando repopular o cache com dados
+antigos.
+"""
+
+import threading
+from typing import Any, Hashable
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class CatalogCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+        self.version = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Retorna o valor cacheado ou `MISSING`."""
+        return self._cache.get(key)
+
+    def put(self, key: Hashable, value: Any, version: int) -> None:
+        """Grava `value` se o catálogo ainda estiver na `version` lida antes da consulta."""
+        with self._lock:
+            if version == self.version:
+                self._cache.set(key, value)
+
+    def invalidate(self) -> None:
+        """Descarta todo o cache após uma escrita no catálogo."""
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._cache.stats(),
+            "version": self.version,
+            "invalidations": self.invalidations,
+        }
+
+
+catalog_cache = CatalogCache(
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+)
@@ -1,24 +1,47 @@
 """
 Serviço de envio de emails com Resend.
+
+Os emails não são enviados dentro da requisição. O endpoint grava a mensagem
+na tabela `email_outbox` (na mesma transação do pedido, quando houver) e
+avisa o `EmailDispatcher`, cujo pool de workers faz a entrega em segundo
+plano com retries em backoff exponencial. Como a fila é persistida, mensagens
+pendentes sobrevivem a reinícios e são retomadas pelo poller da outbox.
 """
 
+import asyncio
+import random
+from collections import deque
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
 import resend
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import get_settings
+from app.core.database import SessionLocal, utcnow
+from app.core.metrics import registry
+from app.models.email_outbox import EmailOutbox
 from app.schemas.contact import ContactForm
 
 settings = get_settings()
 
 
-def _init_resend():
-    """Configura a API key do Resend."""
-    resend.api_key = settings.RESEND_API_KEY
+@dataclass
+class EmailMessage:
+    kind: str
+    recipients: list[str]
+    subject: str
+    html: str
+
 
+# ── Templates ─────────────────────────────────────────
 
-def send_contact_email(form: ContactForm):
-    """Envia email quando alguém preenche o formulário de contato."""
-    _init_resend()
 
+def build_contact_email(form: ContactForm) -> EmailMessage:
+    """Monta o email enviado quando alguém preenche o formulário de contato."""
     html = f"""
     <div style="font-family: 'Segoe UI', Arial, sans-serif; max-width: 600px; margin: 0 auto; background: #f8fafc; border-radius: 12px; overflow: hidden;">
         <div style="background: linear-gradient(135deg, #0A192F 0%, #112240 100%); padding: 32px 24px; text-align: center;">
@@ -51,24 +74,18 @@ def send_contact_email(form: ContactForm):
     </div>
     """
 
-    try:
-        r = resend.Emails.send({
-            "from": settings.RESEND_FROM_EMAIL,
-            "to": [settings.STORE_CONTACT_EMAIL],
-            "subject": f"[COMPIA Contato] {form.subject} — {form.name} {form.last_name}",
-            "html": html,
-        })
-        print(f"[email] ✓ Email de contato enviado: {r}")
-        return True
-    except Exception as e:
-        print(f"[email] ✗ Erro ao enviar email de contato: {e}")
-        return False
-
+    return EmailMessage(
+        kind="contact",
+        recipients=[settings.STORE_CONTACT_EMAIL],
+        subject=f"[COMPIA Contato] {form.subject} — {form.name} {form.last_name}",
+        html=html,
+    )
 
-def send_order_confirmation_email(order_id: str, customer_name: str, customer_email: str, total: float, items: list):
-    """Envia email de confirmação de compra para o cliente."""
-    _init_resend()
 
+def build_order_confirmation_email(
+    order_id: str, customer_name: str, customer_email: str, total: float, items: list
+) -> EmailMessage:
+    """Monta o email de confirmação de compra para o cliente."""
     # Gerar linhas HTML dos itens
     items_html = ""
     for item in items:
@@ -122,15 +139,268 @@ def send_order_confirmation_email(order_id: str, customer_name: str, customer_em
     </div>
     """
 
-    try:
-        r = resend.Emails.send({
-            "from": settings.RESEND_FROM_EMAIL,
-            "to": [customer_email],
-            "subject": f"COMPIA Store — Confirmação do Pedido {order_id}",
-            "html": html,
+    return EmailMessage(
+        kind="order_confirmation",
+        recipients=[customer_email],
+        subject=f"COMPIA Store — Confirmação do Pedido {order_id}",
+        html=html,
+    )
+
+
+# ── Transportes ───────────────────────────────────────
+
+# Fração do lease (`EMAIL_SEND_TIMEOUT_SECONDS`) que um envio pode durar. O
+# restante é a folga para gravar o resultado antes que o lease vença e outro
+# worker reivindique a mensagem (o que a enviaria de novo).
+SEND_DEADLINE_FRACTION = 0.8
+
+
+class ResendTransport:
+    """Entrega via API HTTP do Resend (cliente síncrono — chamado no threadpool)."""
+
+    def __init__(self, api_key: str, from_email: str, timeout_seconds: float):
+        self.api_key = api_key
+        self.from_email = from_email
+        # Timeout do próprio socket: a thread do envio também desiste, e não só o worker.
+        self.http_client = resend.RequestsClient(timeout=max(1, int(timeout_seconds)))
+
+    def send(self, message: EmailMessage) -> Any:
+        resend.api_key = self.api_key
+        resend.default_http_client = self.http_client
+        return resend.Emails.send({
+            "from": self.from_email,
+            "to": message.recipients,
+            "subject": message.subject,
+            "html": message.html,
         })
-        print(f"[email] ✓ Confirmação de pedido enviada para {customer_email}: {r}")
-        return True
-    except Exception as e:
-        print(f"[email] ✗ Erro ao enviar confirmação de pedido: {e}")
-        return False
+
+
+class FakeTransport:
+    """Transporte local, sem rede: guarda as últimas mensagens em memória."""
+
+    def __init__(self, max_messages: int = 1000):
+        self.sent: deque[EmailMessage] = deque(maxlen=max_messages)
+
+    def send(self, message: EmailMessage) -> Any:
+        self.sent.append(message)
+        return {"id": f"fake-{len(self.sent)}"}
+
+
+def _build_transport():
+    if settings.EMAIL_TRANSPORT == "fake":
+        return FakeTransport()
+    return ResendTransport(
+        settings.RESEND_API_KEY,
+        settings.RESEND_FROM_EMAIL,
+        timeout_seconds=settings.EMAIL_SEND_TIMEOUT_SECONDS * SEND_DEADLINE_FRACTION,
+    )
+
+
+# ── Outbox ────────────────────────────────────────────
+
+
+def queue_email(db: AsyncSession, message: EmailMessage) -> EmailOutbox:
+    """
+    Adiciona a mensagem à outbox na sessão atual (sem commit).
+
+    Depois do commit, o chamador deve chamar `email_dispatcher.notify(outbox.id)`
+    para que a entrega comece imediatamente em vez de esperar o próximo poll.
+    """
+    outbox = EmailOutbox(
+        kind=message.kind,
+        recipients=message.recipients,
+        subject=message.subject,
+        html=message.html,
+        status="pending",
+        attempts=0,
+        next_attempt_at=utcnow(),
+    )
+    db.add(outbox)
+    return outbox
+
+
+class EmailDispatcher:
+    """Fila limitada de ids da outbox consumida por um pool de workers assíncronos."""
+
+    def __init__(
+        self,
+        transport,
+        workers: int,
+        queue_size: int,
+        max_attempts: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        send_timeout_seconds: float,
+        poll_interval_seconds: float,
+    ):
+        self.transport = transport
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.send_timeout_seconds = send_timeout_seconds
+        self.send_deadline_seconds = send_timeout_seconds * SEND_DEADLINE_FRACTION
+        self.poll_interval_seconds = poll_interval_seconds
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self._queued: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._poll_loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self, outbox_id: str) -> None:
+        """Enfileira uma mensagem já commitada. Com a fila cheia, o poller a recupera depois."""
+        if outbox_id in self._queued:
+            return
+        try:
+            self._queue.put_nowait(outbox_id)
+        except asyncio.QueueFull:
+            return
+        self._queued.add(outbox_id)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _poll_loop(self) -> None:
+        """Recoloca na fila mensagens vencidas: pendentes após reinício, retries e leases expirados."""
+        while True:
+            try:
+                free = self._queue.maxsize - self._queue.qsize()
+                if free > 0:
+                    async with SessionLocal() as db:
+                        due_ids = (
+                            await db.scalars(
+                                select(EmailOutbox.id)
+                                .where(
+                                    EmailOutbox.status.in_(("pending", "sending")),
+                                    EmailOutbox.next_attempt_at <= utcnow(),
+                                )
+                                .order_by(EmailOutbox.next_attempt_at)
+                                .limit(free)
+                            )
+                        ).all()
+                    for outbox_id in due_ids:
+                        self.notify(outbox_id)
+            except Exception as e:
+                print(f"[email] ✗ Erro ao consultar a outbox: {e}")
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _worker(self) -> None:
+        while True:
+            outbox_id = await self._queue.get()
+            self._queued.discard(outbox_id)
+            try:
+                await self._deliver(outbox_id)
+            except Exception as e:
+                print(f"[email] ✗ Erro inesperado ao processar {outbox_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, outbox_id: str) -> None:
+        async with SessionLocal() as db:
+            # Reivindica a mensagem com um lease: só um worker (de qualquer
+            # processo) consegue passar do UPDATE condicional.
+            now = utcnow()
+            claimed = await db.execute(
+                update(EmailOutbox)
+                .where(
+                    EmailOutbox.id == outbox_id,
+                    EmailOutbox.status.in_(("pending", "sending")),
+                    EmailOutbox.next_attempt_at <= now,
+                )
+                .values(
+                    status="sending",
+                    attempts=EmailOutbox.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=self.send_timeout_seconds),
+                )
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return
+
+            outbox = await db.get(EmailOutbox, outbox_id)
+            message = EmailMessage(
+                kind=outbox.kind,
+                recipients=outbox.recipients,
+                subject=outbox.subject,
+                html=outbox.html,
+            )
+            error = None
+            try:
+                # O envio termina antes do lease: enquanto ele dura, nenhum
+                # outro worker consegue reivindicar a mesma mensagem.
+                r = await asyncio.wait_for(
+                    run_in_threadpool(self.transport.send, message),
+                    timeout=self.send_deadline_seconds,
+                )
+            except TimeoutError:
+                error = f"Tempo de envio esgotado ({self.send_deadline_seconds:g}s)"
+            except Exception as e:
+                error = str(e)
+
+            if error is not None:
+                outbox.last_error = error
+                if outbox.attempts >= self.max_attempts:
+                    outbox.status = "failed"
+                    self.failed += 1
+                    print(f"[email] ✗ Desistindo de {outbox.kind} {outbox_id} após {outbox.attempts} tentativas: {error}")
+                else:
+                    delay = self._retry_delay(outbox.attempts)
+                    outbox.status = "pending"
+                    outbox.next_attempt_at = utcnow() + timedelta(seconds=delay)
+                    self.retried += 1
+                    asyncio.get_running_loop().call_later(delay, self.notify, outbox_id)
+                    print(f"[email] ✗ Falha ao enviar {outbox.kind} {outbox_id} (tentativa {outbox.attempts}); nova tentativa em {delay:.1f}s: {error}")
+                await db.commit()
+                return
+
+            outbox.status = "sent"
+            outbox.sent_at = utcnow()
+            outbox.last_error = None
+            await db.commit()
+            self.sent += 1
+            print(f"[email] ✓ {outbox.kind} enviado para {', '.join(outbox.recipients)}: {r}")
+
+
+email_dispatcher = EmailDispatcher(
+    transport=_build_transport(),
+    workers=settings.EMAIL_WORKERS,
+    queue_size=settings.EMAIL_QUEUE_MAX_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=settings.EMAIL_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.EMAIL_RETRY_MAX_SECONDS,
+    send_timeout_seconds=settings.EMAIL_SEND_TIMEOUT_SECONDS,
+    poll_interval_seconds=settings.EMAIL_OUTBOX_POLL_SECONDS,
+)
+
+registry.callback_gauge(
+    "email_queue_depth",
+    "Mensagens na fila em memória do dispatcher, aguardando um worker.",
+    (),
+    lambda: {(): email_dispatcher.stats()["queued"]},
+)
+registry.callback_counter(
+    "email_deliveries_total",
+    "Tentativas de envio por resultado (retried = falhou e volta a tentar; failed = desistiu).",
+    ("result",),
+    lambda: {(result,): count for result, count in email_dispatcher.stats().items() if result != "queued"},
+)
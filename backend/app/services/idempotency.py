@@ -0,0 +1,275 @@
+"""
+Suporte ao header `Idempotency-Key` nas criações de pedido e de pagamento.
+
+Um cliente que repete `POST /orders` ou `POST /payments` após um timeout
+envia a mesma chave; a segunda requisição recebe a resposta guardada da
+primeira, sem executar o endpoint de novo (nada de pedido, transação ou
+email duplicados).
+
+As chaves ficam na tabela `idempotency_keys`, compartilhada entre workers:
+
+1. A primeira requisição insere a chave como `in_progress` (a PK garante
+   que só uma vence) e executa o endpoint.
+2. O endpoint grava a resposta serializada e marca a chave `completed` na
+   sua própria transação (`IdempotentRequest.record`), antes do commit:
+   o pedido ou a transação de pagamento e a chave concluída ficam
+   visíveis juntos, sem janela em que o efeito existe e a chave ainda está
+   `in_progress`. Em caso de erro a chave é liberada para que o cliente
+   possa tentar de novo.
+3. Uma repetição com chave `completed` recebe o corpo guardado; com chave
+   ainda `in_progress`, recebe 409. Se o processo que segurava a chave
+   morreu, ela pode ser assumida após `IDEMPOTENCY_LOCK_SECONDS`.
+
+As respostas concluídas também ficam num `TTLCache` local, de modo que um
+replay no mesmo worker não toca o banco. Chaves vencem após
+`IDEMPOTENCY_TTL_SECONDS` e são apagadas pelo `run_sweeper`.
+"""
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import get_settings
+from app.core.database import SessionLocal, utcnow
+from app.models.idempotency import IdempotencyKey
+
+settings = get_settings()
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    body: bytes
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, max_entries: int, ttl: float, lock_seconds: float):
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    async def begin(self, key_id: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Reserva a chave para esta requisição (retorna `None`) ou devolve a
+        resposta já concluída de uma requisição anterior.
+        """
+        stored = self._cache.get(key_id)
+        if stored is not MISSING:
+            return self._check_fingerprint(stored, fingerprint)
+
+        now = utcnow()
+        values = {
+            "fingerprint": fingerprint,
+            "status": "in_progress",
+            "status_code": None,
+            "response_body": None,
+            "locked_until": now + timedelta(seconds=self.lock_seconds),
+            "expires_at": now + timedelta(seconds=self.ttl),
+        }
+        async with SessionLocal() as db:
+            db.add(IdempotencyKey(id=key_id, **values))
+            try:
+                await db.commit()
+                return None
+            except IntegrityError:
+                await db.rollback()
+
+            # A chave já existe: assume-a se venceu ou se o lock foi abandonado.
+            result = await db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.id == key_id,
+                    or_(
+                        IdempotencyKey.expires_at <= now,
+                        (IdempotencyKey.status == "in_progress") & (IdempotencyKey.locked_until <= now),
+                    ),
+                )
+                .values(**values)
+            )
+            await db.commit()
+            if result.rowcount == 1:
+                return None
+
+            row = await db.get(IdempotencyKey, key_id)
+
+        if row is None or row.status != "completed":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Uma requisição com esta Idempotency-Key ainda está em processamento.",
+            )
+        stored = StoredResponse(
+            fingerprint=row.fingerprint,
+            status_code=row.status_code,
+            body=row.response_body.encode("utf-8"),
+        )
+        self._cache.set(key_id, stored)
+        return self._check_fingerprint(stored, fingerprint)
+
+    @staticmethod
+    def _check_fingerprint(stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Esta Idempotency-Key já foi usada com outro corpo de requisição.",
+            )
+        return stored
+
+    @staticmethod
+    async def stage_completion(db: AsyncSession, key_id: str, stored: StoredResponse) -> None:
+        """Marca a chave como concluída na transação de `db` (sem commit)."""
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == key_id)
+            .values(
+                status="completed",
+                status_code=stored.status_code,
+                response_body=stored.body.decode("utf-8"),
+            )
+        )
+
+    async def complete(self, key_id: str, stored: StoredResponse) -> None:
+        async with SessionLocal() as db:
+            await self.stage_completion(db, key_id, stored)
+            await db.commit()
+        self.remember(key_id, stored)
+
+    def remember(self, key_id: str, stored: StoredResponse) -> None:
+        self._cache.set(key_id, stored)
+
+    async def release(self, key_id: str) -> None:
+        async with SessionLocal() as db:
+            await db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.id == key_id, IdempotencyKey.status == "in_progress"
+                )
+            )
+            await db.commit()
+
+    async def sweep_expired(self) -> int:
+        self._cache.purge()
+        async with SessionLocal() as db:
+            result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= utcnow()))
+            await db.commit()
+        return result.rowcount
+
+
+idempotency_store = IdempotencyStore(
+    max_entries=settings.IDEMPOTENCY_CACHE_MAX_ENTRIES,
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+)
+
+
+def _serialize(result: Any) -> bytes:
+    return json.dumps(jsonable_encoder(result), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class IdempotentRequest:
+    """Chave reservada por `run_idempotent`, entregue ao handler."""
+
+    def __init__(self, key_id: Optional[str], fingerprint: str, status_code: int):
+        self.key_id = key_id
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.stored: Optional[StoredResponse] = None
+
+    async def record(self, db: AsyncSession, result: Any) -> None:
+        """
+        Grava `result` como resposta da chave na transação de `db`, sem commit.
+
+        O handler chama logo antes do seu commit; sem chave, não faz nada.
+        """
+        if self.key_id is None:
+            return
+        stored = StoredResponse(self.fingerprint, self.status_code, _serialize(result))
+        await idempotency_store.stage_completion(db, self.key_id, stored)
+        self.stored = stored
+
+
+async def run_idempotent(
+    scope: str,
+    key: Optional[str],
+    payload: BaseModel,
+    handler: Callable[[IdempotentRequest], Awaitable[Any]],
+    status_code: int,
+) -> Any:
+    """
+    Executa `handler` no máximo uma vez por (`scope`, `key`).
+
+    Sem chave, apenas executa. Com chave, a resposta bem-sucedida é
+    serializada uma vez, guardada e devolvida como `Response` — tanto na
+    primeira execução quanto nos replays, que levam o header
+    `Idempotent-Replayed: true`.
+
+    `scope` deve identificar o cliente (ex.: o email): chaves de clientes
+    diferentes nunca colidem. O handler recebe o `IdempotentRequest` e chama
+    `record` na transação em que grava seus efeitos; um handler que não
+    chama `record` tem a resposta gravada numa transação à parte.
+    """
+    if key is None:
+        return await handler(IdempotentRequest(None, "", status_code))
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key deve ter entre 1 e {MAX_KEY_LENGTH} caracteres.",
+        )
+
+    key_id = _digest(scope, key)
+    fingerprint = _digest(payload.model_dump_json())
+    stored = await idempotency_store.begin(key_id, fingerprint)
+    if stored is not None:
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    request = IdempotentRequest(key_id, fingerprint, status_code)
+    try:
+        result = await handler(request)
+    except BaseException:
+        # Só apaga a chave ainda `in_progress`: se o commit do handler já
+        # a concluiu, os replays continuam devolvendo a resposta gravada.
+        await idempotency_store.release(key_id)
+        raise
+
+    stored = request.stored
+    if stored is None:
+        stored = StoredResponse(fingerprint, status_code, _serialize(result))
+        await idempotency_store.complete(key_id, stored)
+    else:
+        idempotency_store.remember(key_id, stored)
+    return Response(content=stored.body, status_code=status_code, media_type="application/json")
+
+
+async def run_sweeper(interval_seconds: float = settings.IDEMPOTENCY_SWEEP_INTERVAL_SECONDS) -> None:
+    """Loop de fundo que apaga chaves de idempotência vencidas."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await idempotency_store.sweep_expired()
+            if removed:
+                print(f"[idempotency] {removed} chave(s) vencida(s) removida(s)")
+        except Exception as e:
+            print(f"[idempotency] ✗ Erro na limpeza de chaves: {e}")
@@ -0,0 +1,95 @@
+"""
+Pub/sub in-process de notificações para o stream SSE.
+
+Cada conexão em `GET /notifications/stream` assina a role do usuário e recebe
+uma fila própria. Quando um endpoint cria notificações, ele as publica aqui
+depois do commit; o payload JSON é serializado uma única vez e distribuído a
+todos os assinantes da role.
+
+O broker é local ao processo: com vários workers do uvicorn, cada cliente só
+recebe o que foi criado no worker em que está conectado; ao (re)conectar, o
+cliente busca o que perdeu no feed incremental (`GET /notifications?after=<id>`).
+
+Além das filas SSE, o broker avisa listeners síncronos (ex.: o contador de
+não lidas) a cada publicação.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.models.notification import Notification
+from app.schemas.notification import NotificationResponse
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class NotificationEvent:
+    id: str
+    data: str
+
+
+class NotificationBroker:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._listeners: list[Callable[[Notification], None]] = []
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, role: str) -> asyncio.Queue:
+        queue: asyncio.Queue[NotificationEvent] = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[role].add(queue)
+        return queue
+
+    def unsubscribe(self, role: str, queue: asyncio.Queue) -> None:
+        self._subscribers[role].discard(queue)
+
+    def add_listener(self, listener: Callable[[Notification], None]) -> None:
+        self._listeners.append(listener)
+
+    def publish(self, *notifications: Notification) -> None:
+        """Distribui notificações já commitadas aos assinantes da role de cada uma."""
+        for notification in notifications:
+            for listener in self._listeners:
+                listener(notification)
+            subscribers = self._subscribers.get(notification.role)
+            if not subscribers:
+                continue
+            payload = NotificationResponse.model_validate(notification).model_dump()
+            event = NotificationEvent(id=notification.id, data=json.dumps(payload, ensure_ascii=False))
+            for queue in subscribers:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # Cliente lento: descarta em vez de acumular memória sem limite.
+                    self.dropped += 1
+            self.published += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": {role: len(queues) for role, queues in self._subscribers.items()},
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+notification_broker = NotificationBroker(queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE)
+
+registry.callback_gauge(
+    "notification_stream_subscribers",
+    "Conexões SSE abertas em /notifications/stream por role.",
+    ("role",),
+    lambda: {(role,): count for role, count in notification_broker.stats()["subscribers"].items()},
+)
+registry.callback_counter(
+    "notification_stream_events_total",
+    "Notificações publicadas no stream e eventos descartados por fila cheia de um cliente lento.",
+    ("result",),
+    lambda: {(result,): notification_broker.stats()[result] for result in ("published", "dropped")},
+)
@@ -0,0 +1,115 @@
+"""
+Exportação de pedidos para relatórios (`GET /orders/export`).
+
+Pedidos e itens são lidos numa única consulta (JOIN), em ordem de
+(date, id), com cursor do lado do servidor (`yield_per`): só um bloco de
+linhas fica em memória por vez, qualquer que seja o período exportado.
+
+- CSV: uma linha por item, com os dados do pedido repetidos.
+- NDJSON: uma linha por pedido, com os itens aninhados — as linhas do JOIN
+  chegam agrupadas por pedido, então basta acumular até o id mudar.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Literal, Optional
+
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.order import Order, OrderItem
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_BATCH_SIZE = 1000
+
+ORDER_COLUMNS = [
+    "id",
+    "date",
+    "status",
+    "user_email",
+    "customer_name",
+    "customer_email",
+    "delivery_method",
+    "subtotal",
+    "shipping_cost",
+    "total",
+]
+ITEM_COLUMNS = ["product_id", "title", "type", "price", "quantity"]
+
+CSV_HEADER = ["order_" + name if name in ("id", "date", "status") else name for name in ORDER_COLUMNS] + [
+    "item_" + name for name in ITEM_COLUMNS
+]
+
+
+def _query(status_filter: Optional[str], date_from: Optional[datetime], date_to: Optional[datetime]):
+    query = (
+        select(
+            *(getattr(Order, name) for name in ORDER_COLUMNS),
+            *(getattr(OrderItem, name) for name in ITEM_COLUMNS),
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .order_by(Order.date, Order.id, OrderItem.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if status_filter is not None:
+        query = query.where(Order.status == status_filter)
+    if date_from is not None:
+        query = query.where(Order.date >= date_from)
+    if date_to is not None:
+        query = query.where(Order.date <= date_to)
+    return query
+
+
+def _csv_chunk(rows: Iterable[tuple]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        ["" if value is None else value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def _order_line(order: dict[str, Any]) -> str:
+    return json.dumps(order, ensure_ascii=False, default=datetime.isoformat) + "\n"
+
+
+async def export_orders(
+    fmt: ExportFormat,
+    status_filter: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> AsyncIterator[bytes]:
+    """Gera a exportação em blocos (sessão própria: o stream dura mais que a requisição)."""
+    if fmt == "csv":
+        yield _csv_chunk([CSV_HEADER])
+
+    order_width = len(ORDER_COLUMNS)
+    current: Optional[dict[str, Any]] = None
+
+    async with SessionLocal() as db:
+        result = await db.stream(_query(status_filter, date_from, date_to))
+        async for rows in result.partitions():
+            if fmt == "csv":
+                yield _csv_chunk(rows)
+                continue
+
+            lines = []
+            for row in rows:
+                if current is None or current["id"] != row[0]:
+                    if current is not None:
+                        lines.append(_order_line(current))
+                    current = dict(zip(ORDER_COLUMNS, row[:order_width]))
+                    current["items"] = []
+                # Pedido sem itens: o OUTER JOIN traz as colunas do item nulas.
+                if row[order_width] is not None:
+                    current["items"].append(dict(zip(ITEM_COLUMNS, row[order_width:])))
+            # O último pedido do bloco pode continuar no próximo; sai depois.
+            if lines:
+                yield "".join(lines).encode("utf-8")
+
+    if current is not None:
+        yield _order_line(current).encode("utf-8")
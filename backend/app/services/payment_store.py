@@ -0,0 +1,152 @@
+"""
+Armazenamento de transações de pagamento.
+
+Dois backends com a mesma interface, escolhidos por `PAYMENT_STORE_BACKEND`:
+
+- `database`: tabela `payment_transactions`, compartilhada entre todos os
+  workers do uvicorn — a confirmação de um PIX funciona em qualquer worker.
+- `memory`: mapa local ao processo, limitado em tamanho e com TTL; útil em
+  desenvolvimento com um único worker.
+
+Nos dois casos, cobranças PIX pendentes cujo `expires_at` já passou são
+removidas periodicamente pelo `run_sweeper`, iniciado no lifespan.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import get_settings
+from app.core.database import SessionLocal, utcnow
+from app.models.payment import PaymentTransaction
+from app.schemas.payment import PaymentMethod, PaymentResponse, PaymentStatus
+
+settings = get_settings()
+
+
+def _is_expired_pix(payment: PaymentResponse, now: datetime) -> bool:
+    return (
+        payment.method == PaymentMethod.PIX
+        and payment.status == PaymentStatus.PENDING
+        and payment.pix is not None
+        and payment.pix.expires_at <= now
+    )
+
+
+def _expires_at(payment: PaymentResponse) -> Optional[datetime]:
+    """Vencimento do PIX em UTC sem fuso, como nas colunas `DateTime`."""
+    if payment.pix is None:
+        return None
+    return payment.pix.expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class PaymentStore(ABC):
+    @abstractmethod
+    async def get(self, transaction_id: str) -> Optional[PaymentResponse]:
+        """Busca uma transação pelo id (`None` se não existir)."""
+
+    @abstractmethod
+    async def create(self, db: AsyncSession, payment: PaymentResponse, order_id: Optional[str] = None) -> None:
+        """Grava uma transação nova na sessão `db`, sem commit (o chamador faz o commit)."""
+
+    @abstractmethod
+    async def update(self, payment: PaymentResponse) -> None:
+        """Atualiza o status de uma transação existente (o pedido associado não muda)."""
+
+    @abstractmethod
+    async def sweep_expired(self) -> int:
+        """Remove cobranças PIX pendentes expiradas; retorna quantas foram removidas."""
+
+
+class MemoryPaymentStore(PaymentStore):
+    def __init__(self, max_entries: int, retention_seconds: float):
+        self._cache = TTLCache(max_entries=max_entries, ttl=retention_seconds)
+
+    async def get(self, transaction_id: str) -> Optional[PaymentResponse]:
+        payment = self._cache.get(transaction_id)
+        return None if payment is MISSING else payment
+
+    async def create(self, db: AsyncSession, payment: PaymentResponse, order_id: Optional[str] = None) -> None:
+        self._cache.set(payment.transaction_id, payment)
+
+    async def update(self, payment: PaymentResponse) -> None:
+        self._cache.set(payment.transaction_id, payment)
+
+    async def sweep_expired(self) -> int:
+        now = datetime.now(timezone.utc)
+        return self._cache.purge(lambda payment: _is_expired_pix(payment, now))
+
+
+class DatabasePaymentStore(PaymentStore):
+    async def get(self, transaction_id: str) -> Optional[PaymentResponse]:
+        async with SessionLocal() as db:
+            data = await db.scalar(
+                select(PaymentTransaction.data).where(PaymentTransaction.transaction_id == transaction_id)
+            )
+        return None if data is None else PaymentResponse.model_validate(data)
+
+    async def create(self, db: AsyncSession, payment: PaymentResponse, order_id: Optional[str] = None) -> None:
+        # INSERT direto: o id acabou de ser gerado, não há linha para mesclar.
+        await db.execute(
+            insert(PaymentTransaction).values(
+                transaction_id=payment.transaction_id,
+                order_id=order_id,
+                method=payment.method.value,
+                status=payment.status.value,
+                data=payment.model_dump(mode="json"),
+                expires_at=_expires_at(payment),
+            )
+        )
+
+    async def update(self, payment: PaymentResponse) -> None:
+        async with SessionLocal() as db:
+            await db.execute(
+                update(PaymentTransaction)
+                .where(PaymentTransaction.transaction_id == payment.transaction_id)
+                .values(
+                    status=payment.status.value,
+                    data=payment.model_dump(mode="json"),
+                    expires_at=_expires_at(payment),
+                )
+            )
+            await db.commit()
+
+    async def sweep_expired(self) -> int:
+        async with SessionLocal() as db:
+            result = await db.execute(
+                delete(PaymentTransaction).where(
+                    PaymentTransaction.status == PaymentStatus.PENDING.value,
+                    PaymentTransaction.expires_at <= utcnow(),
+                )
+            )
+            await db.commit()
+        return result.rowcount
+
+
+def _build_store() -> PaymentStore:
+    if settings.PAYMENT_STORE_BACKEND == "memory":
+        return MemoryPaymentStore(
+            max_entries=settings.PAYMENT_STORE_MAX_ENTRIES,
+            retention_seconds=settings.PAYMENT_RETENTION_SECONDS,
+        )
+    return DatabasePaymentStore()
+
+
+payment_store = _build_store()
+
+
+async def run_sweeper(interval_seconds: float = settings.PAYMENT_SWEEP_INTERVAL_SECONDS) -> None:
+    """Loop de fundo que remove cobranças PIX expiradas."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await payment_store.sweep_expired()
+            if removed:
+                print(f"[payments] {removed} cobrança(s) PIX expirada(s) removida(s)")
+        except Exception as e:
+            print(f"[payments] ✗ Erro na varredura de PIX expirados: {e}")
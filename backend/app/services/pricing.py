@@ -0,0 +1,152 @@
+"""
+Recalculo no servidor dos preços e totais de um pedido.
+
+O cliente envia `price` por item, `subtotal`, `shipping_cost` e `total`;
+nada disso é confiável. Os preços de referência vêm de um índice em memória
+(`product_id -> preço`) que só consulta o banco para os ids ausentes, todos
+em um único `SELECT ... WHERE id IN (...)` — no máximo uma consulta por
+checkout, qualquer que seja o tamanho do carrinho.
+
+O índice acompanha a versão do `catalog_cache`: qualquer escrita no catálogo
+invalida o cache de catálogo e, com ele, os preços indexados. Em outros
+workers a convergência depende de `PRICE_INDEX_TTL_SECONDS`.
+
+As contas são feitas em `Decimal`, arredondadas a centavos; qualquer
+divergência com o que o cliente enviou recusa o pedido.
+"""
+
+import threading
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.models.product import Product
+from app.schemas.order import OrderCreate
+from app.services.catalog_cache import catalog_cache
+
+settings = get_settings()
+
+CENTS = Decimal("0.01")
+
+
+def to_money(value: float | Decimal) -> Decimal:
+    """Converte para `Decimal` em centavos (via `str`, para não herdar o erro binário do float)."""
+    return Decimal(str(value)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+@dataclass(frozen=True)
+class PricedOrder:
+    item_prices: list[Decimal]
+    subtotal: Decimal
+    shipping_cost: Decimal
+    total: Decimal
+
+
+class PriceIndex:
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+        self._version = catalog_cache.version
+
+    def _sync_version(self) -> int:
+        """Descarta os preços se o catálogo mudou desde a última consulta."""
+        with self._lock:
+            if self._version != catalog_cache.version:
+                self._version = catalog_cache.version
+                self._cache.clear()
+            return self._version
+
+    async def get_prices(self, db: AsyncSession, product_ids: Iterable[str]) -> dict[str, Decimal]:
+        """Preço atual de cada id existente; ids desconhecidos ficam de fora do resultado."""
+        version = self._sync_version()
+        prices: dict[str, Decimal] = {}
+        missing: set[str] = set()
+        for product_id in product_ids:
+            price = self._cache.get(product_id)
+            if price is MISSING:
+                missing.add(product_id)
+            else:
+                prices[product_id] = price
+
+        if missing:
+            rows = (await db.execute(select(Product.id, Product.price).where(Product.id.in_(missing)))).all()
+            loaded = {row.id: to_money(row.price) for row in rows}
+            prices.update(loaded)
+            with self._lock:
+                # Uma escrita no catálogo durante a consulta torna o resultado suspeito.
+                if version == catalog_cache.version:
+                    for product_id, price in loaded.items():
+                        self._cache.set(product_id, price)
+        return prices
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "catalog_version": self._version}
+
+
+price_index = PriceIndex(
+    max_entries=settings.PRICE_INDEX_MAX_ENTRIES,
+    ttl=settings.PRICE_INDEX_TTL_SECONDS,
+)
+
+registry.callback_gauge(
+    "price_index_entries",
+    "Preços em cache no índice usado para recalcular os pedidos.",
+    (),
+    lambda: {(): price_index.stats()["size"]},
+)
+registry.callback_counter(
+    "price_index_lookups_total",
+    "Consultas ao índice de preços por resultado (hit = sem ir ao banco).",
+    ("result",),
+    lambda: {("hit",): price_index.stats()["hits"], ("miss",): price_index.stats()["misses"]},
+)
+
+
+async def price_order(db: AsyncSession, payload: OrderCreate) -> PricedOrder:
+    """
+    Recalcula preços e totais do pedido a partir do catálogo.
+
+    Levanta 409 se algum produto não existe ou mudou de preço, e 400 se
+    `subtotal`/`total` enviados não batem com o recalculado.
+    """
+    prices = await price_index.get_prices(db, {item.id for item in payload.items})
+
+    unknown = [item.title for item in payload.items if item.id not in prices]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Produtos indisponíveis no catálogo: {', '.join(unknown)}.",
+        )
+    changed = [item.title for item in payload.items if to_money(item.price) != prices[item.id]]
+    if changed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"O preço mudou para: {', '.join(changed)}. Atualize o carrinho e tente novamente.",
+        )
+
+    item_prices = [prices[item.id] for item in payload.items]
+    subtotal = sum(
+        (price * item.quantity for price, item in zip(item_prices, payload.items)),
+        Decimal("0.00"),
+    )
+    shipping_cost = to_money(payload.shipping_cost)
+    if shipping_cost < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Valor de frete inválido.",
+        )
+    total = subtotal + shipping_cost
+
+    if to_money(payload.subtotal) != subtotal or to_money(payload.total) != total:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Totais do pedido não conferem (subtotal R$ {subtotal}, total R$ {total}).",
+        )
+    return PricedOrder(item_prices=item_prices, subtotal=subtotal, shipping_cost=shipping_cost, total=total)
@@ -0,0 +1,256 @@
+"""
+Importação e exportação em massa do catálogo.
+
+Importação (`POST /products/bulk`): o corpo — NDJSON ou CSV — é lido como
+stream, linha a linha, e cada linha é validada com `ProductCreate`. As
+linhas válidas são gravadas em lotes de `PRODUCT_IMPORT_BATCH_SIZE`, cada
+lote gravado com upserts (executemany) na sua própria transação; linhas com
+`id` existente são atualizadas, as demais inseridas. Na atualização só mudam
+as colunas presentes na linha: um campo omitido (ou vazio no CSV) mantém o
+valor atual em vez de voltar ao padrão do schema. Se um lote falha no banco,
+as suas linhas são regravadas uma a uma para apontar exatamente as linhas
+com erro. A memória usada não depende do tamanho do arquivo: só um lote fica
+em memória por vez, e o relatório guarda no máximo `MAX_REPORTED_ERRORS` erros.
+
+Exportação (`GET /products/export`): o catálogo é lido com cursor do lado do
+servidor (`yield_per`) e enviado em blocos, no mesmo formato aceito pela
+importação — um arquivo exportado pode ser reimportado como está.
+"""
+
+import codecs
+import csv
+import io
+import itertools
+import json
+import uuid
+from typing import Any, AsyncIterator, Literal
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal, engine, upsert
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+
+settings = get_settings()
+
+BulkFormat = Literal["ndjson", "csv"]
+
+MAX_REPORTED_ERRORS = 100
+
+# Colunas importáveis; com `id` existente, só as informadas na linha são atualizadas
+# (avaliação e nº de avaliações são sempre preservados).
+_IMPORT_COLUMNS = list(ProductCreate.model_fields)
+
+EXPORT_COLUMNS = ["id", *_IMPORT_COLUMNS, "rating", "reviews_count"]
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Divide o stream em linhas numeradas (UTF-8, BOM opcional, `\\n` ou `\\r\\n`)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_number = 0
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                line_number += 1
+                yield line_number, line.rstrip("\r")
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Arquivo inválido: a linha {line_number + 1} não está em UTF-8.",
+        )
+    if buffer:
+        yield line_number + 1, buffer.rstrip("\r")
+
+
+async def _ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Any]]:
+    async for line_number, line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"JSON inválido: {e.msg}")
+
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Any]]:
+    """Registros CSV com cabeçalho; campos entre aspas podem conter quebras de linha."""
+    header: list[str] | None = None
+    pending: list[str] = []
+    first_line = 0
+    async for line_number, line in _lines(chunks):
+        if not pending:
+            if not line.strip():
+                continue
+            first_line = line_number
+        pending.append(line)
+        text = "\n".join(pending)
+        # Número ímpar de aspas: ainda dentro de um campo entre aspas.
+        if text.count('"') % 2:
+            continue
+        pending = []
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield first_line, ValueError(f"Esperadas {len(header)} colunas, encontradas {len(values)}.")
+            continue
+        yield first_line, dict(zip(header, values))
+    if pending:
+        yield first_line, ValueError("Campo entre aspas não foi fechado.")
+
+
+def _to_row(record: Any) -> tuple[dict, tuple[str, ...]]:
+    """
+    Valida um registro e devolve a linha pronta para o upsert e as colunas
+    informadas nele (as únicas atualizadas se o `id` já existir).
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Cada registro deve ser um objeto.")
+    # Campos vazios (comuns no CSV) contam como omitidos: valor padrão do
+    # schema na inserção, valor atual preservado na atualização.
+    data = {key: value for key, value in record.items() if value not in ("", None)}
+    product_id = str(data.pop("id", "") or uuid.uuid4())
+    if len(product_id) > 36:
+        raise ValueError("id: deve ter no máximo 36 caracteres.")
+    product = ProductCreate.model_validate(data)
+    row = product.model_dump()
+    row["id"] = product_id
+    supplied = product.model_dump(exclude_unset=True)
+    return row, tuple(column for column in _IMPORT_COLUMNS if column in supplied)
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+        )
+    return str(error)
+
+
+class ImportReport:
+    def __init__(self):
+        self.processed = 0
+        self.upserted = 0
+        self.failed = 0
+        self.errors: list[dict[str, Any]] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "upserted": self.upserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "truncated": self.failed > len(self.errors),
+        }
+
+
+class _Writer:
+    """Grava os lotes da importação, com um upsert por conjunto de colunas informadas."""
+
+    def __init__(self, report: ImportReport):
+        self.report = report
+        self._statements: dict[tuple[str, ...], Any] = {}
+
+    def _statement(self, columns: tuple[str, ...]):
+        statement = self._statements.get(columns)
+        if statement is None:
+            statement = self._statements[columns] = upsert(
+                engine.dialect.name,
+                Product.__table__,
+                ["id"],
+                lambda new: {column: new[column] for column in columns},
+            )
+        return statement
+
+    async def write(self, batch: list[tuple[int, dict, tuple[str, ...]]]) -> None:
+        """Grava o lote numa transação; se falhar, regrava linha a linha para achar as culpadas."""
+        async with SessionLocal() as db:
+            try:
+                # Grupos consecutivos: a ordem do arquivo vale para ids repetidos.
+                for columns, group in itertools.groupby(batch, key=lambda item: item[2]):
+                    await db.execute(self._statement(columns), [row for _, row, _ in group])
+                await db.commit()
+            except Exception:
+                await db.rollback()
+            else:
+                self.report.upserted += len(batch)
+                return
+
+        for line_number, row, columns in batch:
+            async with SessionLocal() as db:
+                try:
+                    await db.execute(self._statement(columns), [row])
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    self.report.error(line_number, f"Não foi gravada: {e.__class__.__name__}: {e}"[:500])
+                    continue
+            self.report.upserted += 1
+
+
+async def import_products(chunks: AsyncIterator[bytes], fmt: BulkFormat) -> dict[str, Any]:
+    """Lê o stream, valida e grava em lotes; devolve o relatório da importação."""
+    records = _csv_records(chunks) if fmt == "csv" else _ndjson_records(chunks)
+    batch_size = settings.PRODUCT_IMPORT_BATCH_SIZE
+    report = ImportReport()
+    writer = _Writer(report)
+    batch: list[tuple[int, dict, tuple[str, ...]]] = []
+
+    async for line_number, record in records:
+        report.processed += 1
+        if isinstance(record, Exception):
+            report.error(line_number, str(record))
+            continue
+        try:
+            batch.append((line_number, *_to_row(record)))
+        except (ValidationError, ValueError) as e:
+            report.error(line_number, _describe(e))
+            continue
+        if len(batch) >= batch_size:
+            await writer.write(batch)
+            batch = []
+
+    if batch:
+        await writer.write(batch)
+    return report.as_dict()
+
+
+async def export_products(fmt: BulkFormat) -> AsyncIterator[bytes]:
+    """Gera o catálogo em blocos, lendo com cursor do servidor (sessão própria do stream)."""
+    columns = [getattr(Product, name) for name in EXPORT_COLUMNS]
+    query = select(*columns).order_by(Product.id).execution_options(yield_per=settings.PRODUCT_IMPORT_BATCH_SIZE)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue().encode("utf-8")
+
+    async with SessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator="\n")
+                writer.writerows(
+                    ["" if value is None else str(value).lower() if isinstance(value, bool) else value for value in row]
+                    for row in rows
+                )
+                yield buffer.getvalue().encode("utf-8")
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows
+                ).encode("utf-8")
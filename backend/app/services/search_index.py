@@ -0,0 +1,268 @@
+"""
+Índice invertido em memória para a busca textual do catálogo.
+
+Cada produto é indexado pelos campos `title`, `author`, `category` e
+`description`, com pesos diferentes por campo. A tokenização ignora
+acentos e caixa ("Programação" e "programacao" são o mesmo termo) e
+descarta stopwords do português.
+
+A consulta é respondida inteiramente da memória, sem ir ao banco:
+
+- todos os termos da consulta precisam casar (E lógico);
+- cada termo casa também por prefixo ("intel" → "inteligencia"), com busca
+  binária sobre o vocabulário ordenado — útil para typeahead;
+- os resultados são ordenados por BM25 sobre as frequências ponderadas.
+
+O índice é construído a partir do banco na inicialização e atualizado
+incrementalmente pelos endpoints de escrita do catálogo (`upsert`/`remove`);
+as consultas nunca esperam uma reconstrução. Cada worker mantém o seu: para
+absorver escritas feitas em outros workers, `run_refresher` o reconstrói em
+segundo plano a cada `SEARCH_INDEX_REFRESH_SECONDS`, e uma importação em
+massa agenda uma reconstrução (`request_rebuild`).
+
+A reconstrução lê o catálogo do banco, monta um índice novo no threadpool
+(o event loop continua atendendo) e o troca pelo atual de uma vez; escritas
+incrementais feitas enquanto ele era montado são reaplicadas antes da troca.
+"""
+
+import asyncio
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.core.http_cache import serialize
+from app.models.product import Product
+from app.schemas.product import serialize_product
+
+settings = get_settings()
+
+# Peso de cada campo na frequência do termo.
+FIELD_WEIGHTS = {"title": 3.0, "author": 2.0, "category": 1.5, "description": 1.0}
+
+# Parâmetros usuais do BM25.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Casamento só por prefixo vale um pouco menos que o termo exato.
+PREFIX_PENALTY = 0.5
+# Limite de termos expandidos por prefixo (prefixos muito curtos casariam o vocabulário inteiro).
+MAX_PREFIX_EXPANSIONS = 64
+
+STOPWORDS = frozenset(
+    "a ao aos as com da das de do dos e em na nas no nos o os ou para per por se um uma umas uns".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas e sem acentos."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return [token for token in _TOKEN_RE.findall(normalize(text)) if token not in STOPWORDS]
+
+
+class SearchIndex:
+    def __init__(self):
+        self._postings: dict[str, dict[str, float]] = {}
+        self._vocabulary: list[str] = []
+        self._doc_terms: dict[str, dict[str, float]] = {}
+        self._doc_lengths: dict[str, float] = {}
+        self._bodies: dict[str, bytes] = {}
+        self._total_length = 0.0
+        self._rebuild_lock = asyncio.Lock()
+        # Durante uma reconstrução: escritas incrementais a reaplicar no índice novo
+        # (id → produto, ou `None` para remoção).
+        self._pending: Optional[dict[str, object]] = None
+        self._rebuild_requested = False
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    # ── Escrita ──────────────────────────────────────────
+
+    def upsert(self, product: Product) -> None:
+        """Indexa (ou reindexa) um produto."""
+        self._remove(product.id)
+        for term in self._add(product):
+            insort(self._vocabulary, term)
+        if self._pending is not None:
+            self._pending[product.id] = product
+
+    def remove(self, product_id: str) -> None:
+        self._remove(product_id)
+        if self._pending is not None:
+            self._pending[product_id] = None
+
+    def _add(self, product) -> list[str]:
+        """Indexa um produto ausente do índice; devolve os termos que ainda não estavam no vocabulário."""
+        terms: Counter[str] = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(product, field)):
+                terms[token] += weight
+
+        new_terms = []
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                new_terms.append(term)
+            postings[product.id] = frequency
+
+        length = sum(terms.values())
+        self._doc_terms[product.id] = dict(terms)
+        self._doc_lengths[product.id] = length
+        self._total_length += length
+        self._bodies[product.id] = serialize(serialize_product(product)).body
+        return new_terms
+
+    def _remove(self, product_id: str) -> None:
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[product_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+        self._total_length -= self._doc_lengths.pop(product_id)
+        del self._bodies[product_id]
+
+    @classmethod
+    def build(cls, products: Iterable) -> "SearchIndex":
+        """Índice novo com `products`; o vocabulário é ordenado uma única vez, no fim."""
+        index = cls()
+        for product in products:
+            index._add(product)
+        index._vocabulary = sorted(index._postings)
+        return index
+
+    def _swap(self, fresh: "SearchIndex") -> None:
+        # Sem `await` entre as atribuições: nenhuma consulta vê um estado misto.
+        self._postings = fresh._postings
+        self._vocabulary = fresh._vocabulary
+        self._doc_terms = fresh._doc_terms
+        self._doc_lengths = fresh._doc_lengths
+        self._bodies = fresh._bodies
+        self._total_length = fresh._total_length
+
+    async def rebuild(self) -> None:
+        """Recarrega o catálogo do banco, monta o índice no threadpool e o troca pelo atual."""
+        async with self._rebuild_lock:
+            self._pending = {}
+            try:
+                async with SessionLocal() as db:
+                    # Linhas (e não objetos do ORM): bem mais baratas de carregar.
+                    rows = (await db.execute(select(*Product.__table__.columns))).all()
+                fresh = await run_in_threadpool(SearchIndex.build, rows)
+                for product_id, product in self._pending.items():
+                    if product is None:
+                        fresh._remove(product_id)
+                    else:
+                        fresh._remove(product_id)
+                        for term in fresh._add(product):
+                            insort(fresh._vocabulary, term)
+                self._swap(fresh)
+            finally:
+                self._pending = None
+
+    def request_rebuild(self) -> None:
+        """Agenda uma reconstrução em segundo plano (após escritas em massa no catálogo)."""
+        self._rebuild_requested = True
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild_while_requested())
+
+    async def _rebuild_while_requested(self) -> None:
+        # Um pedido feito durante a reconstrução pode ter chegado depois da
+        # leitura do banco: reconstrói de novo até não haver pedido pendente.
+        while self._rebuild_requested:
+            self._rebuild_requested = False
+            try:
+                await self.rebuild()
+            except Exception as e:
+                print(f"[search] ✗ Erro ao reconstruir o índice de busca: {e}")
+                return
+
+    # ── Consulta ─────────────────────────────────────────
+
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        """Termos do vocabulário que casam com `token` (exato ou por prefixo), com seu peso."""
+        matches = []
+        start = bisect_left(self._vocabulary, token)
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            matches.append((term, 1.0 if term == token else PREFIX_PENALTY))
+        return matches
+
+    def search(self, query: str, limit: int) -> list[str]:
+        """Ids dos produtos que casam com todos os termos de `query`, do mais relevante ao menos."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_terms:
+            return []
+
+        total_docs = len(self._doc_terms)
+        avg_length = self._total_length / total_docs
+        scores: dict[str, float] | None = None
+
+        for token in tokens:
+            # O token e todas as suas expansões contam como um único termo:
+            # frequência = melhor expansão no produto, IDF = sobre a união.
+            # Assim uma expansão rara ("inteligentes") não vale mais que a
+            # comum ("inteligencia") só por ser rara.
+            frequencies: dict[str, float] = {}
+            for term, weight in self._expand(token):
+                for product_id, frequency in self._postings[term].items():
+                    frequency *= weight
+                    if frequency > frequencies.get(product_id, 0.0):
+                        frequencies[product_id] = frequency
+
+            matched = len(frequencies)
+            idf = math.log(1 + (total_docs - matched + 0.5) / (matched + 0.5))
+            token_scores = {}
+            for product_id, frequency in frequencies.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[product_id] / avg_length)
+                token_scores[product_id] = idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {pid: s + token_scores[pid] for pid, s in scores.items() if pid in token_scores}
+            if not scores:
+                return []
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [product_id for product_id, _ in ranked]
+
+    def render(self, product_ids: list[str]) -> bytes:
+        """Corpo JSON (lista de produtos) montado com os produtos já serializados."""
+        return b"[" + b",".join(self._bodies[product_id] for product_id in product_ids) + b"]"
+
+
+search_index = SearchIndex()
+
+
+async def run_refresher(interval_seconds: float = settings.SEARCH_INDEX_REFRESH_SECONDS) -> None:
+    """Loop de fundo que reconstrói o índice para absorver escritas de outros workers."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await search_index.rebuild()
+        except Exception as e:
+            print(f"[search] ✗ Erro ao reconstruir o índice de busca: {e}")
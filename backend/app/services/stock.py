@@ -0,0 +1,104 @@
+"""
+Reserva e devolução de estoque dos pedidos.
+
+A reserva de todos os itens de um pedido é um único UPDATE condicional:
+
+    UPDATE products
+       SET stock = stock - CASE id WHEN :a THEN :qa WHEN :b THEN :qb END
+     WHERE id IN (:a, :b) AND stock >= CASE id WHEN :a THEN :qa ... END
+
+O banco verifica e decrementa cada linha atomicamente, sem SELECT prévio e
+sem um lock global — checkouts de produtos diferentes não se bloqueiam. O
+que impede vender além do estoque é a condição `stock >= CASE ...` avaliada
+na própria linha travada pelo UPDATE: um checkout concorrente que chegue
+depois vê o estoque já decrementado e simplesmente não casa a linha. Por
+isso o número de linhas afetadas é conferido: se for menor que o de
+produtos, faltou estoque em algum deles, a transação é desfeita (nenhum
+decremento parcial sobrevive) e o pedido é recusado com 409.
+
+Não há garantia de ordem de travamento entre pedidos com vários produtos (o
+InnoDB trava as linhas na ordem do índice percorrido, não na da lista de
+ids); um deadlock eventual aborta uma das transações, que falha sem ter
+decrementado nada.
+
+O `stock` exibido pelo catálogo vem do cache (`catalog_cache`) e pode ficar
+defasado até o TTL; a verificação que vale é sempre a deste UPDATE.
+"""
+
+from collections import Counter
+from typing import Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+
+
+def _quantities(items: Iterable[tuple[str, int]]) -> dict[str, int]:
+    """Soma quantidades por produto (o mesmo id pode aparecer em mais de um item), ordenado por id (SQL estável)."""
+    totals: Counter[str] = Counter()
+    for product_id, quantity in items:
+        if quantity <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A quantidade de cada item deve ser maior que zero.",
+            )
+        totals[product_id] += quantity
+    return dict(sorted(totals.items()))
+
+
+def _quantity_case(quantities: dict[str, int]):
+    return case(quantities, value=Product.id)
+
+
+async def reserve_stock(db: AsyncSession, items: Iterable[tuple[str, int]]) -> None:
+    """
+    Decrementa o estoque de `items` (pares `(product_id, quantidade)`).
+
+    Roda na transação do pedido; em caso de falta de estoque faz rollback e
+    levanta 409 com os títulos indisponíveis.
+    """
+    quantities = _quantities(items)
+    if not quantities:
+        return
+
+    qty = _quantity_case(quantities)
+    result = await db.execute(
+        update(Product)
+        .where(Product.id.in_(quantities), Product.stock >= qty)
+        .values(stock=Product.stock - qty)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == len(quantities):
+        return
+
+    await db.rollback()
+    rows = (
+        await db.execute(select(Product.id, Product.title, Product.stock).where(Product.id.in_(quantities)))
+    ).all()
+    found = {row.id: row for row in rows}
+    unavailable = [
+        found[product_id].title if product_id in found else product_id
+        for product_id, quantity in quantities.items()
+        if product_id not in found or (found[product_id].stock or 0) < quantity
+    ]
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Estoque insuficiente para: {', '.join(unavailable) or 'itens do pedido'}.",
+    )
+
+
+async def release_stock(db: AsyncSession, items: Iterable[tuple[str, int]]) -> None:
+    """Devolve ao estoque as quantidades de `items` (cancelamento de pedido)."""
+    quantities = _quantities(items)
+    if not quantities:
+        return
+
+    qty = _quantity_case(quantities)
+    await db.execute(
+        update(Product)
+        .where(Product.id.in_(quantities))
+        .values(stock=Product.stock + qty)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,58 @@
+"""
+Contador de notificações não lidas por role.
+
+O badge da navbar consulta `GET /notifications/unread-count` a cada página;
+em vez de um `COUNT(*)` por requisição, o valor fica em memória: é carregado
+do banco uma vez (consulta coberta pelo índice `(role, read, created_at)`),
+incrementado quando notificações são publicadas e zerado/decrementado quando
+são marcadas como lidas.
+
+Como cada worker mantém o próprio contador, o valor é recarregado do banco
+após `UNREAD_COUNTER_TTL_SECONDS` para corrigir escritas feitas em outros
+workers.
+"""
+
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.notification import Notification
+from app.services.notification_broker import notification_broker
+
+settings = get_settings()
+
+
+class UnreadCounter:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # role -> (contagem, instante do último carregamento)
+        self._counts: dict[str, tuple[int, float]] = {}
+
+    async def get(self, role: str, db: AsyncSession) -> int:
+        entry = self._counts.get(role)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+
+        count = await db.scalar(
+            select(func.count())
+            .select_from(Notification)
+            .where(Notification.role == role, Notification.read == False)
+        )
+        self._counts[role] = (count, time.monotonic())
+        return count
+
+    def on_created(self, notification: Notification) -> None:
+        entry = self._counts.get(notification.role)
+        if entry is not None and not notification.read:
+            self._counts[notification.role] = (entry[0] + 1, entry[1])
+
+    def on_marked_read(self, role: str, marked: int) -> None:
+        entry = self._counts.get(role)
+        if entry is not None:
+            self._counts[role] = (max(entry[0] - marked, 0), entry[1])
+
+
+unread_counter = UnreadCounter(ttl=settings.UNREAD_COUNTER_TTL_SECONDS)
+notification_broker.add_listener(unread_counter.on_created)
@@ -0,0 +1,39 @@
+"""
+Cache in-process de usuários autenticados, indexado por email.
+
+`get_current_user` roda em toda requisição autenticada (inclusive no polling
+de notificações); com o cache, resolver o chamador não custa uma ida ao
+banco. Emails desconhecidos também são cacheados (cache negativo), com TTL
+mais curto, para que headers inválidos repetidos não martelem a tabela
+`users`. Cadastros e alterações de usuário devem chamar `invalidate_user`.
+"""
+
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.models.user import User
+
+settings = get_settings()
+
+user_cache = TTLCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_user(email: str):
+    """Retorna o `User` (destacado da sessão), `None` para email desconhecido, ou `MISSING`."""
+    return user_cache.get(email)
+
+
+def cache_user(email: str, user: Optional[User]) -> None:
+    if user is None:
+        user_cache.set(email, None, ttl=settings.USER_CACHE_NEGATIVE_TTL_SECONDS)
+    else:
+        user_cache.set(email, user)
+
+
+def invalidate_user(email: str) -> None:
+    user_cache.delete(email)
+
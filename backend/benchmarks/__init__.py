@@ -0,0 +1,8 @@
+"""
+Benchmarks do backend.
+
+Scripts executáveis a partir de `backend/`, por exemplo:
+
+    python -m benchmarks.pix
+    python -m benchmarks.load
+"""
@@ -0,0 +1,464 @@
+"""
+Teste de carga reproduzível da API.
+
+Sobe `app.main:app` em processo (ASGI, sem rede) contra um banco de
+benchmark — por padrão um SQLite temporário; `--database-url` aponta para um
+MySQL descartável —, popula o banco com dados sintéticos em escala
+configurável e dispara os endpoints mais usados com `--concurrency`
+requisições simultâneas, um cenário por vez:
+
+- `products.list`, `products.get`: catálogo (listagem com filtros e detalhe);
+- `orders.create`, `orders.list`: criação de pedidos e histórico do cliente;
+- `notifications.poll`: polling do painel (`GET /notifications?after=...`);
+- `payments.pix`: criação de cobrança PIX.
+
+Para cada cenário, o relatório (JSON) traz latências p50/p95/p99, vazão,
+status HTTP e consultas SQL por requisição (lidas do registro do `/metrics`).
+As requisições de cada cenário são geradas a partir de `--seed`, então duas
+execuções com os mesmos parâmetros disparam exatamente a mesma carga; com
+`--compare`, o relatório de outro commit é usado como referência.
+
+Uso (a partir de `backend/`):
+
+    python -m benchmarks.load [--products 2000 --users 500 --orders 5000]
+        [--concurrency 32 --requests 500] [--output atual.json]
+        [--compare base.json]
+
+Requer `httpx` (o mesmo usado pelo `TestClient` do FastAPI).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+SCENARIOS = ["products.list", "products.get", "orders.create", "orders.list", "notifications.poll", "payments.pix"]
+
+CATEGORIES = [
+    "Inteligência Artificial",
+    "Arquitetura de Software",
+    "Ciência de Dados",
+    "Blockchain",
+    "Segurança",
+    "Computação em Nuvem",
+]
+PRODUCT_TYPES = ["book", "ebook", "kit"]
+ADMIN_EMAIL = "admin@compia.com"
+SEED_BATCH_SIZE = 1000
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="banco de benchmark (padrão: SQLite temporário)")
+    parser.add_argument("--reset", action="store_true", help="apaga e recria as tabelas de --database-url")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--items-per-order", type=int, default=3, help="máximo de itens por pedido")
+    parser.add_argument("--notifications", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500, help="requisições medidas por cenário")
+    parser.add_argument("--warmup", type=int, default=20, help="requisições de aquecimento por cenário")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="cenários, separados por vírgula")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="grava o relatório neste arquivo (além de imprimir)")
+    parser.add_argument("--compare", help="relatório de referência (JSON de outra execução)")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"cenário(s) desconhecido(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    """Percentil pelo método do posto mais próximo (`sorted_values` não vazio)."""
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Dados sintéticos
+# ---------------------------------------------------------------------------
+
+def _synthetic_data(args: argparse.Namespace, rng: random.Random) -> dict[str, list[dict]]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    products = [
+        {
+            "id": f"bench-product-{i:07d}",
+            "title": f"Livro de {rng.choice(CATEGORIES)} volume {i}",
+            "author": f"Autor {rng.randrange(args.products // 4 + 1)}",
+            "price": round(rng.uniform(19.9, 399.9), 2),
+            "original_price": None,
+            "rating": round(rng.uniform(3, 5), 1),
+            "reviews_count": rng.randrange(500),
+            "image": "",
+            "category": rng.choice(CATEGORIES),
+            "type": rng.choice(PRODUCT_TYPES),
+            "is_best_seller": rng.random() < 0.1,
+            "is_new": rng.random() < 0.2,
+            # Estoque folgado: o benchmark mede a criação de pedidos, não o 409 de estoque.
+            "stock": 10_000_000,
+            "description": "Produto sintético para benchmark.",
+        }
+        for i in range(args.products)
+    ]
+
+    users = [{"id": str(uuid.uuid4()), "email": ADMIN_EMAIL, "password": "admin123", "name": "Admin", "role": "admin"}]
+    users += [
+        {
+            "id": str(uuid.uuid4()),
+            "email": f"bench-user-{i:06d}@compia.com",
+            "password": "user123",
+            "name": f"Cliente {i}",
+            "role": "user",
+        }
+        for i in range(args.users)
+    ]
+
+    orders, items = [], []
+    for i in range(args.orders):
+        user = users[1 + rng.randrange(args.users)] if args.users else users[0]
+        order_id = f"bench-order-{i:08d}"
+        chosen = rng.sample(products, min(len(products), rng.randint(1, args.items_per_order)))
+        subtotal = 0.0
+        for product in chosen:
+            quantity = rng.randint(1, 3)
+            subtotal += product["price"] * quantity
+            items.append(
+                {
+                    "order_id": order_id,
+                    "product_id": product["id"],
+                    "title": product["title"],
+                    "author": product["author"],
+                    "type": product["type"],
+                    "price": product["price"],
+                    "quantity": quantity,
+                    "image": "",
+                }
+            )
+        orders.append(
+            {
+                "id": order_id,
+                "user_email": user["email"],
+                "date": now - timedelta(minutes=rng.randrange(90 * 24 * 60)),
+                "subtotal": round(subtotal, 2),
+                "shipping_cost": 0,
+                "total": round(subtotal, 2),
+                "delivery_method": "pickup",
+                "customer_name": user["name"],
+                "customer_email": user["email"],
+                "status": rng.choice(["processando", "enviado", "entregue", "cancelado"]),
+            }
+        )
+
+    notifications = [
+        {
+            "id": f"notif-bench-{i:07d}",
+            "role": rng.choice(["admin", "customer"]),
+            "order_id": orders[rng.randrange(len(orders))]["id"] if orders else None,
+            "type": "order_created",
+            "message": f"Notificação sintética {i}",
+            "read": rng.random() < 0.7,
+            "created_at": now - timedelta(minutes=rng.randrange(30 * 24 * 60)),
+        }
+        for i in range(args.notifications)
+    ]
+
+    return {"products": products, "users": users, "orders": orders, "order_items": items, "notifications": notifications}
+
+
+async def _seed(args: argparse.Namespace, data: dict[str, list[dict]]) -> None:
+    from sqlalchemy import func, insert, select
+
+    import app.models  # noqa: F401
+    from app.core.database import Base, SessionLocal, engine
+    from app.migrations import run_migrations
+    from app.models.notification import Notification
+    from app.models.order import Order, OrderItem
+    from app.models.product import Product
+    from app.models.user import User
+    from app.services import analytics
+
+    if args.reset:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    await run_migrations()
+
+    async with SessionLocal() as db:
+        if await db.scalar(select(func.count()).select_from(Product)):
+            raise SystemExit(
+                "[bench] ✗ O banco já tem produtos; use um banco descartável ou --reset (apaga as tabelas)."
+            )
+        for model, rows in (
+            (User, data["users"]),
+            (Product, data["products"]),
+            (Order, data["orders"]),
+            (OrderItem, data["order_items"]),
+            (Notification, data["notifications"]),
+        ):
+            for start in range(0, len(rows), SEED_BATCH_SIZE):
+                await db.execute(insert(model), rows[start:start + SEED_BATCH_SIZE])
+        await db.commit()
+        # Agregados de vendas coerentes com os pedidos sintéticos.
+        await analytics.rebuild(db)
+
+
+# ---------------------------------------------------------------------------
+# Carga
+# ---------------------------------------------------------------------------
+
+Request = tuple[str, str, dict[str, str], Optional[dict[str, Any]]]
+
+
+def _headers(email: str) -> dict[str, str]:
+    return {"X-User-Email": email}
+
+
+def _build_requests(
+    scenario: str, count: int, data: dict[str, list[dict]], rng: random.Random, poll_since: str
+) -> list[Request]:
+    products, users = data["products"], data["users"]
+    customers = users[1:] or users
+
+    def product_list() -> Request:
+        params = f"limit={rng.choice([12, 24, 48])}&sort={rng.choice(['title', 'price_asc', 'rating'])}"
+        if rng.random() < 0.5:
+            params += f"&category={rng.choice(CATEGORIES)}"
+        return "GET", f"/api/v1/products?{params}", {}, None
+
+    def product_get() -> Request:
+        return "GET", f"/api/v1/products/{rng.choice(products)['id']}", {}, None
+
+    def order_create() -> Request:
+        user = rng.choice(customers)
+        chosen = rng.sample(products, min(len(products), rng.randint(1, 3)))
+        order_items = [
+            {"id": p["id"], "title": p["title"], "author": p["author"], "type": p["type"], "price": p["price"], "quantity": 1}
+            for p in chosen
+        ]
+        subtotal = round(sum(p["price"] for p in chosen), 2)
+        payload = {
+            "items": order_items,
+            "subtotal": subtotal,
+            "shipping_cost": 0,
+            "total": subtotal,
+            "delivery_method": "pickup",
+            "pickup_address": "Loja COMPIA",
+            "customer": {"name": user["name"], "email": user["email"]},
+        }
+        return "POST", "/api/v1/orders", _headers(user["email"]), payload
+
+    def order_list() -> Request:
+        return "GET", "/api/v1/orders?limit=20", _headers(rng.choice(customers)["email"]), None
+
+    def notification_poll() -> Request:
+        email = ADMIN_EMAIL if rng.random() < 0.5 else rng.choice(customers)["email"]
+        return "GET", f"/api/v1/notifications?after={poll_since}", _headers(email), None
+
+    def pix_payment() -> Request:
+        product = rng.choice(products)
+        payload = {
+            "gateway": "mercadopago",
+            "method": "pix",
+            "amount": product["price"],
+            "items": [{"id": product["id"], "title": product["title"], "quantity": 1, "unit_price": product["price"]}],
+            "customer": {"name": "Cliente Benchmark", "email": "cliente@compia.com"},
+        }
+        return "POST", "/api/v1/payments", {}, payload
+
+    factory = {
+        "products.list": product_list,
+        "products.get": product_get,
+        "orders.create": order_create,
+        "orders.list": order_list,
+        "notifications.poll": notification_poll,
+        "payments.pix": pix_payment,
+    }[scenario]
+    return [factory() for _ in range(count)]
+
+
+def _route_of(app, method: str, path: str) -> Optional[str]:
+    """Template da rota (como rotulado no /metrics) que atende `method path`."""
+    from starlette.routing import Match
+
+    scope = {"type": "http", "method": method, "path": path.split("?", 1)[0]}
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return None
+
+
+async def _run_requests(client, requests: list[Request], concurrency: int) -> tuple[list[float], Counter, float]:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    pending = iter(requests)
+
+    async def worker() -> None:
+        for method, url, headers, payload in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=headers, json=payload)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[e.__class__.__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def _run_scenario(app, client, scenario: str, args, data, rng: random.Random, poll_since: str) -> dict[str, Any]:
+    from app.core.metrics import DB_QUERIES_PER_REQUEST
+
+    await _run_requests(client, _build_requests(scenario, args.warmup, data, rng, poll_since), args.concurrency)
+
+    requests = _build_requests(scenario, args.requests, data, rng, poll_since)
+    method, url = requests[0][0], requests[0][1]
+    labels = (method, _route_of(app, method, url) or "<unmatched>")
+    count_before, queries_before = DB_QUERIES_PER_REQUEST.totals(*labels)
+
+    latencies, statuses, elapsed = await _run_requests(client, requests, args.concurrency)
+
+    count_after, queries_after = DB_QUERIES_PER_REQUEST.totals(*labels)
+    measured = count_after - count_before
+    latencies.sort()
+    errors = sum(n for code, n in statuses.items() if not code.startswith(("2", "3")))
+    return {
+        "route": f"{labels[0]} {labels[1]}",
+        "requests": len(latencies),
+        "errors": errors,
+        "status": dict(sorted(statuses.items())),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+        },
+        "queries_per_request": round((queries_after - queries_before) / measured, 2) if measured else None,
+    }
+
+
+def _comparison(report: dict[str, Any], baseline: dict[str, Any]) -> dict[str, Any]:
+    """Razões atual/referência por cenário (p95 e consultas: >1 piorou; vazão: <1 piorou)."""
+
+    def ratio(current, reference):
+        return round(current / reference, 2) if current is not None and reference else None
+
+    result = {"baseline_commit": baseline.get("commit")}
+    for name, current in report["scenarios"].items():
+        reference = baseline.get("scenarios", {}).get(name)
+        if reference is None:
+            continue
+        result[name] = {
+            "p95_ratio": ratio(current["latency_ms"]["p95"], reference["latency_ms"]["p95"]),
+            "throughput_ratio": ratio(current["throughput_rps"], reference["throughput_rps"]),
+            "queries_per_request_ratio": ratio(current["queries_per_request"], reference["queries_per_request"]),
+        }
+    return result
+
+
+async def _benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    import httpx
+
+    from app.core.database import engine
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    data = _synthetic_data(args, rng)
+
+    seed_started = time.perf_counter()
+    await _seed(args, data)
+    seed_seconds = time.perf_counter() - seed_started
+    print(f"[bench] ✓ Banco populado em {seed_seconds:.1f}s", file=sys.stderr)
+
+    # Polling "desde o início do benchmark": só vê as notificações criadas pelos cenários.
+    poll_since = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+    report: dict[str, Any] = {
+        "benchmark": "load",
+        "commit": _git_commit(),
+        "database": engine.dialect.name,
+        "config": {
+            key: getattr(args, key)
+            for key in ("products", "users", "orders", "items_per_order", "notifications", "concurrency", "requests", "warmup", "seed")
+        },
+        "seed_seconds": round(seed_seconds, 2),
+        "scenarios": {},
+    }
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in args.scenarios.split(","):
+                # Cada cenário com seu próprio gerador: a carga de um não depende dos anteriores.
+                result = await _run_scenario(
+                    app, client, scenario, args, data, random.Random(f"{args.seed}:{scenario}"), poll_since
+                )
+                report["scenarios"][scenario] = result
+                print(
+                    f"[bench] {scenario}: p50 {result['latency_ms']['p50']}ms, p95 {result['latency_ms']['p95']}ms, "
+                    f"{result['throughput_rps']} req/s, {result['queries_per_request']} consultas/req, "
+                    f"{result['errors']} erro(s)",
+                    file=sys.stderr,
+                )
+    return report
+
+
+def main() -> None:
+    args = _parse_args()
+
+    temp_dir = None
+    if args.database_url is None:
+        temp_dir = tempfile.mkdtemp(prefix="compia-bench-")
+        args.database_url = f"sqlite:///{os.path.join(temp_dir, 'bench.db')}"
+
+    # As configurações são lidas na importação do app: o ambiente vem antes.
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["EMAIL_TRANSPORT"] = "fake"
+
+    try:
+        # Os logs do app (print) vão para stderr: stdout fica só com o JSON.
+        with contextlib.redirect_stdout(sys.stderr):
+            report = asyncio.run(_benchmark(args))
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = _comparison(report, json.load(f))
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
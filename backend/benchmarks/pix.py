@@ -0,0 +1,103 @@
+"""
+Microbenchmark da geração de BR Codes PIX.
+
+Compara a implementação atual (CRC via tabela do `binascii.crc_hqx` e
+segmentos EMV estáticos em cache) com a implementação original (CRC bit a bit
+e payload remontado a cada cobrança), verificando antes que as duas produzem
+exatamente o mesmo BR Code.
+
+Uso (a partir de `backend/`):
+
+    python -m benchmarks.pix [--charges 20000]
+"""
+
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+
+from app.api.v1.endpoints.payments import _PIX_FIXED_KEY, _build_pix_br_code, _format_emv_field
+
+
+def _reference_crc16_ccitt(payload: str) -> str:
+    """Implementação original, bit a bit (referência)."""
+    crc = 0xFFFF
+    polynomial = 0x1021
+
+    for char in payload:
+        crc ^= ord(char) << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ polynomial) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+
+    return f"{crc:04X}"
+
+
+def _reference_build_pix_br_code(pix_key: str, merchant_name: str, merchant_city: str, amount: Decimal) -> str:
+    """Implementação original: monta todo o payload a cada cobrança (referência)."""
+    merchant_account_info = (
+        _format_emv_field("00", "BR.GOV.BCB.PIX")
+        + _format_emv_field("01", pix_key)
+    )
+
+    payload = "".join(
+        [
+            _format_emv_field("00", "01"),
+            _format_emv_field("01", "12"),
+            _format_emv_field("26", merchant_account_info),
+            _format_emv_field("52", "0000"),
+            _format_emv_field("53", "986"),
+            _format_emv_field("54", f"{amount:.2f}"),
+            _format_emv_field("58", "BR"),
+            _format_emv_field("59", merchant_name[:25]),
+            _format_emv_field("60", merchant_city[:15]),
+            _format_emv_field("62", _format_emv_field("05", "***")),
+            "6304",
+        ]
+    )
+
+    return f"{payload}{_reference_crc16_ccitt(payload)}"
+
+
+def _time(fn, amounts: list[Decimal]) -> float:
+    start = time.perf_counter()
+    for amount in amounts:
+        fn(_PIX_FIXED_KEY, "COMPIA STORE", "SAO PAULO", amount)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--charges", type=int, default=20000, help="quantidade de cobranças geradas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    amounts = [Decimal(rng.randint(1, 10_000_000)) / 100 for _ in range(args.charges)]
+
+    for amount in amounts:
+        expected = _reference_build_pix_br_code(_PIX_FIXED_KEY, "COMPIA STORE", "SAO PAULO", amount)
+        actual = _build_pix_br_code(_PIX_FIXED_KEY, "COMPIA STORE", "SAO PAULO", amount)
+        if actual != expected:
+            raise SystemExit(f"BR Code divergente para {amount}: {actual!r} != {expected!r}")
+
+    reference = _time(_reference_build_pix_br_code, amounts)
+    current = _time(_build_pix_br_code, amounts)
+
+    print(json.dumps({
+        "benchmark": "pix_br_code",
+        "charges": args.charges,
+        "verified": True,
+        "reference_seconds": round(reference, 4),
+        "current_seconds": round(current, 4),
+        "reference_per_charge_us": round(reference / args.charges * 1e6, 2),
+        "current_per_charge_us": round(current / args.charges * 1e6, 2),
+        "speedup": round(reference / current, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
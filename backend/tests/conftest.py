@@ -0,0 +1,56 @@
+"""
+Configuração compartilhada dos testes.
+
+Os testes rodam contra um SQLite temporário, migrado e populado pelo próprio
+`prepare_database`, e sem rede: os emails usam o `FakeTransport`. As
+variáveis de ambiente são definidas antes de importar `app`, porque as
+configurações e o engine são lidos na importação.
+
+Execução (a partir de `backend/`):
+
+    pip install -r requirements-dev.txt
+    python -m pytest
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+TEST_DIR = Path(tempfile.mkdtemp(prefix="compia-tests-"))
+PRIMARY_DB = TEST_DIR / "primary.db"
+
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY_DB}"
+os.environ["READ_REPLICA_URL"] = ""
+os.environ["EMAIL_TRANSPORT"] = "fake"
+os.environ["DB_STARTUP_MAX_RETRIES"] = "1"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.core.database import prepare_database  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def database():
+    """Schema e seed aplicados, sem subir a aplicação (fila de emails, sweepers)."""
+    await prepare_database()
+
+
+@pytest.fixture
+async def client():
+    """Cliente HTTP da API em processo, com o lifespan rodando."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
@@ -0,0 +1,63 @@
+"""
+Dados de teste criados pela própria API (produtos, pedidos) e leituras diretas do banco.
+"""
+
+import uuid
+
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.models.order import Order
+from app.models.product import Product
+
+ADMIN = {"X-User-Email": "admin@compia.com"}
+CUSTOMER = {"X-User-Email": "usuario@compia.com"}
+
+
+async def create_product(client, price: float = 50.0, stock: int = 10, **fields) -> dict:
+    payload = {
+        "title": f"Produto {uuid.uuid4().hex[:8]}",
+        "author": "Autor Teste",
+        "price": price,
+        "category": "Testes",
+        "type": "book",
+        "stock": stock,
+        **fields,
+    }
+    response = await client.post("/api/v1/products", json=payload, headers=ADMIN)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def order_payload(lines: list[tuple[dict, int]], shipping_cost: float = 0.0, **overrides) -> dict:
+    """Pedido com `lines` = [(produto, quantidade)] e os totais somados em float, como no frontend."""
+    items = [
+        {
+            "id": product["id"],
+            "title": product["title"],
+            "author": product["author"],
+            "type": product["type"],
+            "price": product["price"],
+            "quantity": quantity,
+        }
+        for product, quantity in lines
+    ]
+    subtotal = sum(item["price"] * item["quantity"] for item in items)
+    return {
+        "items": items,
+        "subtotal": subtotal,
+        "shipping_cost": shipping_cost,
+        "total": subtotal + shipping_cost,
+        "customer": {"name": "Usuário Teste", "email": "usuario@compia.com"},
+        **overrides,
+    }
+
+
+async def stock_of(product_id: str) -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(Product.stock).where(Product.id == product_id))
+
+
+async def order_count() -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Order))
@@ -0,0 +1,137 @@
+"""
+Listagem do catálogo: paginação por cursor, cache em memória e ETag/304.
+"""
+
+import base64
+import json
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from app.core.cache import MISSING
+from app.core.database import engine
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor
+from app.services.catalog_cache import catalog_cache
+from tests.factories import ADMIN, create_product
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def product_queries():
+    """Consultas à tabela `products` feitas durante o teste."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if "products" in statement:
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+async def walk(client, **params) -> list[dict]:
+    """Todas as páginas da listagem, seguindo `X-Next-Cursor`."""
+    products, cursor = [], None
+    while True:
+        page_params = {**params, "cursor": cursor} if cursor else params
+        response = await client.get("/api/v1/products", params=page_params)
+        assert response.status_code == 200
+        products += response.json()
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return products
+
+
+async def test_cursor_pages_cover_every_product_once(client):
+    category = f"Paginação {uuid.uuid4().hex[:8]}"
+    # Preços repetidos: o desempate por id precisa atravessar as páginas.
+    prices = (30, 10, 20, 10, 30, 10, 20)
+    created = [await create_product(client, price=price, category=category) for price in prices]
+
+    ascending = await walk(client, category=category, sort="price_asc", limit=2)
+    expected = sorted(created, key=lambda product: (product["price"], product["id"]))
+    assert [product["id"] for product in ascending] == [product["id"] for product in expected]
+
+    descending = await walk(client, category=category, sort="price_desc", limit=3)
+    assert [product["id"] for product in descending] == [product["id"] for product in reversed(expected)]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "nao-e-base64!",
+        base64.urlsafe_b64encode(b"{}").decode(),
+        encode_cursor(10.0),
+        base64.urlsafe_b64encode(json.dumps([{"a": 1}, "x"]).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps([10.0, ["x"]]).encode()).decode(),
+    ],
+)
+async def test_malformed_cursor_is_400(client, cursor):
+    response = await client.get("/api/v1/products", params={"cursor": cursor, "sort": "price_asc"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor de paginação inválido."
+
+
+async def test_cached_reads_skip_the_database_until_a_write(client, product_queries):
+    product = await create_product(client, price=15.0)
+    url = f"/api/v1/products/{product['id']}"
+
+    first = await client.get(url)
+    queries = len(product_queries)
+    second = await client.get(url)
+    assert second.content == first.content
+    assert len(product_queries) == queries
+
+    updated = await client.put(url, json={"price": 25.0}, headers=ADMIN)
+    assert updated.status_code == 200
+    assert (await client.get(url)).json()["price"] == 25.0
+
+
+async def test_read_started_before_an_invalidation_is_not_cached():
+    key = ("teste", uuid.uuid4().hex)
+    version = catalog_cache.version
+
+    catalog_cache.invalidate()
+    catalog_cache.put(key, "antigo", version)
+    assert catalog_cache.get(key) is MISSING
+
+    catalog_cache.put(key, "novo", catalog_cache.version)
+    assert catalog_cache.get(key) == "novo"
+
+
+async def test_etag_revalidation(client):
+    product = await create_product(client, price=12.0)
+    url = f"/api/v1/products/{product['id']}"
+
+    first = await client.get(url)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    for if_none_match in (etag, f"W/{etag}", f'"outro", {etag}', "*"):
+        response = await client.get(url, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    assert (await client.get(url, headers={"If-None-Match": '"outro"'})).status_code == 200
+
+    await client.put(url, json={"price": 13.0}, headers=ADMIN)
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+async def test_list_pages_carry_an_etag(client):
+    category = f"ETag {uuid.uuid4().hex[:8]}"
+    await create_product(client, category=category)
+
+    first = await client.get("/api/v1/products", params={"category": category})
+    revalidated = await client.get(
+        "/api/v1/products", params={"category": category}, headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert revalidated.status_code == 304
@@ -0,0 +1,118 @@
+"""
+Fila de emails: outbox → worker → retries com backoff → desistência.
+"""
+
+import time
+import uuid
+
+import anyio
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.email_outbox import EmailOutbox
+from app.services.email_service import EmailDispatcher, EmailMessage, FakeTransport, queue_email
+
+pytestmark = pytest.mark.anyio
+
+RETRY_BASE_SECONDS = 0.05
+
+
+class ScriptedTransport(FakeTransport):
+    """`FakeTransport` que falha ou demora nos envios para `recipient`; os demais passam direto."""
+
+    def __init__(self, recipient: str, failures: int = 0, delay_seconds: float = 0):
+        super().__init__()
+        self.recipient = recipient
+        self.failures = failures
+        self.delay_seconds = delay_seconds
+        self.attempts: list[float] = []
+
+    def send(self, message: EmailMessage):
+        if message.recipients != [self.recipient]:
+            return super().send(message)
+        self.attempts.append(time.monotonic())
+        time.sleep(self.delay_seconds)
+        if len(self.attempts) <= self.failures:
+            raise RuntimeError("Provedor indisponível")
+        return super().send(message)
+
+
+@pytest.fixture
+def recipient():
+    return f"cliente-{uuid.uuid4().hex[:8]}@teste.com"
+
+
+async def _run(transport: ScriptedTransport, outbox_id: str, *statuses: str, **options) -> EmailOutbox:
+    """Sobe um dispatcher, avisa da mensagem e espera ela chegar a um dos `statuses`."""
+    dispatcher = EmailDispatcher(
+        transport=transport,
+        workers=2,
+        queue_size=100,
+        max_attempts=options.get("max_attempts", 3),
+        retry_base_seconds=RETRY_BASE_SECONDS,
+        retry_max_seconds=1,
+        send_timeout_seconds=options.get("send_timeout_seconds", 5),
+        poll_interval_seconds=3600,
+    )
+    await dispatcher.start()
+    try:
+        dispatcher.notify(outbox_id)
+        with anyio.fail_after(5):
+            while True:
+                async with SessionLocal() as db:
+                    outbox = await db.get(EmailOutbox, outbox_id)
+                if outbox.status in statuses:
+                    return outbox
+                await anyio.sleep(0.01)
+    finally:
+        await dispatcher.stop()
+
+
+async def _enqueue(recipient: str) -> str:
+    async with SessionLocal() as db:
+        outbox = queue_email(db, EmailMessage(kind="test", recipients=[recipient], subject="Teste", html="<p>Oi</p>"))
+        await db.commit()
+    return outbox.id
+
+
+async def test_queued_email_is_delivered(database, recipient):
+    transport = ScriptedTransport(recipient)
+    outbox = await _run(transport, await _enqueue(recipient), "sent", "failed")
+
+    assert outbox.status == "sent"
+    assert outbox.attempts == 1
+    assert outbox.sent_at is not None
+    assert [m.subject for m in transport.sent if m.recipients == [recipient]] == ["Teste"]
+
+
+async def test_failed_send_is_retried_with_backoff(database, recipient):
+    transport = ScriptedTransport(recipient, failures=2)
+    outbox = await _run(transport, await _enqueue(recipient), "sent", "failed")
+
+    assert outbox.status == "sent"
+    assert outbox.attempts == 3
+    assert outbox.last_error is None
+    # Espera mínima antes da tentativa n+1: base * 2^(n-1), menos 20% de jitter.
+    gaps = [later - earlier for earlier, later in zip(transport.attempts, transport.attempts[1:])]
+    assert gaps[0] >= RETRY_BASE_SECONDS * 0.8
+    assert gaps[1] >= RETRY_BASE_SECONDS * 2 * 0.8
+
+
+async def test_gives_up_after_max_attempts(database, recipient):
+    transport = ScriptedTransport(recipient, failures=100)
+    outbox = await _run(transport, await _enqueue(recipient), "sent", "failed", max_attempts=3)
+
+    assert outbox.status == "failed"
+    assert outbox.attempts == 3
+    assert outbox.last_error == "Provedor indisponível"
+    assert len(transport.attempts) == 3
+
+
+async def test_slow_send_is_cut_before_the_lease_expires(database, recipient):
+    transport = ScriptedTransport(recipient, delay_seconds=2)
+    started = time.monotonic()
+    outbox = await _run(transport, await _enqueue(recipient), "failed", max_attempts=1, send_timeout_seconds=0.5)
+
+    # Desiste em 80% do lease: a mensagem nunca fica "sending" com o lease vencido.
+    assert time.monotonic() - started < 0.5
+    assert outbox.last_error.startswith("Tempo de envio esgotado")
@@ -0,0 +1,73 @@
+"""
+Idempotency-Key em POST /orders e POST /payments.
+"""
+
+import uuid
+
+import pytest
+
+from app.api.v1.endpoints import orders
+from app.core.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+from app.services.idempotency import REPLAYED_HEADER, _digest
+from tests.factories import CUSTOMER, create_product, order_count, order_payload, stock_of
+from tests.test_payments import pix_payload
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def key():
+    return f"chave-{uuid.uuid4().hex}"
+
+
+async def test_payment_keys_are_scoped_per_customer(client, key):
+    headers = {"Idempotency-Key": key}
+    first = await client.post("/api/v1/payments", json=pix_payload(email="ana@teste.com"), headers=headers)
+    other = await client.post("/api/v1/payments", json=pix_payload(email="bia@teste.com"), headers=headers)
+    replay = await client.post("/api/v1/payments", json=pix_payload(email="ana@teste.com"), headers=headers)
+
+    assert (first.status_code, other.status_code, replay.status_code) == (201, 201, 201)
+    assert other.json()["transaction_id"] != first.json()["transaction_id"]
+    assert REPLAYED_HEADER not in other.headers
+    assert replay.json()["transaction_id"] == first.json()["transaction_id"]
+    assert replay.headers[REPLAYED_HEADER] == "true"
+
+
+async def test_order_replay_does_not_create_a_second_order(client, key):
+    product = await create_product(client, stock=5)
+    headers = {**CUSTOMER, "Idempotency-Key": key}
+    orders_before = await order_count()
+
+    first = await client.post("/api/v1/orders", json=order_payload([(product, 2)]), headers=headers)
+    replay = await client.post("/api/v1/orders", json=order_payload([(product, 2)]), headers=headers)
+
+    assert first.status_code == replay.status_code == 201
+    assert replay.json()["id"] == first.json()["id"]
+    assert await order_count() == orders_before + 1
+    assert await stock_of(product["id"]) == 3
+
+
+async def test_key_is_completed_in_the_order_transaction(client, key, monkeypatch):
+    product = await create_product(client, stock=5)
+    headers = {**CUSTOMER, "Idempotency-Key": key}
+
+    # Falha depois do commit do pedido: a chave já está concluída e o retry
+    # devolve o mesmo pedido em vez de executar o checkout de novo.
+    def fail(outbox_id):
+        raise RuntimeError("falha após o commit")
+
+    monkeypatch.setattr(orders.email_dispatcher, "notify", fail)
+    with pytest.raises(RuntimeError):
+        await client.post("/api/v1/orders", json=order_payload([(product, 1)]), headers=headers)
+    monkeypatch.undo()
+
+    async with SessionLocal() as db:
+        stored = await db.get(IdempotencyKey, _digest(f"orders:{CUSTOMER['X-User-Email']}", key))
+    assert stored.status == "completed"
+
+    retry = await client.post("/api/v1/orders", json=order_payload([(product, 1)]), headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert await stock_of(product["id"]) == 4
+
@@ -0,0 +1,53 @@
+"""
+Métricas expostas em /metrics.
+"""
+
+import pytest
+
+from app.services.notification_broker import notification_broker
+from tests.factories import CUSTOMER, create_product, order_payload
+
+pytestmark = pytest.mark.anyio
+
+
+async def metric_lines(client, name: str) -> list[str]:
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    return [line for line in response.text.splitlines() if line.startswith(name)]
+
+
+async def test_price_index_metrics(client):
+    product = await create_product(client)
+    for _ in range(2):
+        created = await client.post("/api/v1/orders", json=order_payload([(product, 1)]), headers=CUSTOMER)
+        assert created.status_code == 201
+
+    assert len(await metric_lines(client, "price_index_entries ")) == 1
+    lookups = await metric_lines(client, "price_index_lookups_total")
+    assert {line.split()[0] for line in lookups} == {
+        'price_index_lookups_total{result="hit"}',
+        'price_index_lookups_total{result="miss"}',
+    }
+    assert all(int(line.split()[1]) >= 1 for line in lookups)
+
+
+async def test_email_queue_metrics(client):
+    assert len(await metric_lines(client, "email_queue_depth ")) == 1
+    deliveries = await metric_lines(client, "email_deliveries_total")
+    assert {line.split()[0] for line in deliveries} == {
+        f'email_deliveries_total{{result="{result}"}}' for result in ("sent", "retried", "failed")
+    }
+
+
+async def test_notification_stream_metrics(client):
+    queue = notification_broker.subscribe("admin")
+    try:
+        subscribers = await metric_lines(client, "notification_stream_subscribers")
+    finally:
+        notification_broker.unsubscribe("admin", queue)
+
+    assert any(line.startswith('notification_stream_subscribers{role="admin"} ') for line in subscribers)
+    events = await metric_lines(client, "notification_stream_events_total")
+    assert {line.split()[0] for line in events} == {
+        f'notification_stream_events_total{{result="{result}"}}' for result in ("published", "dropped")
+    }
@@ -0,0 +1,51 @@
+"""
+Feed incremental de notificações (GET /notifications?after=).
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from app.api.v1.endpoints import notifications
+from app.core.database import SessionLocal, utcnow
+from app.models.notification import Notification
+from tests.factories import ADMIN
+
+pytestmark = pytest.mark.anyio
+
+
+async def add_notification(created_at) -> str:
+    async with SessionLocal() as db:
+        notification = Notification(role="admin", type="teste", message="Teste", created_at=created_at)
+        db.add(notification)
+        await db.commit()
+        return notification.id
+
+
+async def feed_after(client, after: str) -> list[str]:
+    response = await client.get("/api/v1/notifications", params={"after": after, "limit": 100}, headers=ADMIN)
+    assert response.status_code == 200
+    return [notification["id"] for notification in response.json()]
+
+
+async def test_same_second_notifications_keep_creation_order(client):
+    start = utcnow() - timedelta(minutes=10)
+    ids = [await add_notification(start + timedelta(microseconds=i)) for i in range(5)]
+
+    feed = await feed_after(client, (start - timedelta(seconds=1)).isoformat())
+    assert [nid for nid in feed if nid in ids] == ids
+
+    assert [nid for nid in await feed_after(client, ids[2]) if nid in ids] == ids[3:]
+
+
+async def test_feed_waits_for_notifications_to_settle(client, monkeypatch):
+    seen = await add_notification(utcnow() - timedelta(minutes=5))
+    # created_at recente: a transação que a gravou poderia ter outras, mais
+    # antigas, ainda sem commit.
+    fresh = await add_notification(utcnow())
+
+    assert fresh not in await feed_after(client, seen)
+
+    later = utcnow() + timedelta(seconds=notifications.settings.NOTIFICATION_FEED_SETTLE_SECONDS + 1)
+    monkeypatch.setattr(notifications, "utcnow", lambda: later)
+    assert fresh in await feed_after(client, seen)
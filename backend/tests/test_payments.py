@@ -0,0 +1,42 @@
+"""
+Pagamentos: criação e confirmação de PIX no armazenamento compartilhado.
+"""
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.payment import PaymentTransaction
+
+pytestmark = pytest.mark.anyio
+
+
+def pix_payload(order_id: str | None = None, email: str = "cliente@teste.com") -> dict:
+    return {
+        "order_id": order_id,
+        "gateway": "mercadopago",
+        "method": "pix",
+        "amount": "59.90",
+        "items": [{"id": "p1", "title": "Livro", "quantity": 1, "unit_price": "59.90"}],
+        "customer": {"name": "Cliente Teste", "email": email},
+    }
+
+
+async def test_confirming_pix_keeps_the_order_link(client):
+    created = await client.post("/api/v1/payments", json=pix_payload("order-abc"))
+    assert created.status_code == 201
+    transaction_id = created.json()["transaction_id"]
+
+    confirmed = await client.post(f"/api/v1/payments/{transaction_id}/confirm")
+    assert confirmed.status_code == 200
+    assert confirmed.json()["status"] == "approved"
+
+    async with SessionLocal() as db:
+        row = await db.get(PaymentTransaction, transaction_id)
+    assert row.order_id == "order-abc"
+    assert row.status == "approved"
+    assert row.data["status"] == "approved"
+
+
+async def test_unknown_transaction_is_404(client):
+    response = await client.post("/api/v1/payments/txn_inexistente/confirm")
+    assert response.status_code == 404
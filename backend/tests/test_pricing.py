@@ -0,0 +1,82 @@
+"""
+Recalculo no servidor dos preços e totais do pedido.
+"""
+
+import pytest
+
+from tests.factories import ADMIN, CUSTOMER, create_product, order_count, order_payload, stock_of
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_tampered_unit_price_is_not_charged(client):
+    product = await create_product(client, price=80.0, stock=5)
+    orders_before = await order_count()
+
+    # Preço adulterado com totais coerentes com ele: recusado, nada gravado.
+    tampered = order_payload([({**product, "price": 0.01}, 2)])
+    response = await client.post("/api/v1/orders", json=tampered, headers=CUSTOMER)
+    assert response.status_code == 409
+    assert await order_count() == orders_before
+    assert await stock_of(product["id"]) == 5
+
+    # Preço adulterado com os totais do catálogo: idem.
+    tampered = order_payload([(product, 2)])
+    tampered["items"][0]["price"] = 0.01
+    response = await client.post("/api/v1/orders", json=tampered, headers=CUSTOMER)
+    assert response.status_code == 409
+
+    response = await client.post("/api/v1/orders", json=order_payload([(product, 2)]), headers=CUSTOMER)
+    assert response.status_code == 201
+    assert response.json()["items"][0]["price"] == 80.0
+    assert response.json()["total"] == 160.0
+
+
+async def test_totals_are_rounded_to_cents_in_decimal(client):
+    product = await create_product(client, price=0.1)
+
+    # Em float, 0.1 * 3 = 0.30000000000000004; em Decimal, exatamente 0.30.
+    payload = order_payload([(product, 3)], shipping_cost=0.2)
+    assert payload["subtotal"] != 0.3
+    response = await client.post("/api/v1/orders", json=payload, headers=CUSTOMER)
+    assert response.status_code == 201
+    assert (response.json()["subtotal"], response.json()["total"]) == (0.3, 0.5)
+
+    # Frete com meio centavo arredonda para cima (ROUND_HALF_UP).
+    payload = order_payload([(product, 1)], shipping_cost=5.005, total=5.11)
+    response = await client.post("/api/v1/orders", json=payload, headers=CUSTOMER)
+    assert response.status_code == 201
+    assert response.json()["shippingCost"] == 5.01
+
+    # Um centavo de diferença no total já é recusado.
+    payload = order_payload([(product, 1)], total=0.11)
+    response = await client.post("/api/v1/orders", json=payload, headers=CUSTOMER)
+    assert response.status_code == 400
+
+
+async def test_unknown_or_removed_products_are_rejected(client):
+    unknown = {"id": "produto-inexistente", "title": "Fantasma", "author": "", "type": "book", "price": 10.0}
+    response = await client.post("/api/v1/orders", json=order_payload([(unknown, 1)]), headers=CUSTOMER)
+    assert response.status_code == 409
+    assert "Fantasma" in response.json()["detail"]
+
+    # Preço já no índice em memória: a exclusão do produto precisa invalidá-lo.
+    product = await create_product(client, price=30.0)
+    response = await client.post("/api/v1/orders", json=order_payload([(product, 1)]), headers=CUSTOMER)
+    assert response.status_code == 201
+    deleted = await client.delete(f"/api/v1/products/{product['id']}", headers=ADMIN)
+    assert deleted.status_code == 204
+
+    response = await client.post("/api/v1/orders", json=order_payload([(product, 1)]), headers=CUSTOMER)
+    assert response.status_code == 409
+    assert product["title"] in response.json()["detail"]
+
+
+async def test_negative_shipping_cost_is_rejected(client):
+    product = await create_product(client, price=40.0)
+    payload = order_payload([(product, 1)], shipping_cost=-15.0)
+
+    response = await client.post("/api/v1/orders", json=payload, headers=CUSTOMER)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Valor de frete inválido."
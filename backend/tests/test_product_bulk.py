@@ -0,0 +1,76 @@
+"""
+Importação em massa de produtos (POST /products/bulk).
+"""
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models.product import Product
+from tests.factories import ADMIN, create_product
+
+pytestmark = pytest.mark.anyio
+
+NDJSON = {**ADMIN, "Content-Type": "application/x-ndjson"}
+
+
+def ndjson(*records: dict) -> str:
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def new_record(**fields) -> dict:
+    return {"title": "Livro", "author": "Autor", "price": 10.0, "category": "Testes", "type": "book", **fields}
+
+
+async def get_product(product_id: str) -> Product | None:
+    async with SessionLocal() as db:
+        return await db.get(Product, product_id)
+
+
+async def test_reimport_keeps_the_columns_it_omits(client):
+    product = await create_product(client, stock=7, is_best_seller=True, description="Descrição original")
+
+    record = {key: product[key] for key in ("id", "title", "author", "category", "type")}
+    response = await client.post("/api/v1/products/bulk", content=ndjson({**record, "price": 99.9}), headers=NDJSON)
+    assert response.status_code == 200
+    assert response.json()["upserted"] == 1
+
+    stored = await get_product(product["id"])
+    assert stored.price == 99.9
+    assert (stored.stock, stored.is_best_seller, stored.description) == (7, True, "Descrição original")
+
+    # Campo vazio no CSV também conta como omitido.
+    csv = f"id,title,author,price,category,type,stock\n{product['id']},{product['title']},Autor,50,Testes,book,\n"
+    response = await client.post("/api/v1/products/bulk?format=csv", content=csv, headers=ADMIN)
+    assert response.json()["upserted"] == 1
+    assert (await get_product(product["id"])).stock == 7
+
+
+async def test_failed_batch_reports_each_rejected_line(client):
+    good, rejected = str(uuid.uuid4()), str(uuid.uuid4())
+    async with SessionLocal() as db:
+        # Recusa só no banco, depois da validação do schema.
+        await db.execute(
+            text(
+                "CREATE TRIGGER reject_import BEFORE INSERT ON products "
+                f"WHEN NEW.id = '{rejected}' BEGIN SELECT RAISE(ABORT, 'recusado'); END"
+            )
+        )
+        await db.commit()
+    try:
+        body = ndjson(new_record(id=good), new_record(id=rejected), new_record(id=good, stock=3))
+        response = await client.post("/api/v1/products/bulk", content=body, headers=NDJSON)
+    finally:
+        async with SessionLocal() as db:
+            await db.execute(text("DROP TRIGGER reject_import"))
+            await db.commit()
+
+    report = response.json()
+    assert (report["processed"], report["upserted"], report["failed"]) == (3, 2, 1)
+    assert [error["line"] for error in report["errors"]] == [2]
+    assert "recusado" in report["errors"][0]["error"]
+    assert (await get_product(good)).stock == 3
+    assert await get_product(rejected) is None
@@ -0,0 +1,139 @@
+"""
+Leituras na réplica: roteamento, read-your-writes e queda para o primário.
+
+A réplica é uma cópia do SQLite dos testes; depois da cópia o primário é
+alterado direto no banco, então a resposta mostra de onde veio a leitura.
+"""
+
+import shutil
+import uuid
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import read_routing
+from app.core.cache import TTLCache
+from app.core.database import SessionLocal
+from app.core.read_routing import CATALOG, read_router
+from app.models.product import Product
+from app.services.catalog_cache import catalog_cache
+from tests.conftest import PRIMARY_DB, TEST_DIR
+from tests.factories import ADMIN, CUSTOMER, create_product, order_payload
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def use_replica(monkeypatch):
+    """Aponta as leituras para `path`, com o estado do roteador zerado; devolve o engine."""
+    engines = []
+
+    def use(path, session_class=AsyncSession):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        engines.append(engine)
+        monkeypatch.setattr(
+            read_routing,
+            "ReadSessionLocal",
+            async_sessionmaker(engine, class_=session_class, expire_on_commit=False, autoflush=False),
+        )
+        monkeypatch.setattr(read_router, "_recent_writers", TTLCache(max_entries=100, ttl=60))
+        monkeypatch.setattr(read_router, "_replica_down_until", 0.0)
+        monkeypatch.setattr(read_router, "_probed_at", None)
+        catalog_cache.invalidate()
+        return engine
+
+    yield use
+    for engine in engines:
+        engine.sync_engine.dispose()
+
+
+async def stale_replica_of(client, use_replica, session_class=AsyncSession) -> dict:
+    """Produto com preço 10 na réplica e 20 no primário."""
+    product = await create_product(client, price=10.0)
+    replica_path = TEST_DIR / f"replica-{uuid.uuid4().hex}.db"
+    shutil.copyfile(PRIMARY_DB, replica_path)
+    async with SessionLocal() as db:
+        await db.execute(update(Product).where(Product.id == product["id"]).values(price=20.0))
+        await db.commit()
+    use_replica(replica_path, session_class)
+    return product
+
+
+async def price_of(client, product_id: str, headers: dict | None = None) -> float:
+    response = await client.get(f"/api/v1/products/{product_id}", headers=headers)
+    assert response.status_code == 200
+    return response.json()["price"]
+
+
+async def test_reads_go_to_the_replica(client, use_replica):
+    product = await stale_replica_of(client, use_replica)
+
+    assert await price_of(client, product["id"]) == 10.0
+
+
+async def test_user_reads_stay_on_the_primary_after_a_write(client, use_replica):
+    product = await stale_replica_of(client, use_replica)
+
+    current = {**product, "price": 20.0}
+    created = await client.post("/api/v1/orders", json=order_payload([(current, 1)]), headers=CUSTOMER)
+    assert created.status_code == 201
+
+    assert await price_of(client, product["id"], CUSTOMER) == 20.0
+    catalog_cache.invalidate()
+    assert await price_of(client, product["id"]) == 10.0
+
+
+async def test_catalog_reads_stay_on_the_primary_after_a_catalog_write(client, use_replica):
+    product = await stale_replica_of(client, use_replica)
+
+    updated = await client.put(f"/api/v1/products/{product['id']}", json={"stock": 3}, headers=ADMIN)
+    assert updated.status_code == 200
+
+    # Anônimo, logo após a escrita do admin: primário, e é isso que vai para o cache.
+    assert await price_of(client, product["id"]) == 20.0
+    read_router._recent_writers.clear()
+    assert await price_of(client, product["id"]) == 20.0
+
+
+async def test_replica_read_overtaken_by_a_catalog_write_is_not_cached(client, use_replica):
+    class OvertakenSession(AsyncSession):
+        async def scalar(self, *args, **kwargs):
+            # A escrita do admin (invalidação do cache incluída) terminou
+            # depois do roteamento para a réplica e antes desta consulta.
+            read_router.mark_write(CATALOG)
+            return await super().scalar(*args, **kwargs)
+
+    product = await stale_replica_of(client, use_replica, OvertakenSession)
+
+    assert await price_of(client, product["id"]) == 10.0
+    assert await price_of(client, product["id"]) == 20.0
+
+
+async def test_unreachable_replica_falls_back_to_the_primary(client, use_replica):
+    product = await create_product(client, price=10.0)
+    use_replica(TEST_DIR / "inexistente" / "replica.db")
+
+    assert await price_of(client, product["id"]) == 10.0
+    assert not read_router.replica_available()
+
+
+async def test_cached_reads_check_out_no_replica_connection(client, use_replica):
+    product = await create_product(client)
+    replica_path = TEST_DIR / f"replica-{uuid.uuid4().hex}.db"
+    shutil.copyfile(PRIMARY_DB, replica_path)
+    engine = use_replica(replica_path)
+    checkouts = []
+    event.listen(engine.sync_engine, "checkout", lambda *args: checkouts.append(1))
+
+    first = await client.get(f"/api/v1/products/{product['id']}")
+    assert first.status_code == 200
+    # Sonda + consulta; o pool reaproveita a conexão.
+    assert len(checkouts) <= 2
+
+    checkouts.clear()
+    for _ in range(10):
+        etag = {"If-None-Match": first.headers["etag"]}
+        response = await client.get(f"/api/v1/products/{product['id']}", headers=etag)
+        assert response.status_code == 304
+    assert checkouts == []
@@ -0,0 +1,75 @@
+"""
+Busca textual: índice em memória atualizado pelas escritas e reconstruído em segundo plano.
+"""
+
+import uuid
+
+import pytest
+
+from app.models.product import Product
+from app.services import search_index as search_module
+from app.services.search_index import search_index
+from tests.factories import ADMIN, create_product
+
+pytestmark = pytest.mark.anyio
+
+
+def unique_word() -> str:
+    return f"termo{uuid.uuid4().hex[:10]}"
+
+
+async def search(client, q: str) -> list[str]:
+    response = await client.get("/api/v1/products/search", params={"q": q})
+    assert response.status_code == 200
+    return [product["id"] for product in response.json()]
+
+
+async def test_writes_reach_the_index_without_a_rebuild(client):
+    word = unique_word()
+    product = await create_product(client, title=f"Livro {word}")
+    assert await search(client, word[:-2]) == [product["id"]]
+
+    other = unique_word()
+    updated = await client.put(f"/api/v1/products/{product['id']}", json={"title": f"Livro {other}"}, headers=ADMIN)
+    assert updated.status_code == 200
+    assert await search(client, word) == []
+    assert await search(client, other) == [product["id"]]
+
+    deleted = await client.delete(f"/api/v1/products/{product['id']}", headers=ADMIN)
+    assert deleted.status_code == 204
+    assert await search(client, other) == []
+
+
+async def test_writes_during_a_rebuild_survive_the_swap(client, monkeypatch):
+    removed_word, added_word = unique_word(), unique_word()
+    removed = await create_product(client, title=f"Livro {removed_word}")
+    added = Product(id=str(uuid.uuid4()), title=f"Livro {added_word}", author="Autor Teste", category="Testes", type="book")
+
+    # Escritas que chegam depois da leitura do banco, enquanto o índice novo é montado.
+    real_run_in_threadpool = search_module.run_in_threadpool
+
+    async def run_in_threadpool_with_writes(func, *args):
+        search_index.remove(removed["id"])
+        search_index.upsert(added)
+        return await real_run_in_threadpool(func, *args)
+
+    monkeypatch.setattr(search_module, "run_in_threadpool", run_in_threadpool_with_writes)
+    await search_index.rebuild()
+
+    assert await search(client, removed_word) == []
+    assert await search(client, added_word) == [added.id]
+    search_index.remove(added.id)
+
+
+async def test_bulk_import_schedules_a_background_rebuild(client):
+    word = unique_word()
+    body = f'{{"title": "Livro {word}", "author": "Autor", "price": 10, "category": "Testes", "type": "book"}}\n'
+
+    response = await client.post(
+        "/api/v1/products/bulk", content=body, headers={**ADMIN, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.json()["upserted"] == 1
+
+    await search_index._rebuild_task
+    assert len(await search(client, word)) == 1
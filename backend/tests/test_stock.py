@@ -0,0 +1,93 @@
+"""
+Reserva de estoque no checkout e devolução no cancelamento.
+"""
+
+import asyncio
+
+import pytest
+
+from tests.factories import ADMIN, CUSTOMER, create_product, order_count, order_payload, stock_of
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_checkouts_never_oversell(client):
+    product = await create_product(client, stock=3)
+
+    responses = await asyncio.gather(
+        *(
+            client.post("/api/v1/orders", json=order_payload([(product, 1)]), headers=CUSTOMER)
+            for _ in range(8)
+        )
+    )
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [201] * 3 + [409] * 5
+    assert await stock_of(product["id"]) == 0
+
+
+async def test_two_checkouts_racing_for_the_last_unit(client):
+    contested = await create_product(client, stock=1)
+    first = await create_product(client, stock=5)
+    second = await create_product(client, stock=5)
+
+    # Pedidos com vários produtos, o disputado em posições diferentes.
+    responses = await asyncio.gather(
+        client.post("/api/v1/orders", json=order_payload([(first, 1), (contested, 1)]), headers=CUSTOMER),
+        client.post("/api/v1/orders", json=order_payload([(contested, 1), (second, 1)]), headers=CUSTOMER),
+    )
+
+    assert sorted(response.status_code for response in responses) == [201, 409]
+    assert await stock_of(contested["id"]) == 0
+    winner = 0 if responses[0].status_code == 201 else 1
+    assert await stock_of(first["id"]) == (4 if winner == 0 else 5)
+    assert await stock_of(second["id"]) == (4 if winner == 1 else 5)
+
+
+async def test_failed_checkout_keeps_no_partial_reservation(client):
+    available = await create_product(client, stock=5)
+    scarce = await create_product(client, stock=1)
+    orders_before = await order_count()
+
+    response = await client.post(
+        "/api/v1/orders", json=order_payload([(available, 2), (scarce, 3)]), headers=CUSTOMER
+    )
+
+    assert response.status_code == 409
+    assert scarce["title"] in response.json()["detail"]
+    assert await stock_of(available["id"]) == 5
+    assert await stock_of(scarce["id"]) == 1
+    assert await order_count() == orders_before
+
+
+async def test_cancel_releases_stock_once(client):
+    product = await create_product(client, stock=4)
+    created = await client.post("/api/v1/orders", json=order_payload([(product, 3)]), headers=CUSTOMER)
+    assert created.status_code == 201
+    assert await stock_of(product["id"]) == 1
+
+    order_id = created.json()["id"]
+    cancelled = await client.patch(f"/api/v1/orders/{order_id}/cancel", headers=CUSTOMER)
+    assert cancelled.status_code == 200
+    assert await stock_of(product["id"]) == 4
+
+    again = await client.patch(f"/api/v1/orders/{order_id}/cancel", headers=CUSTOMER)
+    assert again.status_code == 400
+    assert await stock_of(product["id"]) == 4
+
+
+async def test_concurrent_cancels_release_stock_once(client):
+    product = await create_product(client, stock=4)
+    created = await client.post("/api/v1/orders", json=order_payload([(product, 3)]), headers=CUSTOMER)
+    assert created.status_code == 201
+    order_id = created.json()["id"]
+
+    responses = await asyncio.gather(
+        *(client.patch(f"/api/v1/orders/{order_id}/cancel", headers=CUSTOMER) for _ in range(4)),
+        client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "cancelado"}, headers=ADMIN),
+    )
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(200) == 1
+    assert set(statuses) <= {200, 400, 409}
+    assert await stock_of(product["id"]) == 4
@@ -1,9 +1,9 @@
-import { Link, useLocation } from "react-router";
+import { Link, useLocation, useNavigate } from "react-router";
 import { Search, ShoppingCart, User, Menu, X, Bell, LogIn } from "lucide-react";
 import { useEffect, useState } from "react";
 import { useCart } from "../../context/CartContext";
 import { useAuth } from "../../context/AuthContext";
-import { getNotificationsByRole } from "../../utils/notifications";
+import { fetchUnreadCount, subscribeNotifications } from "../../services/api";
 
 export function Header() {
   const [isMenuOpen, setIsMenuOpen] = useState(false);
@@ -11,17 +11,45 @@ export function Header() {
   const { cartCount } = useCart();
   const { isLoggedIn, user, isAdmin } = useAuth();
   const location = useLocation();
+  const navigate = useNavigate();
+  const [searchTerm, setSearchTerm] = useState("");
 
+  // O campo reflete a busca atual do catálogo (ex.: ao voltar no histórico).
+  useEffect(() => {
+    setSearchTerm(location.pathname === "/shop" ? new URLSearchParams(location.search).get("q") || "" : "");
+  }, [location.pathname, location.search]);
+
+  const handleSearch = (e) => {
+    e.preventDefault();
+    const term = searchTerm.trim();
+    if (!term) return;
+    setIsMenuOpen(false);
+    navigate(`/shop?${new URLSearchParams({ q: term })}`);
+  };
+
+  // Contagem inicial do servidor; a cada navegação ela é relida (as páginas
+  // de notificações marcam como lidas ao abrir).
   useEffect(() => {
     if (!isLoggedIn) {
       setUnreadCount(0);
       return;
     }
-    const role = isAdmin ? "admin" : "customer";
-    const list = getNotificationsByRole(role);
-    const count = list.filter((n) => !n.read).length;
-    setUnreadCount(count);
-  }, [isLoggedIn, isAdmin, location.pathname]);
+    let cancelled = false;
+    fetchUnreadCount()
+      .then((data) => {
+        if (!cancelled) setUnreadCount(data.unread);
+      })
+      .catch(() => {});
+    return () => {
+      cancelled = true;
+    };
+  }, [isLoggedIn, user?.email, location.pathname, location.search]);
+
+  // Novas notificações chegam pelo stream SSE, sem polling.
+  useEffect(() => {
+    if (!isLoggedIn) return;
+    return subscribeNotifications(() => setUnreadCount((count) => count + 1));
+  }, [isLoggedIn, user?.email]);
 
   const toggleMenu = () => setIsMenuOpen(!isMenuOpen);
 
@@ -73,14 +101,19 @@ export function Header() {
 
         {/* Actions */}
         <div className="flex items-center gap-3">
-          <div className="relative hidden md:flex items-center">
+          <form role="search" onSubmit={handleSearch} className="relative hidden md:flex items-center">
             <input
-              type="text"
+              type="search"
               placeholder="Buscar..."
+              aria-label="Buscar produtos"
+              value={searchTerm}
+              onChange={(e) => setSearchTerm(e.target.value)}
               className="pl-3 pr-10 py-1.5 text-sm rounded-full bg-gray-100 focus:outline-none focus:ring-2 focus:ring-[#00C2FF]/50 transition-all w-48 focus:w-64"
             />
-            <Search className="absolute right-3 h-4 w-4 text-gray-400" />
-          </div>
+            <button type="submit" aria-label="Buscar" className="absolute right-3">
+              <Search className="h-4 w-4 text-gray-400" />
+            </button>
+          </form>
 
           {isLoggedIn ? (
             <Link
@@ -146,14 +179,19 @@ export function Header() {
           className="md:hidden border-t border-gray-100 bg-white"
         >
           <div className="container mx-auto px-4 py-4 flex flex-col gap-4">
-            <div className="relative flex items-center w-full">
+            <form role="search" onSubmit={handleSearch} className="relative flex items-center w-full">
               <input
-                type="text"
+                type="search"
                 placeholder="Buscar..."
+                aria-label="Buscar produtos"
+                value={searchTerm}
+                onChange={(e) => setSearchTerm(e.target.value)}
                 className="pl-3 pr-10 py-2 text-sm rounded-lg bg-gray-100 w-full focus:outline-none focus:ring-2 focus:ring-[#00C2FF]/50"
               />
-              <Search className="absolute right-3 h-4 w-4 text-gray-400" />
-            </div>
+              <button type="submit" aria-label="Buscar" className="absolute right-3">
+                <Search className="h-4 w-4 text-gray-400" />
+              </button>
+            </form>
 
             {navLinks.map((link) => (
               <Link
@@ -291,7 +291,8 @@ export function Checkout() {
     let order;
     try {
       // Criar pedido via API (persiste no MySQL + envia email de confirmação)
-      order = await apiCreateOrder(orderData);
+      // Um pedido por transação: retentativas reaproveitam o mesmo pedido.
+      order = await apiCreateOrder(orderData, `order-${payment.transaction_id}`);
     } catch (e) {
       console.warn("Falha ao criar pedido via API, salvando localmente:", e);
       // Fallback: salvar localmente
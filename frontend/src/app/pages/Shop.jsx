@@ -1,8 +1,12 @@
-import { useState, useMemo } from "react";
+import { useState, useMemo, useEffect } from "react";
 import { useSearchParams } from "react-router";
 import { Filter, ChevronDown } from "lucide-react";
 import { useProducts } from "../context/ProductContext";
 import { ProductCard } from "../components/ProductCard";
+import { searchProducts } from "../services/api";
+
+// Máximo aceito por GET /products/search.
+const SEARCH_LIMIT = 100;
 
 export function Shop() {
   const { products, categories } = useProducts();
@@ -13,10 +17,39 @@ export function Shop() {
   const selectedCategory = searchParams.get("category") || searchParams.get("cat");
   const selectedType = searchParams.get("type");
   const sortOrder = searchParams.get("sort") || "featured";
+  const query = (searchParams.get("q") || "").trim();
+
+  // Busca textual feita no servidor (índice com relevância, acentos e prefixos);
+  // os filtros e a ordenação abaixo se aplicam sobre os resultados.
+  const [searchResults, setSearchResults] = useState(null);
+  const [isSearching, setIsSearching] = useState(false);
+
+  useEffect(() => {
+    if (!query) {
+      setSearchResults(null);
+      return;
+    }
+    let cancelled = false;
+    setIsSearching(true);
+    searchProducts(query, SEARCH_LIMIT)
+      .then((results) => {
+        if (!cancelled) setSearchResults(results);
+      })
+      .catch(() => {
+        if (!cancelled) setSearchResults([]);
+      })
+      .finally(() => {
+        if (!cancelled) setIsSearching(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [query]);
 
   // Filter Logic
   const filteredProducts = useMemo(() => {
-    let result = [...products];
+    // Com busca, "Destaques" mantém a ordem de relevância do servidor.
+    let result = query ? [...(searchResults || [])] : [...products];
 
     if (selectedCategory) {
       const categoryMatch = categories.find((c) => c.id === selectedCategory);
@@ -58,7 +91,7 @@ export function Shop() {
     }
 
     return result;
-  }, [products, categories, selectedCategory, selectedType, sortOrder]);
+  }, [products, searchResults, query, categories, selectedCategory, selectedType, sortOrder]);
 
   const handleFilterChange = (key, value) => {
     const newParams = new URLSearchParams(searchParams);
@@ -77,9 +110,19 @@ export function Shop() {
         {/* Header */}
         <div className="flex flex-col md:flex-row justify-between items-center mb-8 gap-4">
           <div>
-            <h1 className="text-3xl font-bold text-[#0A192F]">Catálogo</h1>
+            <h1 className="text-3xl font-bold text-[#0A192F]">
+              {query ? `Resultados para “${query}”` : "Catálogo"}
+            </h1>
             <p className="text-gray-500 mt-1">
-              {filteredProducts.length} produtos encontrados
+              {isSearching ? "Buscando..." : `${filteredProducts.length} produtos encontrados`}
+              {query && (
+                <button
+                  onClick={() => handleFilterChange("q", null)}
+                  className="ml-3 text-xs text-[#00C2FF] hover:underline"
+                >
+                  Limpar busca
+                </button>
+              )}
             </p>
           </div>
           
@@ -174,7 +217,7 @@ export function Shop() {
 
           {/* Products Grid */}
           <div className="flex-1">
-            {filteredProducts.length === 0 ? (
+            {isSearching ? null : filteredProducts.length === 0 ? (
               <div className="text-center py-20">
                 <p className="text-gray-500 text-lg">Nenhum produto encontrado.</p>
               </div>
@@ -40,6 +40,35 @@ async function request(url, options = {}) {
   return response.json();
 }
 
+/**
+ * Busca todas as páginas de um endpoint paginado por cursor,
+ * seguindo o header X-Next-Cursor até a última página.
+ */
+async function requestAllPages(url, pageSize = 200) {
+  const items = [];
+  let cursor = null;
+
+  do {
+    const params = new URLSearchParams({ limit: String(pageSize) });
+    if (cursor) params.set("cursor", cursor);
+    const separator = url.includes("?") ? "&" : "?";
+
+    const response = await fetch(`${API_BASE_URL}${url}${separator}${params}`, {
+      headers: { "Content-Type": "application/json", ...authHeaders() },
+    });
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      const detail = error?.detail || "Erro na requisição.";
+      throw new Error(typeof detail === "string" ? detail : JSON.stringify(detail));
+    }
+
+    items.push(...(await response.json()));
+    cursor = response.headers.get("X-Next-Cursor");
+  } while (cursor);
+
+  return items;
+}
+
 // ── Auth ──────────────────────────────────────────────
 
 export async function apiLogin(email, password) {
@@ -63,13 +92,21 @@ export async function apiGetMe() {
 // ── Products ──────────────────────────────────────────
 
 export async function fetchProducts() {
-  return request("/products");
+  return requestAllPages("/products");
 }
 
 export async function fetchProduct(id) {
   return request(`/products/${id}`);
 }
 
+/**
+ * Busca textual no catálogo (sem acentos, casa prefixos — serve para typeahead).
+ */
+export async function searchProducts(query, limit = 20) {
+  const params = new URLSearchParams({ q: query, limit: String(limit) });
+  return request(`/products/search?${params}`);
+}
+
 export async function apiCreateProduct(data) {
   return request("/products", {
     method: "POST",
@@ -91,13 +128,18 @@ export async function apiDeleteProduct(id) {
 // ── Orders ────────────────────────────────────────────
 
 export async function fetchOrders() {
-  return request("/orders");
+  return requestAllPages("/orders");
 }
 
-export async function apiCreateOrder(data) {
+/**
+ * Cria o pedido. Com `idempotencyKey`, repetir a chamada (ex.: após timeout)
+ * devolve o mesmo pedido em vez de criar outro.
+ */
+export async function apiCreateOrder(data, idempotencyKey) {
   return request("/orders", {
     method: "POST",
     body: JSON.stringify(data),
+    headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {},
   });
 }
 
@@ -118,6 +160,23 @@ export async function fetchNotifications() {
   return request("/notifications");
 }
 
+export async function fetchUnreadCount() {
+  return request("/notifications/unread-count");
+}
+
+/**
+ * Assina o stream SSE de notificações. Retorna uma função para encerrar a conexão.
+ * O EventSource não envia headers, então o email vai na query string.
+ */
+export function subscribeNotifications(onNotification) {
+  const params = new URLSearchParams({ email: getAuthEmail() });
+  const source = new EventSource(`${API_BASE_URL}/notifications/stream?${params}`);
+  source.addEventListener("notification", (event) => {
+    onNotification(JSON.parse(event.data));
+  });
+  return () => source.close();
+}
+
 export async function apiMarkNotificationsRead() {
   return request("/notifications/read", { method: "PATCH" });
 }